@@ -9,98 +9,125 @@ const WS_BASE = process.env.NODE_ENV === 'production'
   ? `wss://${window.location.hostname}:8000`
   : 'ws://localhost:8000'
 
+// Topics received over the single multiplexed /ws connection
+const TOPICS = ['telemetry', 'alerts', 'job', 'analysis']
+
+const topicStatus = (status) => Object.fromEntries(TOPICS.map(topic => [topic, status]))
+
 export function WebSocketProvider({ children, sessionId }) {
-  const [connections, setConnections] = useState({
-    telemetry: null,
-    alerts: null,
-    job: null,
-    analysis: null
-  })
+  const [connection, setConnection] = useState(null)
   
-  const [connectionStatus, setConnectionStatus] = useState({
-    telemetry: 'disconnected',
-    alerts: 'disconnected',
-    job: 'disconnected',
-    analysis: 'disconnected'
-  })
+  // Kept per topic for the status badges; all topics share one socket
+  const [connectionStatus, setConnectionStatus] = useState(topicStatus('disconnected'))
   
-  const reconnectTimeouts = useRef({})
-  const reconnectAttempts = useRef({})
+  const reconnectTimeout = useRef(null)
+  const reconnectAttempts = useRef(0)
   const maxReconnectAttempts = 5
   const reconnectDelay = 1000 // Start with 1 second
   
   const { updateTelemetry } = useKioskStore()
   
-  const createWebSocketConnection = (endpoint, onMessage, onError) => {
-    const ws = new WebSocket(`${WS_BASE}/ws/${endpoint}`)
+  const createWebSocketConnection = () => {
+    const ws = new WebSocket(`${WS_BASE}/ws?topics=${TOPICS.join(',')}`)
     
     ws.onopen = () => {
-      console.log(`WebSocket connected: ${endpoint}`)
-      setConnectionStatus(prev => ({ ...prev, [endpoint]: 'connected' }))
-      reconnectAttempts.current[endpoint] = 0
+      console.log('WebSocket connected')
+      reconnectAttempts.current = 0
       
       // Clear any existing reconnect timeout
-      if (reconnectTimeouts.current[endpoint]) {
-        clearTimeout(reconnectTimeouts.current[endpoint])
-        delete reconnectTimeouts.current[endpoint]
+      if (reconnectTimeout.current) {
+        clearTimeout(reconnectTimeout.current)
+        reconnectTimeout.current = null
       }
     }
     
     ws.onmessage = (event) => {
       try {
         const data = JSON.parse(event.data)
-        onMessage(data)
+        handleMessage(data)
       } catch (error) {
-        console.error(`Error parsing WebSocket message from ${endpoint}:`, error)
+        console.error('Error parsing WebSocket message:', error)
       }
     }
     
     ws.onclose = (event) => {
-      console.log(`WebSocket disconnected: ${endpoint}`, event.code, event.reason)
-      setConnectionStatus(prev => ({ ...prev, [endpoint]: 'disconnected' }))
+      console.log('WebSocket disconnected', event.code, event.reason)
+      setConnectionStatus(topicStatus('disconnected'))
       
       // Attempt to reconnect if not a normal closure
       if (event.code !== 1000 && sessionId) {
-        scheduleReconnect(endpoint, onMessage, onError)
+        scheduleReconnect()
       }
     }
     
     ws.onerror = (error) => {
-      console.error(`WebSocket error on ${endpoint}:`, error)
-      setConnectionStatus(prev => ({ ...prev, [endpoint]: 'error' }))
-      if (onError) onError(error)
+      console.error('WebSocket error:', error)
+      setConnectionStatus(topicStatus('error'))
     }
     
     return ws
   }
   
-  const scheduleReconnect = (endpoint, onMessage, onError) => {
-    const attempts = reconnectAttempts.current[endpoint] || 0
+  const scheduleReconnect = () => {
+    const attempts = reconnectAttempts.current
     
     if (attempts >= maxReconnectAttempts) {
-      console.error(`Max reconnection attempts reached for ${endpoint}`)
-      setConnectionStatus(prev => ({ ...prev, [endpoint]: 'failed' }))
+      console.error('Max reconnection attempts reached')
+      setConnectionStatus(topicStatus('failed'))
       return
     }
     
     const delay = reconnectDelay * Math.pow(2, attempts) // Exponential backoff
     
-    console.log(`Scheduling reconnect for ${endpoint} in ${delay}ms (attempt ${attempts + 1})`)
-    setConnectionStatus(prev => ({ ...prev, [endpoint]: 'reconnecting' }))
+    console.log(`Scheduling reconnect in ${delay}ms (attempt ${attempts + 1})`)
+    setConnectionStatus(topicStatus('reconnecting'))
     
-    reconnectTimeouts.current[endpoint] = setTimeout(() => {
-      reconnectAttempts.current[endpoint] = attempts + 1
-      const ws = createWebSocketConnection(endpoint, onMessage, onError)
-      setConnections(prev => ({ ...prev, [endpoint]: ws }))
+    reconnectTimeout.current = setTimeout(() => {
+      reconnectAttempts.current = attempts + 1
+      setConnection(createWebSocketConnection())
     }, delay)
   }
   
+  const handleSubscribed = (topics) => {
+    setConnectionStatus(Object.fromEntries(
+      TOPICS.map(topic => [topic, topics.includes(topic) ? 'connected' : 'disconnected'])
+    ))
+  }
+  
+  // Route tagged messages from the multiplexed connection
+  const handleMessage = (data) => {
+    switch (data.type) {
+      case 'connection':
+      case 'subscribed':
+        if (data.topics) handleSubscribed(data.topics)
+        break
+      case 'telemetry':
+        handleTelemetryMessage(data)
+        break
+      case 'alert':
+        handleAlertMessage(data)
+        break
+      case 'job':
+        handleJobMessage(data)
+        break
+      case 'analysis':
+        handleAnalysisMessage(data)
+        break
+      case 'ping':
+        // Handle ping/pong for connection health
+        console.log('Received ping from server')
+        break
+      case 'error':
+        console.error('WebSocket server error:', data.message)
+        break
+      default:
+        break
+    }
+  }
+  
   const handleTelemetryMessage = (data) => {
     if (data.type === 'telemetry') {
       updateTelemetry(data.data)
-    } else if (data.type === 'ping') {
-      // Handle ping/pong for connection health
-      console.log('Received ping from server')
     }
   }
   
@@ -151,87 +178,53 @@ export function WebSocketProvider({ children, sessionId }) {
   useEffect(() => {
     if (!sessionId) return
     
-    // Create WebSocket connections
-    const telemetryWs = createWebSocketConnection('telemetry', handleTelemetryMessage)
-    const alertsWs = createWebSocketConnection('alerts', handleAlertMessage)
-    const jobWs = createWebSocketConnection('job', handleJobMessage)
-    const analysisWs = createWebSocketConnection('analysis', handleAnalysisMessage)
-    
-    setConnections({
-      telemetry: telemetryWs,
-      alerts: alertsWs,
-      job: jobWs,
-      analysis: analysisWs
-    })
+    // One connection carries every topic
+    const ws = createWebSocketConnection()
+    setConnection(ws)
     
     return () => {
-      // Clean up connections
-      Object.values(connections).forEach(ws => {
-        if (ws && ws.readyState === WebSocket.OPEN) {
-          ws.close(1000, 'Component unmounting')
-        }
-      })
+      // Clean up connection
+      if (ws.readyState === WebSocket.OPEN) {
+        ws.close(1000, 'Component unmounting')
+      }
       
-      // Clear reconnect timeouts
-      Object.values(reconnectTimeouts.current).forEach(timeout => {
-        clearTimeout(timeout)
-      })
-      reconnectTimeouts.current = {}
+      // Clear reconnect timeout
+      if (reconnectTimeout.current) {
+        clearTimeout(reconnectTimeout.current)
+        reconnectTimeout.current = null
+      }
     }
   }, [sessionId])
   
-  const sendMessage = (endpoint, message) => {
-    const ws = connections[endpoint]
-    if (ws && ws.readyState === WebSocket.OPEN) {
-      ws.send(JSON.stringify(message))
+  const sendMessage = (message) => {
+    if (connection && connection.readyState === WebSocket.OPEN) {
+      connection.send(JSON.stringify(message))
       return true
     }
     return false
   }
   
-  const reconnect = (endpoint) => {
-    const ws = connections[endpoint]
-    if (ws) {
-      ws.close()
+  const subscribe = (topics) => sendMessage({ type: 'subscribe', topics })
+  
+  const unsubscribe = (topics) => sendMessage({ type: 'unsubscribe', topics })
+  
+  const reconnectAll = () => {
+    if (connection) {
+      connection.close()
     }
     
     // Reset reconnect attempts
-    reconnectAttempts.current[endpoint] = 0
+    reconnectAttempts.current = 0
     
-    // Create new connection
-    let onMessage
-    switch (endpoint) {
-      case 'telemetry':
-        onMessage = handleTelemetryMessage
-        break
-      case 'alerts':
-        onMessage = handleAlertMessage
-        break
-      case 'job':
-        onMessage = handleJobMessage
-        break
-      case 'analysis':
-        onMessage = handleAnalysisMessage
-        break
-      default:
-        return
-    }
-    
-    const newWs = createWebSocketConnection(endpoint, onMessage)
-    setConnections(prev => ({ ...prev, [endpoint]: newWs }))
-  }
-  
-  const reconnectAll = () => {
-    Object.keys(connections).forEach(endpoint => {
-      reconnect(endpoint)
-    })
+    setConnection(createWebSocketConnection())
   }
   
   const value = {
-    connections,
+    connection,
     connectionStatus,
     sendMessage,
-    reconnect,
+    subscribe,
+    unsubscribe,
     reconnectAll
   }
   
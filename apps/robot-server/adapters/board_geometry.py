@@ -0,0 +1,93 @@
+"""
+Board geometry for UR10 Robot Server
+Precomputes robot-frame coordinates for every chess square, the bin and the
+standard approach heights from the board calibration
+"""
+
+import math
+from typing import Any, Dict, List, Tuple, Union
+
+# Calibration keys in ROBOT_CONFIG_TEMPLATE["robot_parameters"] the table depends on
+CALIBRATION_KEYS = ("angle", "dx", "dy", "square_size", "board_height", "board_lift_height", "bin_position")
+
+FILES = "abcdefgh"
+
+Square = Union[int, str]
+
+class BoardGeometry:
+    """Lookup table from chess squares to robot coordinates
+    
+    Board-frame points are rotated by ``angle`` (radians) and offset by
+    ``dx``/``dy``, the same transform as ``translate`` in the robot API. The
+    board frame has its origin at the outer corner of a1, files along +x and
+    ranks along +y. Squares are indexed like python-chess (a1 = 0, h8 = 63).
+    The table is immutable; build a new one when the calibration changes.
+    """
+    
+    def __init__(self, parameters: Dict[str, Any]):
+        self.key = self.calibration_key(parameters)
+        self.angle = float(parameters.get("angle", 0.0))
+        self.dx = float(parameters.get("dx", 0.0))
+        self.dy = float(parameters.get("dy", 0.0))
+        self.square_size = float(parameters.get("square_size", 0.05))
+        self.cos = math.cos(self.angle)
+        self.sin = math.sin(self.angle)
+        
+        # Standard heights: contact with a piece on the board, and lifted
+        board_height = float(parameters.get("board_height", 0.0))
+        self.heights = {
+            "board": board_height,
+            "lift": board_height + float(parameters.get("board_lift_height", 0.0))
+        }
+        
+        # The bin is calibrated directly in the robot frame
+        self.bin_position = tuple(float(v) for v in parameters.get("bin_position", [0.0, 0.0, 0.0]))
+        
+        half = self.square_size / 2
+        self.squares: Tuple[Tuple[float, float], ...] = tuple(
+            self.translate((index % 8) * self.square_size + half, (index // 8) * self.square_size + half)
+            for index in range(64)
+        )
+        
+    @staticmethod
+    def calibration_key(parameters: Dict[str, Any]) -> Tuple:
+        """Values the table is built from, to detect calibration changes"""
+        return tuple(
+            tuple(value) if isinstance(value, list) else value
+            for value in (parameters.get(key) for key in CALIBRATION_KEYS)
+        )
+        
+    def translate(self, x: float, y: float) -> Tuple[float, float]:
+        """Board-frame point to robot-frame x, y"""
+        return (x * self.cos - y * self.sin + self.dx, x * self.sin + y * self.cos + self.dy)
+        
+    def square(self, square: Square) -> Tuple[float, float]:
+        """Robot-frame x, y of a square's centre, by index or name (``"e4"``)"""
+        if isinstance(square, str):
+            square = square_index(square)
+        return self.squares[square]
+        
+    def to_dict(self) -> Dict[str, Any]:
+        """Table as JSON-friendly data"""
+        squares: Dict[str, List[float]] = {
+            square_name(index): list(position) for index, position in enumerate(self.squares)
+        }
+        return {
+            "angle": self.angle,
+            "dx": self.dx,
+            "dy": self.dy,
+            "square_size": self.square_size,
+            "heights": dict(self.heights),
+            "bin_position": list(self.bin_position),
+            "squares": squares
+        }
+
+def square_index(name: str) -> int:
+    """python-chess square index of a square name"""
+    if len(name) != 2 or name[0] not in FILES or name[1] not in "12345678":
+        raise ValueError(f"Invalid square: {name!r}")
+    return (int(name[1]) - 1) * 8 + FILES.index(name[0])
+
+def square_name(index: int) -> str:
+    """Square name of a python-chess square index"""
+    return FILES[index % 8] + str(index // 8 + 1)
@@ -0,0 +1,151 @@
+"""
+Robot command worker for UR10 Robot Server
+Runs blocking robot commands one at a time, in submission order, on a
+single dedicated thread so the event loop never waits on the robot
+"""
+
+import asyncio
+import itertools
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class CommandWithdrawnError(Exception):
+    """A command was withdrawn by a stop before it started, or between its steps"""
+
+@dataclass
+class RobotCommand:
+    """A queued robot command and the future its caller awaits"""
+    id: int
+    name: str
+    fn: Callable[..., Any]
+    args: Tuple[Any, ...]
+    future: Future = field(default_factory=Future)
+    submitted_at: float = field(default_factory=time.monotonic)
+
+class RobotCommandWorker:
+    """Serializes robot commands on one ``robot-worker`` thread
+    
+    ``submit`` returns an awaitable, so callers waiting for their turn only
+    cost a pending future instead of holding a lock. Cancelling the awaiting
+    task withdraws a command that has not started yet; a running command
+    always finishes, since robot motions cannot be abandoned half way.
+    Commands withdrawn by ``cancel_pending`` fail with
+    ``CommandWithdrawnError``, so their callers fail like any other robot
+    error instead of seeing their own task cancelled.
+    """
+    
+    def __init__(self, name: str = "robot-worker"):
+        self.name = name
+        self.commands: "queue.Queue[Optional[RobotCommand]]" = queue.Queue()
+        self.ids = itertools.count(1)
+        self.current: Optional[RobotCommand] = None
+        self.current_started = 0.0
+        self.thread: Optional[threading.Thread] = None
+        
+        # Statistics
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.last_wait_ms = 0.0
+        self.last_run_ms = 0.0
+        
+    def start(self):
+        """Start the worker thread"""
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self.thread.start()
+        
+    def stop(self, timeout: Optional[float] = None):
+        """Cancel pending commands and stop after the running one"""
+        self.cancel_pending()
+        self.commands.put(None)
+        if self.thread is not None:
+            self.thread.join(timeout)
+            self.thread = None
+            
+    def submit(self, name: str, fn: Callable[..., Any], *args: Any) -> "asyncio.Future[Any]":
+        """Queue ``fn(*args)`` and return an awaitable for its result"""
+        if self.thread is None:
+            self.start()
+        command = RobotCommand(id=next(self.ids), name=name, fn=fn, args=args)
+        self.commands.put(command)
+        return asyncio.wrap_future(command.future)
+        
+    def cancel_pending(self) -> int:
+        """Withdraw every command that has not started, returns how many"""
+        cancelled = 0
+        while True:
+            try:
+                command = self.commands.get_nowait()
+            except queue.Empty:
+                break
+            if command is None:
+                # Keep a pending shutdown request
+                self.commands.put(None)
+                break
+            try:
+                command.future.set_exception(CommandWithdrawnError(f"{command.name} withdrawn before it started"))
+            except InvalidStateError:
+                # The caller cancelled it first
+                pass
+            cancelled += 1
+        self.cancelled += cancelled
+        if cancelled:
+            logger.info(f"Withdrew {cancelled} pending robot command(s)")
+        return cancelled
+        
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth, running command and timing statistics"""
+        current = self.current
+        return {
+            "running": current.name if current else None,
+            "running_for_ms": (time.monotonic() - self.current_started) * 1000 if current else 0.0,
+            "pending": self.pending_commands(),
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "last_wait_ms": self.last_wait_ms,
+            "last_run_ms": self.last_run_ms
+        }
+        
+    def pending_commands(self) -> List[str]:
+        """Names of queued commands, oldest first"""
+        with self.commands.mutex:
+            return [command.name for command in self.commands.queue if command is not None]
+            
+    def _run(self):
+        """Execute commands in order until a shutdown request is dequeued"""
+        while True:
+            command = self.commands.get()
+            if command is None:
+                return
+                
+            # False when the caller cancelled before the command started
+            if not command.future.set_running_or_notify_cancel():
+                self.cancelled += 1
+                continue
+                
+            started = time.monotonic()
+            self.current = command
+            self.current_started = started
+            self.last_wait_ms = (started - command.submitted_at) * 1000
+            try:
+                result = command.fn(*command.args)
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Robot command {command.name} failed: {e}")
+                command.future.set_exception(e)
+            else:
+                self.completed += 1
+                command.future.set_result(result)
+            finally:
+                self.current = None
+                self.last_run_ms = (time.monotonic() - started) * 1000
@@ -4,17 +4,22 @@ Simulates robot behavior for development and testing without hardware
 """
 
 import asyncio
+import copy
 import logging
 import time
 import random
 import math
-from typing import Dict, Any, Optional, List
-import threading
+from typing import Dict, Any, Optional, List, Tuple, Callable, Awaitable
 
 import chess
 import chess.engine
 
 from models.schemas import TCPPose, BoardState, EngineStatus, IOMap
+from core.opening_book import OpeningBook
+from core.endgame_tablebase import EndgameTablebase
+from adapters.velocity_jog import VelocityJogController, JOG_MODE_TCP
+from adapters.board_geometry import BoardGeometry
+from adapters.move_planner import MovePlanner, MotionProgram, ACTION_TRAVEL
 
 logger = logging.getLogger(__name__)
 
@@ -43,14 +48,33 @@ class MockAdapter:
         self.is_moving = False
         self.move_start_time = 0
         self.move_duration = 0
+        # Set by a stop, so a running chess move ends after its current step
+        self.motion_aborted = False
         self.start_pose = None
         
+        # Square/bin coordinates, rebuilt only when the calibration changes
+        self.geometry: Optional[BoardGeometry] = None
+        self.planner: Optional[MovePlanner] = None
+        self.last_motion_program: Optional[MotionProgram] = None
+        self.last_cycle_time = 0.0
+        
         # Chess engine simulation
         self.engine_analyzing = False
         self.last_analysis = None
+        self.engine_started_at: Optional[float] = None
+        self.opening_book: Optional[OpeningBook] = None
+        self.tablebase: Optional[EndgameTablebase] = None
+        
+        # Bumped on every board / engine status change so callers can cache
+        self.board_version = 0
+        self.engine_version = 0
+        
+        # Serializes simulated motions; stop and E-stop never wait on it
+        self.motion_lock = asyncio.Lock()
         
-        # Thread safety
-        self.state_lock = threading.Lock()
+        # Active hold-to-jog stream and its simulation task
+        self.velocity_jog: Optional[VelocityJogController] = None
+        self.velocity_jog_task: Optional[asyncio.Task] = None
         
         # Simulation parameters
         self.max_speed = 0.5  # m/s
@@ -61,11 +85,25 @@ class MockAdapter:
     async def initialize(self, config: Dict[str, Any]):
         """Initialize the mock adapter"""
         try:
-            self.config = config
+            # Own copy, so calibration updates never touch the shared template
+            self.config = copy.deepcopy(config)
+            self._build_geometry()
             
             # Initialize chess board to starting position
             self.chess_board = chess.Board()
+            self.board_version += 1
+            self.engine_started_at = time.time()
             
+            # Load the opening book, if one is configured
+            if self.config["engine"]["opening_book"]:
+                self.opening_book = OpeningBook(self.config["engine"]["opening_book"])
+                self.opening_book.open()
+                
+            # Open the endgame tablebase, if one is configured
+            if self.config["engine"]["syzygy"]:
+                self.tablebase = EndgameTablebase(self.config["engine"]["syzygy"])
+                self.tablebase.open()
+                
             logger.info("Mock Adapter initialized successfully")
             return True
             
@@ -77,6 +115,10 @@ class MockAdapter:
         """Cleanup mock adapter resources"""
         try:
             self.connected = False
+            if self.opening_book:
+                self.opening_book.close()
+            if self.tablebase:
+                self.tablebase.close()
             logger.info("Mock Adapter cleaned up")
             
         except Exception as e:
@@ -124,8 +166,9 @@ class MockAdapter:
             home_pose = TCPPose(x=0.3, y=0.0, z=0.3, rx=0.0, ry=0.0, rz=0.0)
             home_joints = [0.0, -1.57, 1.57, -1.57, -1.57, 0.0]
             
-            await self._simulate_movement(home_pose, home_joints, duration=3.0)
-            
+            async with self.motion_lock:
+                await self._simulate_movement(home_pose, home_joints, duration=3.0)
+                
             logger.info("Mock robot homed successfully")
             return True
             
@@ -136,7 +179,7 @@ class MockAdapter:
     async def jog_tcp(self, axis: str, delta: float, speed: float, frame: str) -> bool:
         """Simulate TCP jogging"""
         try:
-            with self.state_lock:
+            async with self.motion_lock:
                 # Calculate target pose
                 target_pose = TCPPose(
                     x=self.current_pose.x,
@@ -177,6 +220,32 @@ class MockAdapter:
             logger.error(f"Mock TCP jog error: {e}")
             return False
             
+    def update_calibration(self, parameters: Dict[str, Any]) -> bool:
+        """Apply board calibration values, rebuilding the square table if they changed"""
+        try:
+            robot_parameters = self.config["robot_parameters"]
+            robot_parameters.update(parameters)
+            if self.geometry is None or BoardGeometry.calibration_key(robot_parameters) != self.geometry.key:
+                self._build_geometry()
+                logger.info("Mock board geometry rebuilt for new calibration")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Mock calibration update error: {e}")
+            return False
+            
+    def get_board_geometry(self) -> Dict[str, Any]:
+        """Get the square, bin and height lookup table"""
+        return self.geometry.to_dict() if self.geometry else {}
+        
+    def _build_geometry(self):
+        """Rebuild the square table and the planner that uses it"""
+        robot_parameters = self.config["robot_parameters"]
+        self.geometry = BoardGeometry(robot_parameters)
+        self.planner = MovePlanner(
+            self.geometry, robot_parameters["move_speed"], robot_parameters["move_accel"]
+        )
+        
     async def jog_joint(self, joint: int, delta: float, speed: float) -> bool:
         """Simulate joint jogging"""
         try:
@@ -184,7 +253,7 @@ class MockAdapter:
                 logger.error(f"Invalid joint number: {joint}")
                 return False
                 
-            with self.state_lock:
+            async with self.motion_lock:
                 target_joints = self.current_joints.copy()
                 target_joints[joint] += delta
                 
@@ -201,12 +270,98 @@ class MockAdapter:
             logger.error(f"Mock joint jog error: {e}")
             return False
             
+    async def start_velocity_jog(self, mode: str, max_speed: float,
+                                 z_limits: Optional[Tuple[float, float]] = None) -> bool:
+        """Simulate streaming velocity jog"""
+        try:
+            await self.stop_velocity_jog()
+            
+            jog_config = self.config["jog"]
+            jog = VelocityJogController(
+                mode, max_speed,
+                max_angular_speed=jog_config["max_angular_speed"],
+                max_joint_speed=jog_config["max_joint_speed"],
+                acceleration=jog_config["acceleration"],
+                deadman_timeout=jog_config["deadman_timeout"],
+                z_limits=z_limits
+            )
+            self.velocity_jog = jog
+            self.velocity_jog_task = asyncio.create_task(self._simulate_velocity_jog(jog, jog_config["rate"]))
+            logger.info(f"Mock velocity jog started ({mode})")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Mock velocity jog error: {e}")
+            return False
+            
+    def set_jog_velocity(self, velocity: List[float]):
+        """Update the active jog's velocity setpoint"""
+        if self.velocity_jog is None or self.velocity_jog.released:
+            raise RuntimeError("No velocity jog active")
+        self.velocity_jog.set_target(velocity)
+        
+    async def stop_velocity_jog(self, halt: bool = False):
+        """Release the active jog and wait until the simulated robot stops"""
+        jog = self.velocity_jog
+        if jog is None:
+            return
+        if halt:
+            jog.halt()
+        else:
+            jog.release()
+        await self.wait_velocity_jog()
+        
+    async def wait_velocity_jog(self):
+        """Wait until the active jog ends, by release, halt or deadman trip"""
+        jog, task = self.velocity_jog, self.velocity_jog_task
+        if jog is None:
+            return
+        await asyncio.wait({task})
+        if self.velocity_jog is jog:
+            self.velocity_jog = None
+            self.velocity_jog_task = None
+            logger.info("Mock velocity jog stopped")
+            
+    async def _simulate_velocity_jog(self, jog: VelocityJogController, rate: float):
+        """Integrate the commanded velocity into the simulated pose"""
+        period = 1.0 / min(rate, 50.0)  # no need to simulate faster than 50 Hz
+        try:
+            async with self.motion_lock:
+                self.is_moving = True
+                while not jog.finished:
+                    velocity = jog.step(period, self.current_pose.z)
+                    if jog.mode == JOG_MODE_TCP:
+                        pose = self.current_pose
+                        self.current_pose = TCPPose(
+                            x=pose.x + velocity[0] * period,
+                            y=pose.y + velocity[1] * period,
+                            z=pose.z + velocity[2] * period,
+                            rx=pose.rx + velocity[3] * period,
+                            ry=pose.ry + velocity[4] * period,
+                            rz=pose.rz + velocity[5] * period
+                        )
+                        self.current_speed = math.sqrt(sum(v * v for v in velocity[:3]))
+                    else:
+                        self.current_joints = [joint + v * period for joint, v in zip(self.current_joints, velocity)]
+                        self.current_speed = 0.0
+                    await asyncio.sleep(period)
+                    
+        except Exception as e:
+            logger.error(f"Mock velocity jog simulation error: {e}")
+            
+        finally:
+            self.is_moving = False
+            self.current_speed = 0.0
+            
     async def stop(self) -> bool:
         """Simulate robot stop"""
         try:
-            with self.state_lock:
-                self.is_moving = False
-                self.current_speed = 0.0
+            # Ends any running simulated motion at its next step
+            self.is_moving = False
+            self.motion_aborted = True
+            self.current_speed = 0.0
+            if self.velocity_jog:
+                self.velocity_jog.halt()
                 
             logger.info("Mock robot stopped")
             return True
@@ -218,9 +373,13 @@ class MockAdapter:
     async def emergency_stop(self) -> bool:
         """Simulate emergency stop"""
         try:
-            with self.state_lock:
-                self.is_moving = False
-                self.current_speed = 0.0
+            # Ends any running simulated motion at its next step
+            self.is_moving = False
+            self.motion_aborted = True
+            self.current_speed = 0.0
+            
+            if self.velocity_jog:
+                self.velocity_jog.halt()
                 
             logger.warning("Mock emergency stop activated")
             return True
@@ -243,7 +402,7 @@ class MockAdapter:
     async def move_to_safe_z(self, safe_z: float) -> bool:
         """Simulate move to safe Z"""
         try:
-            with self.state_lock:
+            async with self.motion_lock:
                 target_pose = TCPPose(
                     x=self.current_pose.x,
                     y=self.current_pose.y,
@@ -300,61 +459,110 @@ class MockAdapter:
     async def chess_move(self, from_square: str, to_square: str, promotion: Optional[str] = None) -> bool:
         """Simulate chess move execution"""
         try:
-            # Parse and validate move
-            move_str = from_square + to_square
-            if promotion:
-                move_str += promotion
-                
-            move = chess.Move.from_uci(move_str)
-            
-            if move in self.chess_board.legal_moves:
-                # Simulate robot movement time
-                move_duration = random.uniform(3.0, 8.0)  # 3-8 seconds per move
-                
-                logger.info(f"Mock executing chess move: {move_str} (duration: {move_duration:.1f}s)")
-                
-                # Simulate piece pickup and placement
-                await asyncio.sleep(move_duration * 0.3)  # Move to source
-                await asyncio.sleep(move_duration * 0.2)  # Pick up piece
-                await asyncio.sleep(move_duration * 0.3)  # Move to destination
-                await asyncio.sleep(move_duration * 0.2)  # Place piece
-                
-                # Update board state
-                self.chess_board.push(move)
-                
-                logger.info(f"Mock chess move completed: {move_str}")
-                return True
-            else:
-                logger.error(f"Mock illegal chess move: {move_str}")
-                return False
+            async with self.motion_lock:
+                # Parse and validate move
+                move_str = from_square + to_square
+                if promotion:
+                    move_str += promotion
+                    
+                move = chess.Move.from_uci(move_str)
                 
+                if move in self.chess_board.legal_moves:
+                    program = self.planner.plan(
+                        self.chess_board, move,
+                        start=[self.current_pose.x, self.current_pose.y, self.current_pose.z]
+                    )
+                    
+                    logger.info(f"Mock executing chess move: {move_str} (estimated {program.estimated_time:.1f}s)")
+                    
+                    # Simulate the planned program step by step, until a stop
+                    started = time.monotonic()
+                    self.motion_aborted = False
+                    for step in program.steps:
+                        await asyncio.sleep(step.duration)
+                        if self.motion_aborted:
+                            logger.warning(f"Mock chess move stopped, board not updated: {move_str}")
+                            return False
+                        if step.action == ACTION_TRAVEL:
+                            x, y, z = step.position
+                            self.current_pose = TCPPose(
+                                x=x, y=y, z=z,
+                                rx=self.current_pose.rx, ry=self.current_pose.ry, rz=self.current_pose.rz
+                            )
+                    self.last_motion_program = program
+                    self.last_cycle_time = time.monotonic() - started
+                    
+                    # Update board state
+                    self.chess_board.push(move)
+                    self.board_version += 1
+                    
+                    logger.info(f"Mock chess move completed: {move_str}")
+                    return True
+                else:
+                    logger.error(f"Mock illegal chess move: {move_str}")
+                    return False
+                    
         except Exception as e:
             logger.error(f"Mock chess move error: {e}")
             return False
             
+    def plan_chess_move(self, from_square: str, to_square: str,
+                        promotion: Optional[str] = None) -> Optional[MotionProgram]:
+        """Plan a move without executing it, None if it is illegal"""
+        try:
+            move = chess.Move.from_uci(from_square + to_square + (promotion or ""))
+            return self.planner.plan(
+                self.chess_board, move,
+                start=[self.current_pose.x, self.current_pose.y, self.current_pose.z]
+            )
+        except ValueError as e:
+            logger.error(f"Mock cannot plan chess move: {e}")
+            return None
+            
+    def get_engine_stats(self) -> Dict[str, Any]:
+        """Get simulated engine statistics"""
+        return {
+            "size": 1,
+            "idle": 0 if self.engine_analyzing else 1,
+            "busy": 1 if self.engine_analyzing else 0,
+            "mock": True,
+            "book": self.opening_book.get_stats() if self.opening_book else {},
+            "tablebase": self.tablebase.get_stats() if self.tablebase else {}
+        }
+        
+    def get_motion_stats(self) -> Dict[str, Any]:
+        """Get the last motion program and its measured cycle time"""
+        program = self.last_motion_program
+        return {
+            "last_program": program.to_dict() if program else None,
+            "last_cycle_time": self.last_cycle_time
+        }
+        
     async def chess_remove_piece(self, square: str) -> bool:
         """Simulate piece removal"""
         try:
-            square_index = chess.parse_square(square)
-            piece = self.chess_board.piece_at(square_index)
-            
-            if piece:
-                # Simulate removal time
-                removal_duration = random.uniform(2.0, 4.0)
-                
-                logger.info(f"Mock removing piece from {square} (duration: {removal_duration:.1f}s)")
-                
-                await asyncio.sleep(removal_duration)
-                
-                # Remove piece from board
-                self.chess_board.remove_piece_at(square_index)
-                
-                logger.info(f"Mock piece removed from {square}")
-                return True
-            else:
-                logger.error(f"Mock no piece at {square}")
-                return False
+            async with self.motion_lock:
+                square_index = chess.parse_square(square)
+                piece = self.chess_board.piece_at(square_index)
                 
+                if piece:
+                    # Simulate removal time
+                    removal_duration = random.uniform(2.0, 4.0)
+                    
+                    logger.info(f"Mock removing piece from {square} (duration: {removal_duration:.1f}s)")
+                    
+                    await asyncio.sleep(removal_duration)
+                    
+                    # Remove piece from board
+                    self.chess_board.remove_piece_at(square_index)
+                    self.board_version += 1
+                    
+                    logger.info(f"Mock piece removed from {square}")
+                    return True
+                else:
+                    logger.error(f"Mock no piece at {square}")
+                    return False
+                    
         except Exception as e:
             logger.error(f"Mock piece removal error: {e}")
             return False
@@ -383,26 +591,66 @@ class MockAdapter:
                 running=self.engine_analyzing,
                 eval=self.last_analysis.get("eval") if self.last_analysis else None,
                 bestmove=self.last_analysis.get("bestmove") if self.last_analysis else None,
-                depth=self.last_analysis.get("depth") if self.last_analysis else None
+                depth=self.last_analysis.get("depth") if self.last_analysis else None,
+                state="searching" if self.engine_analyzing else "idle",
+                engines=1,
+                nps=1000000 if self.engine_analyzing else None,
+                uptime=time.time() - self.engine_started_at if self.engine_started_at else 0.0,
+                restarts=0
             )
             
         except Exception as e:
             logger.error(f"Mock engine status error: {e}")
             return EngineStatus(running=False)
             
-    async def analyze_position(self, fen: str, depth: Optional[int] = None, time_limit: Optional[float] = None) -> Dict[str, Any]:
-        """Simulate position analysis"""
+    async def analyze_position(self, fen: str, depth: Optional[int] = None, time_limit: Optional[float] = None,
+                               on_info: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+                               priority: Optional[Callable[[], int]] = None,
+                               preemptible: bool = False) -> Dict[str, Any]:
+        """Simulate position analysis, reporting each completed depth to ``on_info``
+        
+        Positions in the opening book or the endgame tablebase are answered
+        without a simulated search. The simulated engine never queues, so
+        ``priority`` and ``preemptible`` are ignored.
+        """
         try:
+            board = chess.Board(fen)
+            book_move = self.opening_book.probe(board) if self.opening_book else None
+            if book_move:
+                self.last_analysis = book_move
+                self.engine_version += 1
+                return book_move
+                
+            tablebase_move = self.tablebase.probe(board) if self.tablebase else None
+            if tablebase_move:
+                self.last_analysis = tablebase_move
+                self.engine_version += 1
+                return tablebase_move
+                
             self.engine_analyzing = True
+            self.engine_version += 1
             
-            # Simulate analysis time
-            analysis_time = time_limit if time_limit else (depth * 0.1 if depth else 1.0)
-            await asyncio.sleep(min(analysis_time, 5.0))  # Cap at 5 seconds for simulation
-            
-            # Generate mock analysis results
-            board = chess.Board(fen)
             legal_moves = list(board.legal_moves)
             
+            # Simulate analysis time, one info line per depth
+            analysis_time = time_limit if time_limit else (depth * 0.1 if depth else 1.0)
+            analysis_time = min(analysis_time, 5.0)  # Cap at 5 seconds for simulation
+            steps = depth or 15
+            for step in range(1, steps + 1):
+                await asyncio.sleep(analysis_time / steps)
+                if on_info and legal_moves:
+                    move = legal_moves[step % len(legal_moves)]
+                    await on_info({
+                        "bestmove": str(move),
+                        "eval": random.randint(-300, 300),
+                        "mate": None,
+                        "depth": step,
+                        "pv": [str(move)],
+                        "nodes": step * 50000,
+                        "nps": 1000000
+                    })
+                    
+            # Generate mock analysis results
             if legal_moves:
                 best_move = random.choice(legal_moves)
                 eval_score = random.randint(-300, 300)  # Centipawns
@@ -422,13 +670,20 @@ class MockAdapter:
                 }
                 
             self.engine_analyzing = False
+            self.engine_version += 1
             
             logger.info(f"Mock analysis completed: {self.last_analysis}")
             return self.last_analysis
             
+        except asyncio.CancelledError:
+            self.engine_analyzing = False
+            self.engine_version += 1
+            raise
+            
         except Exception as e:
             logger.error(f"Mock analysis error: {e}")
             self.engine_analyzing = False
+            self.engine_version += 1
             return {"error": str(e)}
             
     async def _simulate_movement(self, target_pose: Optional[TCPPose], target_joints: Optional[List[float]], duration: float):
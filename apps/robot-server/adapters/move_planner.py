@@ -0,0 +1,208 @@
+"""
+Move planner for UR10 Robot Server
+Turns one chess move into a single motion program covering captures,
+castling, en passant and promotion, ordered to minimise travel
+"""
+
+import itertools
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import chess
+
+from adapters.board_geometry import BoardGeometry, square_name
+
+# Seconds spent in contact: force-mode lowering plus magnet on, and magnet off
+PICK_DWELL = 0.8
+PLACE_DWELL = 0.4
+
+# Step actions
+ACTION_TRAVEL = "travel"
+ACTION_PICK = "pick"
+ACTION_PLACE = "place"
+
+Point = Tuple[float, float, float]
+
+@dataclass
+class PieceTransfer:
+    """Carry one piece from ``source`` to ``target``; ``None`` is the bin"""
+    source: Optional[int]
+    target: Optional[int]
+    piece: str
+    reason: str
+    
+    @property
+    def move(self) -> chess.Move:
+        """Equivalent move for the robot API, the same square twice for the bin"""
+        square = self.source if self.source is not None else self.target
+        return chess.Move(square, self.target if self.target is not None else square)
+        
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "from": square_name(self.source) if self.source is not None else "bin",
+            "to": square_name(self.target) if self.target is not None else "bin",
+            "piece": self.piece,
+            "reason": self.reason
+        }
+
+@dataclass
+class MotionStep:
+    """One segment of a motion program"""
+    action: str
+    position: Point
+    duration: float
+    transfer: PieceTransfer
+    at_bin: bool = False
+
+@dataclass
+class MotionProgram:
+    """Ordered steps for one chess move and their estimated cycle time"""
+    move: str
+    transfers: List[PieceTransfer] = field(default_factory=list)
+    steps: List[MotionStep] = field(default_factory=list)
+    travel_distance: float = 0.0
+    estimated_time: float = 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "move": self.move,
+            "transfers": [transfer.to_dict() for transfer in self.transfers],
+            "steps": len(self.steps),
+            "travel_distance": self.travel_distance,
+            "estimated_time": self.estimated_time
+        }
+
+class MovePlanner:
+    """Plans piece transfers for a move over a ``BoardGeometry``
+    
+    Every transfer is pick at the source, carry at lift height, place at the
+    target; consecutive transfers travel directly between hover points
+    without returning home. Transfer order is the cheapest one that still
+    clears a square before another piece is placed on it. Durations assume
+    a trapezoidal velocity profile at ``move_speed`` and ``move_accel``.
+    """
+    
+    def __init__(self, geometry: BoardGeometry, move_speed: float, move_accel: float):
+        self.geometry = geometry
+        self.move_speed = move_speed
+        self.move_accel = move_accel
+        
+    def plan(self, board: chess.Board, move: chess.Move,
+             start: Optional[Sequence[float]] = None) -> MotionProgram:
+        """Plan ``move`` on ``board``, starting from TCP position ``start`` if known
+        
+        Every pick and place is preceded by a travel to its hover point, so
+        the robot never starts a pick wherever the tool happens to be; from
+        an unknown start the first travel is not costed.
+        """
+        if move not in board.legal_moves:
+            raise ValueError(f"Illegal move: {move.uci()}")
+            
+        transfers = self._order(self.transfers(board, move), start)
+        program = MotionProgram(move=move.uci(), transfers=transfers)
+        
+        position: Optional[Point] = tuple(start[:3]) if start else None
+        for transfer in transfers:
+            for action, square in ((ACTION_PICK, transfer.source), (ACTION_PLACE, transfer.target)):
+                hover = self._hover(square)
+                distance = math.dist(position, hover) if position is not None else 0.0
+                program.travel_distance += distance
+                program.steps.append(MotionStep(
+                    ACTION_TRAVEL, hover, self._travel_time(distance), transfer, square is None
+                ))
+                program.steps.append(MotionStep(
+                    action, hover, self._contact_time(action, square), transfer, square is None
+                ))
+                position = hover
+                
+        program.estimated_time = sum(step.duration for step in program.steps)
+        return program
+        
+    def transfers(self, board: chess.Board, move: chess.Move) -> List[PieceTransfer]:
+        """Piece transfers that make up ``move``, in no particular order"""
+        piece = board.piece_at(move.from_square).symbol()
+        
+        if board.is_castling(move):
+            rank = chess.square_rank(move.from_square)
+            if board.is_kingside_castling(move):
+                rook_from, rook_to = chess.square(7, rank), chess.square(5, rank)
+            else:
+                rook_from, rook_to = chess.square(0, rank), chess.square(3, rank)
+            rook = board.piece_at(rook_from).symbol()
+            return [
+                PieceTransfer(move.from_square, move.to_square, piece, "castling"),
+                PieceTransfer(rook_from, rook_to, rook, "castling")
+            ]
+            
+        transfers = []
+        if board.is_en_passant(move):
+            captured = chess.square(chess.square_file(move.to_square), chess.square_rank(move.from_square))
+            transfers.append(PieceTransfer(captured, None, board.piece_at(captured).symbol(), "en_passant"))
+        elif board.piece_at(move.to_square):
+            transfers.append(PieceTransfer(move.to_square, None, board.piece_at(move.to_square).symbol(), "capture"))
+            
+        if move.promotion:
+            promoted = chess.Piece(move.promotion, board.turn).symbol()
+            transfers.append(PieceTransfer(move.from_square, None, piece, "promotion"))
+            transfers.append(PieceTransfer(None, move.to_square, promoted, "promotion"))
+        else:
+            transfers.append(PieceTransfer(move.from_square, move.to_square, piece, "move"))
+        return transfers
+        
+    def _order(self, transfers: List[PieceTransfer], start: Optional[Sequence[float]]) -> List[PieceTransfer]:
+        """Cheapest order in which no piece is placed on an occupied square"""
+        best, best_cost = transfers, math.inf
+        # At most three transfers per move, so trying every order is cheap
+        for order in itertools.permutations(transfers):
+            if not self._is_valid_order(order):
+                continue
+            position = tuple(start[:3]) if start else None
+            cost = 0.0
+            for transfer in order:
+                for square in (transfer.source, transfer.target):
+                    hover = self._hover(square)
+                    if position is not None:
+                        cost += math.dist(position, hover)
+                    position = hover
+            if cost < best_cost:
+                best, best_cost = list(order), cost
+        return best
+        
+    @staticmethod
+    def _is_valid_order(order: Sequence[PieceTransfer]) -> bool:
+        """Whether every square is vacated before a piece is placed on it"""
+        vacated = set()
+        for transfer in order:
+            if transfer.target is not None and transfer.target in (
+                other.source for other in order if other is not transfer
+            ) and transfer.target not in vacated:
+                return False
+            if transfer.source is not None:
+                vacated.add(transfer.source)
+        return True
+        
+    def _hover(self, square: Optional[int]) -> Point:
+        """Point above a square at lift height, or the bin drop point"""
+        if square is None:
+            return self.geometry.bin_position
+        x, y = self.geometry.squares[square]
+        return (x, y, self.geometry.heights["lift"])
+        
+    def _travel_time(self, distance: float) -> float:
+        """Time for a point-to-point move with a trapezoidal velocity profile"""
+        if distance <= 0:
+            return 0.0
+        ramp = self.move_speed ** 2 / self.move_accel
+        if distance < ramp:
+            return 2 * math.sqrt(distance / self.move_accel)
+        return distance / self.move_speed + self.move_speed / self.move_accel
+        
+    def _contact_time(self, action: str, square: Optional[int]) -> float:
+        """Time to descend, grip or release, and lift back to hover height"""
+        dwell = PICK_DWELL if action == ACTION_PICK else PLACE_DWELL
+        if square is None:
+            # Pieces are dropped into and taken from the bin at hover height
+            return dwell
+        height = self.geometry.heights["lift"] - self.geometry.heights["board"]
+        return dwell + 2 * self._travel_time(height)
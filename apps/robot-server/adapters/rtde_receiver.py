@@ -0,0 +1,201 @@
+"""
+RTDE receiver for UR10 Robot Server
+Reads robot state on a dedicated thread at the controller's native rate and
+publishes it through a double buffer the asyncio side reads without locks
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List, Optional
+
+try:
+    import rtde_receive
+    RTDE_AVAILABLE = True
+except ImportError:
+    RTDE_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Only the outputs we publish are requested in the RTDE recipe
+RTDE_VARIABLES = [
+    "timestamp", "actual_q", "actual_qd", "actual_current", "joint_temperatures",
+    "actual_TCP_pose", "actual_TCP_speed", "actual_digital_input_bits",
+    "actual_digital_output_bits", "robot_mode", "safety_mode"
+]
+
+# Seconds to wait before recreating a failed receive interface
+RECONNECT_DELAY = 1.0
+
+@dataclass
+class RobotStateSample:
+    """One RTDE sample; ``received_at`` is ``time.monotonic()`` on arrival"""
+    seq: int = 0
+    received_at: float = 0.0
+    controller_time: float = 0.0
+    joints: List[float] = field(default_factory=lambda: [0.0] * 6)
+    joint_speeds: List[float] = field(default_factory=lambda: [0.0] * 6)
+    joint_currents: List[float] = field(default_factory=lambda: [0.0] * 6)
+    joint_temperatures: List[float] = field(default_factory=lambda: [0.0] * 6)
+    tcp_pose: List[float] = field(default_factory=lambda: [0.0] * 6)
+    tcp_speed: List[float] = field(default_factory=lambda: [0.0] * 6)
+    digital_inputs: int = 0
+    digital_outputs: int = 0
+    robot_mode: int = -1
+    safety_mode: int = -1
+
+class RTDEReceiver:
+    """Background RTDE reader with a double-buffered, sequence-checked snapshot
+    
+    The thread fills the back buffer and then bumps ``seq``, which flips the
+    front buffer. Readers copy the front buffer and retry if ``seq`` moved
+    while they were copying, so neither side ever blocks the other.
+    """
+    
+    def __init__(self, hostname: str, frequency: float):
+        self.hostname = hostname
+        self.frequency = frequency
+        self.period = 1.0 / frequency
+        
+        self.buffers = (RobotStateSample(), RobotStateSample())
+        self.seq = 0
+        
+        self.interface = None
+        self.thread: Optional[threading.Thread] = None
+        self.stop_event = threading.Event()
+        
+        # Statistics
+        self.samples = 0
+        self.errors = 0
+        self.read_retries = 0
+        self.overruns = 0
+        self.started_at = 0.0
+        
+    @property
+    def running(self) -> bool:
+        """Whether the receiver thread is alive"""
+        return self.thread is not None and self.thread.is_alive()
+        
+    def start(self):
+        """Start the receiver thread"""
+        if not RTDE_AVAILABLE:
+            raise RuntimeError("ur_rtde is not installed")
+        if self.running:
+            return
+            
+        self.stop_event.clear()
+        self.started_at = time.monotonic()
+        self.thread = threading.Thread(target=self._run, name="rtde-receiver", daemon=True)
+        self.thread.start()
+        logger.info(f"RTDE receiver started for {self.hostname} at {self.frequency:g} Hz")
+        
+    def stop(self, timeout: float = 2.0):
+        """Stop the receiver thread and close the receive interface"""
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+            self.thread = None
+        logger.info("RTDE receiver stopped")
+        
+    def read(self) -> Optional[RobotStateSample]:
+        """Latest sample, or ``None`` before the first one arrives"""
+        while True:
+            seq = self.seq
+            if seq == 0:
+                return None
+            sample = replace(self.buffers[seq & 1])
+            if self.seq == seq:
+                return sample
+            self.read_retries += 1
+            
+    def age(self) -> Optional[float]:
+        """Seconds since the latest sample arrived"""
+        sample = self.read()
+        return time.monotonic() - sample.received_at if sample else None
+        
+    def get_stats(self) -> Dict[str, Any]:
+        """Get receive rate and error statistics"""
+        elapsed = time.monotonic() - self.started_at if self.started_at else 0.0
+        age = self.age()
+        return {
+            "running": self.running,
+            "connected": self.interface is not None,
+            "target_rate_hz": self.frequency,
+            "actual_rate_hz": self.samples / elapsed if elapsed > 0 else 0.0,
+            "samples": self.samples,
+            "errors": self.errors,
+            "overruns": self.overruns,
+            "read_retries": self.read_retries,
+            "age_ms": age * 1000 if age is not None else None
+        }
+        
+    def _run(self):
+        """Receive loop, paced against the monotonic clock"""
+        deadline = time.monotonic()
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    if self.interface is None:
+                        self.interface = rtde_receive.RTDEReceiveInterface(
+                            self.hostname, self.frequency, RTDE_VARIABLES
+                        )
+                        logger.info(f"RTDE receive interface connected to {self.hostname}")
+                        deadline = time.monotonic()
+                        
+                    self._receive()
+                    
+                except Exception as e:
+                    self.errors += 1
+                    logger.error(f"RTDE receive error: {e}")
+                    self._close_interface()
+                    if self.stop_event.wait(RECONNECT_DELAY):
+                        break
+                    deadline = time.monotonic()
+                    continue
+                    
+                deadline += self.period
+                now = time.monotonic()
+                if now > deadline:
+                    # Fell behind, resume on the next period boundary
+                    self.overruns += 1
+                    deadline += ((now - deadline) // self.period + 1) * self.period
+                self.stop_event.wait(deadline - now)
+        finally:
+            self._close_interface()
+            
+    def _receive(self):
+        """Fill the back buffer from the receive interface and publish it"""
+        rtde = self.interface
+        if not rtde.isConnected():
+            raise ConnectionError("RTDE receive interface disconnected")
+            
+        seq = self.seq + 1
+        sample = self.buffers[seq & 1]
+        sample.seq = seq
+        sample.received_at = time.monotonic()
+        sample.controller_time = rtde.getTimestamp()
+        sample.joints = rtde.getActualQ()
+        sample.joint_speeds = rtde.getActualQd()
+        sample.joint_currents = rtde.getActualCurrent()
+        sample.joint_temperatures = rtde.getJointTemperatures()
+        sample.tcp_pose = rtde.getActualTCPPose()
+        sample.tcp_speed = rtde.getActualTCPSpeed()
+        sample.digital_inputs = rtde.getActualDigitalInputBits()
+        sample.digital_outputs = rtde.getActualDigitalOutputBits()
+        sample.robot_mode = rtde.getRobotMode()
+        sample.safety_mode = rtde.getSafetyMode()
+        
+        # Bumping seq is what publishes the buffer to readers
+        self.seq = seq
+        self.samples += 1
+        
+    def _close_interface(self):
+        """Disconnect and drop the receive interface"""
+        if self.interface is None:
+            return
+        try:
+            self.interface.disconnect()
+        except Exception as e:
+            logger.warning(f"Error closing RTDE receive interface: {e}")
+        self.interface = None
@@ -4,12 +4,15 @@ This adapter provides async interface to the synchronous robot functions
 """
 
 import asyncio
+import copy
 import logging
 import time
 import sys
 import os
-from typing import Dict, Any, Optional, List
+import shutil
 import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, List, Tuple, Callable, Awaitable, Iterator
 from concurrent.futures import ThreadPoolExecutor
 
 # Add the UR10_Workspace src directory to Python path
@@ -21,18 +24,27 @@ if os.path.exists(ur10_workspace_path):
 try:
     # Import UR10_Workspace modules
     from robot_api.api import (
-        translate, move_to_square, forcemode_lower, lift_piece, lower_piece,
-        send_command_to_robot, disconnect_from_robot, direct_move_piece, remove_piece
+        move_to_square, forcemode_lower, lift_piece, lower_piece,
+        send_command_to_robot, disconnect_from_robot, remove_piece
     )
-    import chess
-    import chess.engine
     import yaml
     UR10_AVAILABLE = True
 except ImportError as e:
     logging.warning(f"UR10_Workspace modules not available: {e}")
     UR10_AVAILABLE = False
 
+import chess
+import chess.engine
+
 from models.schemas import TCPPose, BoardState, EngineStatus, IOMap
+from core.engine_pool import EnginePool, Priority
+from core.opening_book import OpeningBook
+from core.endgame_tablebase import EndgameTablebase
+from adapters.ur_connection import URConnectionManager, ConnectionListener, UR_RTDE_AVAILABLE
+from adapters.command_worker import RobotCommandWorker, CommandWithdrawnError
+from adapters.velocity_jog import VelocityJogController, JOG_MODE_TCP
+from adapters.board_geometry import BoardGeometry
+from adapters.move_planner import MovePlanner, MotionProgram, PieceTransfer, ACTION_TRAVEL, ACTION_PICK
 
 logger = logging.getLogger(__name__)
 
@@ -43,7 +55,10 @@ class UR10Adapter:
         self.connected = False
         self.config = None
         self.chess_board = None
-        self.stockfish_engine = None
+        self.engine_pool: Optional[EnginePool] = None
+        self.opening_book: Optional[OpeningBook] = None
+        self.tablebase: Optional[EndgameTablebase] = None
+        self.last_analysis: Optional[Dict[str, Any]] = None
         self.executor = ThreadPoolExecutor(max_workers=4)
         
         # Robot state
@@ -52,9 +67,39 @@ class UR10Adapter:
         self.current_speed = 0.0
         self.io_state = IOMap()
         
-        # Thread-safe locks
-        self.robot_lock = threading.Lock()
-        self.board_lock = threading.Lock()
+        # Square/bin coordinates, rebuilt only when the calibration changes
+        self.geometry: Optional[BoardGeometry] = None
+        self.planner: Optional[MovePlanner] = None
+        self.last_motion_program: Optional[MotionProgram] = None
+        self.last_cycle_time = 0.0
+        
+        # Persistent robot links, opened on connect
+        self.connection: Optional[URConnectionManager] = None
+        self.connection_listeners: List[ConnectionListener] = []
+        
+        # Robot commands run in order on a single robot-worker thread
+        self.commands = RobotCommandWorker()
+        
+        # Set by a stop, so the running command ends at its next robot_api
+        # call; cleared by the next command submitted
+        self.motion_abort = threading.Event()
+        
+        # Active hold-to-jog stream and the worker command running it
+        self.velocity_jog: Optional[VelocityJogController] = None
+        self.velocity_jog_task: Optional[asyncio.Future] = None
+        
+        # Held from move validation until the board is updated; board reads
+        # happen on the event loop and need no lock
+        self.board_lock = asyncio.Lock()
+        
+        # Bumped on every board / engine status change so callers can cache
+        self.board_version = 0
+        self.engine_version = 0
+        
+    @property
+    def engine_started_at(self) -> Optional[float]:
+        """When the engine pool was started, None while it is stopped"""
+        return self.engine_pool.started_at if self.engine_pool else None
         
     async def initialize(self, config: Dict[str, Any]):
         """Initialize the adapter with configuration"""
@@ -62,11 +107,24 @@ class UR10Adapter:
             if not UR10_AVAILABLE:
                 raise Exception("UR10_Workspace modules not available")
                 
-            self.config = config
+            # Own copy, so calibration updates never touch the shared template
+            self.config = copy.deepcopy(config)
+            self._build_geometry()
             
             # Initialize chess board
             self.chess_board = chess.Board()
+            self.board_version += 1
             
+            # Load the opening book, if one is configured
+            if self.config["engine"]["opening_book"]:
+                self.opening_book = OpeningBook(self.config["engine"]["opening_book"])
+                self.opening_book.open()
+                
+            # Open the endgame tablebase, if one is configured
+            if self.config["engine"]["syzygy"]:
+                self.tablebase = EndgameTablebase(self.config["engine"]["syzygy"])
+                self.tablebase.open()
+                
             # Initialize stockfish engine
             await self._initialize_stockfish()
             
@@ -80,14 +138,19 @@ class UR10Adapter:
     async def cleanup(self):
         """Cleanup adapter resources"""
         try:
-            if self.stockfish_engine:
-                await asyncio.get_event_loop().run_in_executor(
-                    self.executor, self.stockfish_engine.quit
-                )
+            if self.engine_pool:
+                await self.engine_pool.stop()
+                
+            if self.opening_book:
+                self.opening_book.close()
+                
+            if self.tablebase:
+                self.tablebase.close()
                 
             if self.connected:
                 await self.disconnect()
                 
+            await asyncio.get_event_loop().run_in_executor(self.executor, self.commands.stop)
             self.executor.shutdown(wait=True)
             logger.info("UR10 Adapter cleaned up")
             
@@ -102,8 +165,33 @@ class UR10Adapter:
                 self.config["robot"]["hostname"] = hostname
                 self.config["robot"]["host_port"] = port
                 
-            # Test connection by attempting to get robot state
-            # In the original code, connection is established when needed
+            # Hold RTDE control/receive and dashboard links open, with a
+            # watchdog that reconnects them in the background
+            if UR_RTDE_AVAILABLE:
+                if self.connection:
+                    await self.connection.disconnect()
+                    self.connection.shutdown()
+                    
+                robot = self.config["robot"] if self.config else {}
+                self.connection = URConnectionManager(
+                    hostname,
+                    receive_frequency=robot.get("rtde_receive_frequency", 125.0),
+                    connect_timeout=robot.get("connect_timeout", 5.0),
+                    keepalive_interval=robot.get("keepalive_interval", 1.0),
+                    liveness_timeout=robot.get("liveness_timeout", 0.5),
+                    backoff_initial=robot.get("reconnect_backoff_initial", 0.5),
+                    backoff_max=robot.get("reconnect_backoff_max", 30.0)
+                )
+                for listener in self.connection_listeners:
+                    self.connection.add_listener(listener)
+                    
+                if not await self.connection.connect():
+                    return False
+            else:
+                logger.warning("ur_rtde not installed, telemetry will not reflect the real robot")
+                
+            # Travel moves and jogs use the persistent control link, which is
+            # released while robot_api's helpers run on their own
             self.connected = True
             logger.info(f"Connected to robot at {hostname}:{port}")
             return True
@@ -116,11 +204,14 @@ class UR10Adapter:
     async def disconnect(self):
         """Disconnect from robot"""
         try:
+            if self.connection:
+                await self.connection.disconnect()
+                self.connection.shutdown()
+                self.connection = None
+                
             if self.connected:
-                # Call the original disconnect function
-                await asyncio.get_event_loop().run_in_executor(
-                    self.executor, disconnect_from_robot
-                )
+                # Call the original disconnect function, after any queued motion
+                await self._submit("disconnect", disconnect_from_robot)
                 self.connected = False
                 logger.info("Disconnected from robot")
                 
@@ -129,21 +220,42 @@ class UR10Adapter:
             
     def is_connected(self) -> bool:
         """Check if connected to robot"""
+        if self.connection:
+            return self.connected and self.connection.is_connected()
         return self.connected
         
+    def add_connection_listener(self, listener: ConnectionListener):
+        """Register ``listener(old_state, new_state, reason)`` for link state changes"""
+        self.connection_listeners.append(listener)
+        if self.connection:
+            self.connection.add_listener(listener)
+            
+    def get_command_stats(self) -> Dict[str, Any]:
+        """Get robot command queue statistics"""
+        return self.commands.get_stats()
+        
+    def get_engine_stats(self) -> Dict[str, Any]:
+        """Get engine pool utilisation and queueing statistics, and book and tablebase hits"""
+        stats = self.engine_pool.get_stats() if self.engine_pool else {}
+        if self.opening_book:
+            stats["book"] = self.opening_book.get_stats()
+        if self.tablebase:
+            stats["tablebase"] = self.tablebase.get_stats()
+        return stats
+        
+    def get_connection_stats(self) -> Dict[str, Any]:
+        """Get robot link state and reconnect statistics"""
+        if self.connection:
+            return self.connection.get_stats()
+        return {"state": "connected" if self.connected else "disconnected"}
+        
     async def home(self) -> bool:
         """Home the robot"""
         try:
-            with self.robot_lock:
-                # Move to a known home position
-                # This would typically be a predefined safe position
-                home_pose = [0.3, 0.0, 0.3, 0.0, 0.0, 0.0]  # Example home position
-                
-                # Use move_to_square with a safe position
-                await asyncio.get_event_loop().run_in_executor(
-                    self.executor, move_to_square, "BIN_POSITION", 0.3
-                )
-                
+            # Move to a known home position
+            # This would typically be a predefined safe position
+            await self._submit("home", self._call_robot_api, move_to_square, "BIN_POSITION", 0.3)
+            
             logger.info("Robot homed successfully")
             return True
             
@@ -154,41 +266,12 @@ class UR10Adapter:
     async def jog_tcp(self, axis: str, delta: float, speed: float, frame: str) -> bool:
         """Jog TCP in specified axis"""
         try:
-            with self.robot_lock:
-                # Calculate target position based on current pose and delta
-                current_x, current_y, current_z = self.current_pose.x, self.current_pose.y, self.current_pose.z
-                
-                if axis == "x":
-                    target_x = current_x + delta
-                    target_y = current_y
-                    target_z = current_z
-                elif axis == "y":
-                    target_x = current_x
-                    target_y = current_y + delta
-                    target_z = current_z
-                elif axis == "z":
-                    target_x = current_x
-                    target_y = current_y
-                    target_z = current_z + delta
-                else:
-                    logger.error(f"Unsupported TCP axis: {axis}")
-                    return False
-                    
-                # Use the translate function to calculate robot coordinates
-                robot_pos = await asyncio.get_event_loop().run_in_executor(
-                    self.executor, translate, target_x, target_y
-                )
-                
-                # Move to the calculated position
-                await asyncio.get_event_loop().run_in_executor(
-                    self.executor, move_to_square, robot_pos, target_z
-                )
-                
-                # Update current pose
-                self.current_pose.x = target_x
-                self.current_pose.y = target_y
-                self.current_pose.z = target_z
+            if axis not in ("x", "y", "z"):
+                logger.error(f"Unsupported TCP axis: {axis}")
+                return False
                 
+            await self._submit(f"jog_tcp {axis}", self._jog_tcp_sync, axis, delta)
+            
             logger.info(f"TCP jogged {axis} by {delta}")
             return True
             
@@ -196,28 +279,165 @@ class UR10Adapter:
             logger.error(f"Error jogging TCP: {e}")
             return False
             
+    def _jog_tcp_sync(self, axis: str, delta: float):
+        """Jog on the robot worker, so the pose read and update are serialized"""
+        # current_pose is the robot-frame TCP pose reported by RTDE, so the
+        # target needs no board calibration transform
+        target_x, target_y, target_z = self.current_pose.x, self.current_pose.y, self.current_pose.z
+        if axis == "x":
+            target_x += delta
+        elif axis == "y":
+            target_y += delta
+        else:
+            target_z += delta
+            
+        # Move to the calculated position
+        self._move_to_sync([target_x, target_y], target_z)
+        
+        # Update current pose
+        self.current_pose = TCPPose(
+            x=target_x, y=target_y, z=target_z,
+            rx=self.current_pose.rx, ry=self.current_pose.ry, rz=self.current_pose.rz
+        )
+        
+    def update_calibration(self, parameters: Dict[str, Any]) -> bool:
+        """Apply board calibration values, rebuilding the square table if they changed"""
+        try:
+            robot_parameters = self.config["robot_parameters"]
+            robot_parameters.update(parameters)
+            if self.geometry is None or BoardGeometry.calibration_key(robot_parameters) != self.geometry.key:
+                self._build_geometry()
+                logger.info("Board geometry rebuilt for new calibration")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error updating calibration: {e}")
+            return False
+            
+    def get_board_geometry(self) -> Dict[str, Any]:
+        """Get the square, bin and height lookup table"""
+        return self.geometry.to_dict() if self.geometry else {}
+        
+    def _build_geometry(self):
+        """Rebuild the square table and the planner that uses it"""
+        robot_parameters = self.config["robot_parameters"]
+        self.geometry = BoardGeometry(robot_parameters)
+        self.planner = MovePlanner(
+            self.geometry, robot_parameters["move_speed"], robot_parameters["move_accel"]
+        )
+        
     async def jog_joint(self, joint: int, delta: float, speed: float) -> bool:
         """Jog specific joint"""
         try:
-            with self.robot_lock:
-                # Joint jogging would require direct joint control
-                # This is more complex and would need RTDE interface
-                logger.warning("Joint jogging not fully implemented")
-                return True
-                
+            # Joint jogging would require direct joint control
+            # This is more complex and would need RTDE interface
+            logger.warning("Joint jogging not fully implemented")
+            return True
+            
         except Exception as e:
             logger.error(f"Error jogging joint: {e}")
             return False
             
+    async def start_velocity_jog(self, mode: str, max_speed: float,
+                                 z_limits: Optional[Tuple[float, float]] = None) -> bool:
+        """Start streaming speedL/speedJ commands from client setpoints
+        
+        The control loop runs as one command on the robot worker, so it is
+        ordered with every other motion and ends once the jog is released
+        and ramped down.
+        """
+        try:
+            control = self.connection.control if self.connection else None
+            if control is None:
+                logger.error("Velocity jog requires the RTDE control interface")
+                return False
+                
+            await self.stop_velocity_jog()
+            
+            jog_config = self.config["jog"]
+            jog = VelocityJogController(
+                mode, max_speed,
+                max_angular_speed=jog_config["max_angular_speed"],
+                max_joint_speed=jog_config["max_joint_speed"],
+                acceleration=jog_config["acceleration"],
+                deadman_timeout=jog_config["deadman_timeout"],
+                z_limits=z_limits
+            )
+            self.velocity_jog = jog
+            self.velocity_jog_task = self._submit(
+                f"velocity_jog {mode}", self._velocity_jog_sync, jog, control, jog_config["rate"]
+            )
+            logger.info(f"Velocity jog started ({mode})")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error starting velocity jog: {e}")
+            return False
+            
+    def set_jog_velocity(self, velocity: List[float]):
+        """Update the active jog's velocity setpoint"""
+        if self.velocity_jog is None or self.velocity_jog.released:
+            raise RuntimeError("No velocity jog active")
+        self.velocity_jog.set_target(velocity)
+        
+    async def stop_velocity_jog(self, halt: bool = False):
+        """Release the active jog and wait until the robot is at standstill"""
+        jog = self.velocity_jog
+        if jog is None:
+            return
+        if halt:
+            jog.halt()
+        else:
+            jog.release()
+        await self.wait_velocity_jog()
+        
+    async def wait_velocity_jog(self):
+        """Wait until the active jog ends, by release, halt or deadman trip"""
+        jog, task = self.velocity_jog, self.velocity_jog_task
+        if jog is None:
+            return
+        # asyncio.wait, so a cancelled waiter never withdraws the jog command
+        await asyncio.wait({task})
+        if not task.cancelled() and task.exception():
+            logger.error(f"Velocity jog ended with error: {task.exception()}")
+        if self.velocity_jog is jog:
+            self.velocity_jog = None
+            self.velocity_jog_task = None
+            logger.info("Velocity jog stopped")
+            
+    def _velocity_jog_sync(self, jog: VelocityJogController, control, rate: float):
+        """Velocity control loop, run on the robot worker at ``rate`` Hz"""
+        period = 1.0 / rate
+        try:
+            while not jog.finished:
+                period_start = control.initPeriod()
+                
+                receiver = self.connection.receiver if self.connection else None
+                sample = receiver.read() if receiver else None
+                velocity = jog.step(period, sample.tcp_pose[2] if sample else None)
+                
+                if jog.mode == JOG_MODE_TCP:
+                    control.speedL(velocity, jog.acceleration, period)
+                else:
+                    control.speedJ(velocity, jog.acceleration, period)
+                control.waitPeriod(period_start)
+        finally:
+            control.speedStop()
+            
     async def stop(self) -> bool:
         """Stop robot movement"""
         try:
-            with self.robot_lock:
-                # Send stop command to robot
-                # This would typically use the RTDE interface
-                logger.info("Robot stopped")
-                return True
+            # Runs immediately rather than queueing behind the motion it stops
+            self.motion_abort.set()
+            self.commands.cancel_pending()
+            if self.velocity_jog:
+                self.velocity_jog.halt()
                 
+            # Stop the move the worker is running over the persistent link
+            await self._stop_motion(emergency=False)
+            logger.info("Robot stopped")
+            return True
+            
         except Exception as e:
             logger.error(f"Error stopping robot: {e}")
             return False
@@ -225,12 +445,17 @@ class UR10Adapter:
     async def emergency_stop(self) -> bool:
         """Emergency stop robot"""
         try:
-            with self.robot_lock:
-                # Activate emergency stop
-                # This would set digital output or use RTDE emergency stop
-                logger.warning("Emergency stop activated")
-                return True
+            # Drop everything still queued, then stop without waiting in line
+            self.motion_abort.set()
+            self.commands.cancel_pending()
+            if self.velocity_jog:
+                self.velocity_jog.halt()
                 
+            # End the control script, so nothing moves until the stop is cleared
+            await self._stop_motion(emergency=True)
+            logger.warning("Emergency stop activated")
+            return True
+            
         except Exception as e:
             logger.error(f"Error activating emergency stop: {e}")
             return False
@@ -238,27 +463,41 @@ class UR10Adapter:
     async def clear_estop(self) -> bool:
         """Clear emergency stop"""
         try:
-            with self.robot_lock:
-                # Clear emergency stop condition
-                logger.info("Emergency stop cleared")
-                return True
-                
+            # Restart the control script the emergency stop ended
+            if self.connection:
+                await asyncio.get_event_loop().run_in_executor(self.executor, self.connection.resume_control)
+            logger.info("Emergency stop cleared")
+            return True
+            
         except Exception as e:
             logger.error(f"Error clearing emergency stop: {e}")
             return False
             
+    def _submit(self, name: str, fn: Callable[..., Any], *args: Any) -> "asyncio.Future[Any]":
+        """Queue a command on the robot worker, ending any earlier stop"""
+        self.motion_abort.clear()
+        return self.commands.submit(name, fn, *args)
+        
+    def _check_abort(self, step: str):
+        """Raise CommandWithdrawnError if a stop arrived before ``step``"""
+        if self.motion_abort.is_set():
+            raise CommandWithdrawnError(f"Stopped before {step}")
+            
+    async def _stop_motion(self, emergency: bool):
+        """Stop the arm over the control link, outside the robot worker's queue"""
+        if not self.connection:
+            return
+        stopped = await asyncio.get_event_loop().run_in_executor(
+            self.executor, self.connection.stop_motion, emergency
+        )
+        if not stopped:
+            logger.warning("No robot link up to stop the running motion")
+            
     async def move_to_safe_z(self, safe_z: float) -> bool:
         """Move to safe Z position"""
         try:
-            with self.robot_lock:
-                # Move to safe Z while maintaining X,Y position
-                await asyncio.get_event_loop().run_in_executor(
-                    self.executor, move_to_square, 
-                    [self.current_pose.x, self.current_pose.y], safe_z
-                )
-                
-                self.current_pose.z = safe_z
-                
+            await self._submit("move_to_safe_z", self._move_to_safe_z_sync, safe_z)
+            
             logger.info(f"Moved to safe Z: {safe_z}")
             return True
             
@@ -266,17 +505,49 @@ class UR10Adapter:
             logger.error(f"Error moving to safe Z: {e}")
             return False
             
+    def _move_to_safe_z_sync(self, safe_z: float):
+        """Move to safe Z while maintaining X,Y position, on the robot worker"""
+        self._move_to_sync([self.current_pose.x, self.current_pose.y], safe_z)
+        self.current_pose = TCPPose(
+            x=self.current_pose.x, y=self.current_pose.y, z=safe_z,
+            rx=self.current_pose.rx, ry=self.current_pose.ry, rz=self.current_pose.rz
+        )
+        
     async def get_telemetry(self) -> Dict[str, Any]:
         """Get current robot telemetry"""
         try:
-            # In a real implementation, this would query the RTDE interface
-            # For now, return simulated data based on current state
+            # Read the receiver's latest sample, no lock or executor hop needed
+            receiver = self.connection.receiver if self.connection else None
+            sample = receiver.read() if receiver else None
+            if sample is None:
+                return {
+                    "tcp_pose": self.current_pose,
+                    "joints": self.current_joints,
+                    "tcp_speed": self.current_speed,
+                    "iomap": self.io_state
+                }
+                
+            x, y, z, rx, ry, rz = sample.tcp_pose
+            vx, vy, vz = sample.tcp_speed[:3]
+            self.current_pose = TCPPose(x=x, y=y, z=z, rx=rx, ry=ry, rz=rz)
+            self.current_joints = list(sample.joints)
+            self.current_speed = (vx * vx + vy * vy + vz * vz) ** 0.5
+            self.io_state = IOMap(
+                di=[bool(sample.digital_inputs >> i & 1) for i in range(18)],
+                do=[bool(sample.digital_outputs >> i & 1) for i in range(18)]
+            )
             
             return {
                 "tcp_pose": self.current_pose,
                 "joints": self.current_joints,
                 "tcp_speed": self.current_speed,
-                "iomap": self.io_state
+                "iomap": self.io_state,
+                "joint_speeds": sample.joint_speeds,
+                "joint_currents": sample.joint_currents,
+                "joint_temperatures": sample.joint_temperatures,
+                "robot_mode": sample.robot_mode,
+                "safety_mode": sample.safety_mode,
+                "sample_age": time.monotonic() - sample.received_at
             }
             
         except Exception as e:
@@ -284,9 +555,9 @@ class UR10Adapter:
             return {}
             
     async def chess_move(self, from_square: str, to_square: str, promotion: Optional[str] = None) -> bool:
-        """Execute a chess move"""
+        """Execute a chess move as one planned motion program"""
         try:
-            with self.board_lock:
+            async with self.board_lock:
                 # Parse move
                 move_str = from_square + to_square
                 if promotion:
@@ -295,35 +566,144 @@ class UR10Adapter:
                 move = chess.Move.from_uci(move_str)
                 
                 if move in self.chess_board.legal_moves:
-                    # Execute the move with the robot
-                    if self.chess_board.piece_at(chess.parse_square(to_square)):
-                        # Capture move - remove piece first
-                        await asyncio.get_event_loop().run_in_executor(
-                            self.executor, remove_piece, move, self.chess_board, from_square
-                        )
-                    
-                    # Move the piece
-                    await asyncio.get_event_loop().run_in_executor(
-                        self.executor, direct_move_piece, move, False
-                    )
+                    # Captures, castling, en passant and promotion run as a
+                    # single program with shared lifts
+                    program = self.planner.plan(self.chess_board, move, start=self._tcp_position())
+                    started = time.monotonic()
+                    await self._submit(f"chess_move {move_str}", self._run_program_sync, program)
+                    self.last_motion_program = program
+                    self.last_cycle_time = time.monotonic() - started
                     
                     # Update board state
                     self.chess_board.push(move)
+                    self.board_version += 1
                     
-                    logger.info(f"Chess move executed: {move_str}")
+                    logger.info(
+                        f"Chess move executed: {move_str} in {self.last_cycle_time:.1f}s "
+                        f"(estimated {program.estimated_time:.1f}s)"
+                    )
                     return True
                 else:
                     logger.error(f"Illegal chess move: {move_str}")
                     return False
                     
+        except CommandWithdrawnError as e:
+            logger.warning(f"Chess move stopped, board not updated: {e}")
+            return False
+            
         except Exception as e:
             logger.error(f"Error executing chess move: {e}")
             return False
             
+    def plan_chess_move(self, from_square: str, to_square: str,
+                        promotion: Optional[str] = None) -> Optional[MotionProgram]:
+        """Plan a move without executing it, None if it is illegal"""
+        try:
+            move = chess.Move.from_uci(from_square + to_square + (promotion or ""))
+            return self.planner.plan(self.chess_board, move, start=self._tcp_position())
+        except ValueError as e:
+            logger.error(f"Cannot plan chess move: {e}")
+            return None
+            
+    def get_motion_stats(self) -> Dict[str, Any]:
+        """Get the last motion program and its measured cycle time"""
+        program = self.last_motion_program
+        return {
+            "last_program": program.to_dict() if program else None,
+            "last_cycle_time": self.last_cycle_time
+        }
+        
+    def _tcp_position(self) -> Optional[List[float]]:
+        """Latest measured TCP position, if the receiver has one"""
+        pose = self._tcp_pose()
+        return pose[:3] if pose else None
+        
+    def _tcp_pose(self) -> Optional[List[float]]:
+        """Latest measured TCP pose, if the receiver has one"""
+        receiver = self.connection.receiver if self.connection else None
+        sample = receiver.read() if receiver else None
+        return list(sample.tcp_pose) if sample else None
+        
+    def _move_to_sync(self, position: List[float], z: float):
+        """Linear move to ``position`` at height ``z``, keeping the tool orientation
+        
+        Runs on the persistent RTDE control link while it is up, so moves do
+        not pay for robot_api's connection setup. The orientation is taken
+        from the measured TCP pose; without a link or a sample the move goes
+        through robot_api, which applies its own calibrated orientation.
+        """
+        connection = self.connection
+        usable = connection and connection.is_connected() and not connection.control_released
+        control = connection.control if usable else None
+        current = self._tcp_pose() if control is not None else None
+        if current is None:
+            self._call_robot_api(move_to_square, position, z)
+            return
+            
+        parameters = self.config["robot_parameters"]
+        pose = [position[0], position[1], z] + current[3:6]
+        if not control.moveL(pose, parameters["move_speed"], parameters["move_accel"]):
+            raise RuntimeError(f"moveL to {pose} failed")
+            
+    @contextmanager
+    def _robot_api_control(self) -> Iterator[None]:
+        """Release the persistent control link while robot_api drives the robot"""
+        if self.connection is None:
+            yield
+            return
+        with self.connection.released_control():
+            yield
+            
+    def _call_robot_api(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run a robot_api helper on the robot worker, with the control link released"""
+        self._check_abort(fn.__name__)
+        with self._robot_api_control():
+            return fn(*args)
+            
+    def _run_program_sync(self, program: MotionProgram):
+        """Execute a motion program on the robot worker
+        
+        Travel steps run as moveL on the persistent control link; the link
+        is released only while robot_api's pick and place helpers run. A
+        stop ends the program before its next step.
+        """
+        for index, step in enumerate(program.steps):
+            self._check_abort(f"step {index + 1} of {len(program.steps)}")
+            x, y, z = step.position
+            if step.action == ACTION_TRAVEL:
+                self._move_to_sync([x, y], z)
+            elif step.action == ACTION_PICK:
+                self._pick_sync([x, y], step.at_bin)
+            else:
+                self._place_sync(step.transfer, step.at_bin)
+                
+    def _pick_sync(self, position: List[float], at_bin: bool):
+        """Grip the piece below hover ``position`` and lift it
+        
+        Wraps robot_api's ``forcemode_lower()`` and ``lift_piece(pos)``;
+        pieces are taken from the bin at hover height, without force-mode
+        lowering.
+        """
+        self._check_abort("pick")
+        with self._robot_api_control():
+            if not at_bin:
+                forcemode_lower()
+                self._check_abort("lift_piece")
+            lift_piece(position)
+            
+    def _place_sync(self, transfer: PieceTransfer, at_bin: bool):
+        """Put the carried piece down on ``transfer``'s target
+        
+        Wraps robot_api's ``lower_piece(move_instance, removing_piece)``,
+        passing the transfer as a ``chess.Move`` as the original adapter did
+        for ``direct_move_piece``, and ``at_bin`` as ``removing_piece``.
+        """
+        self._call_robot_api(lower_piece, transfer.move, at_bin)
+        
     async def chess_remove_piece(self, square: str) -> bool:
         """Remove a piece from the chess board"""
         try:
-            with self.board_lock:
+            async with self.board_lock:
                 square_index = chess.parse_square(square)
                 piece = self.chess_board.piece_at(square_index)
                 
@@ -331,12 +711,13 @@ class UR10Adapter:
                     # Create a dummy move for the remove_piece function
                     dummy_move = chess.Move(square_index, square_index)
                     
-                    await asyncio.get_event_loop().run_in_executor(
-                        self.executor, remove_piece, dummy_move, self.chess_board, square
+                    await self._submit(
+                        f"remove_piece {square}", self._call_robot_api, remove_piece, dummy_move, self.chess_board, square
                     )
                     
                     # Remove piece from board
                     self.chess_board.remove_piece_at(square_index)
+                    self.board_version += 1
                     
                     logger.info(f"Piece removed from {square}")
                     return True
@@ -351,13 +732,12 @@ class UR10Adapter:
     async def get_board_state(self) -> BoardState:
         """Get current chess board state"""
         try:
-            with self.board_lock:
-                return BoardState(
-                    fen=self.chess_board.fen(),
-                    turn="w" if self.chess_board.turn else "b",
-                    move_no=self.chess_board.fullmove_number
-                )
-                
+            return BoardState(
+                fen=self.chess_board.fen(),
+                turn="w" if self.chess_board.turn else "b",
+                move_no=self.chess_board.fullmove_number
+            )
+            
         except Exception as e:
             logger.error(f"Error getting board state: {e}")
             return BoardState(
@@ -369,29 +749,50 @@ class UR10Adapter:
     async def get_engine_status(self) -> EngineStatus:
         """Get chess engine status"""
         try:
-            if self.stockfish_engine:
-                # Check if engine is analyzing
+            if self.engine_pool and self.engine_pool.running:
                 return EngineStatus(
-                    running=True,  # Simplified - would check actual status
-                    eval=None,
-                    bestmove=None,
-                    depth=None
+                    running=True,
+                    eval=self.last_analysis.get("eval") if self.last_analysis else None,
+                    bestmove=self.last_analysis.get("bestmove") if self.last_analysis else None,
+                    depth=self.last_analysis.get("depth") if self.last_analysis else None,
+                    **self.engine_pool.get_status()
                 )
             else:
-                return EngineStatus(running=False)
+                return EngineStatus(running=False, restarts=self.engine_pool.restarts if self.engine_pool else 0)
                 
         except Exception as e:
             logger.error(f"Error getting engine status: {e}")
             return EngineStatus(running=False)
             
-    async def analyze_position(self, fen: str, depth: Optional[int] = None, time_limit: Optional[float] = None) -> Dict[str, Any]:
-        """Analyze chess position"""
+    async def analyze_position(self, fen: str, depth: Optional[int] = None, time_limit: Optional[float] = None,
+                               on_info: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+                               priority: Optional[Priority] = None, preemptible: bool = False) -> Dict[str, Any]:
+        """Analyze chess position, passing intermediate results to ``on_info``
+        
+        Positions in the opening book or the endgame tablebase are answered
+        without a search. When every engine is busy, ``priority`` gives the
+        request's rank in the pool's wait, lowest first. A ``preemptible``
+        search is cancelled when a more important request needs its engine.
+        Cancelling the calling task stops the engine's search.
+        """
         try:
-            if not self.stockfish_engine:
-                return {"error": "Engine not available"}
-                
             board = chess.Board(fen)
             
+            book_move = self.opening_book.probe(board) if self.opening_book else None
+            if book_move:
+                self.last_analysis = book_move
+                self._engine_changed()
+                return book_move
+                
+            tablebase_move = self.tablebase.probe(board) if self.tablebase else None
+            if tablebase_move:
+                self.last_analysis = tablebase_move
+                self._engine_changed()
+                return tablebase_move
+                
+            if not self.engine_pool or not self.engine_pool.running:
+                return {"error": "Engine not available"}
+                
             # Set analysis parameters
             limit = chess.engine.Limit()
             if depth:
@@ -399,43 +800,62 @@ class UR10Adapter:
             if time_limit:
                 limit.time = time_limit
                 
-            # Run analysis
-            info = await asyncio.get_event_loop().run_in_executor(
-                self.executor, self._analyze_sync, board, limit
-            )
-            
-            return {
-                "bestmove": str(info.get("pv", [None])[0]) if info.get("pv") else None,
-                "eval": info.get("score", {}).get("cp", 0) if info.get("score") else 0,
-                "depth": info.get("depth", 0),
-                "pv": [str(move) for move in info.get("pv", [])]
-            }
+            # Run analysis on a pooled engine, queueing by priority if all are busy
+            async with self.engine_pool.checkout(priority, preemptible) as engine:
+                with await engine.analysis(board, limit) as analysis:
+                    async for info in analysis:
+                        self.engine_pool.record(engine, info)
+                        if on_info and "pv" in info and "score" in info:
+                            await on_info(self._format_info(info))
+                    info = analysis.info
+                    
+            # Bump again, the checkout bumped it before the result was stored
+            self.last_analysis = self._format_info(info)
+            self._engine_changed()
+            return self.last_analysis
             
         except Exception as e:
             logger.error(f"Error analyzing position: {e}")
             return {"error": str(e)}
             
-    def _analyze_sync(self, board: chess.Board, limit: chess.engine.Limit) -> Dict[str, Any]:
-        """Synchronous analysis helper"""
-        try:
-            info = self.stockfish_engine.analyse(board, limit)
-            return info
-        except Exception as e:
-            logger.error(f"Sync analysis error: {e}")
-            return {}
-            
+    @staticmethod
+    def _format_info(info: chess.engine.InfoDict) -> Dict[str, Any]:
+        """Convert an engine info dict to the analysis result format"""
+        score = info["score"].white() if info.get("score") else None
+        pv = info.get("pv", [])
+        return {
+            "bestmove": str(pv[0]) if pv else None,
+            "eval": score.score(mate_score=100000) if score else 0,
+            "mate": score.mate() if score else None,
+            "depth": info.get("depth", 0),
+            "pv": [str(move) for move in pv],
+            "nodes": info.get("nodes"),
+            "nps": info.get("nps")
+        }
+        
     async def _initialize_stockfish(self):
-        """Initialize Stockfish chess engine"""
+        """Start and warm up the supervised Stockfish engine pool"""
         try:
-            # Try to initialize Stockfish
-            stockfish_path = "/usr/bin/stockfish"  # Default path
-            if os.path.exists(stockfish_path):
-                self.stockfish_engine = chess.engine.SimpleEngine.popen_uci(stockfish_path)
-                logger.info("Stockfish engine initialized")
+            engine_config = self.config["engine"]
+            stockfish_path = engine_config["path"]
+            if shutil.which(stockfish_path):
+                self.engine_pool = EnginePool(
+                    stockfish_path,
+                    size=engine_config["pool_size"],
+                    threads=engine_config["threads"],
+                    hash_mb=engine_config["hash"],
+                    ping_interval=engine_config["ping_interval"],
+                    on_change=self._engine_changed
+                )
+                if await self.engine_pool.start():
+                    logger.info("Stockfish engine pool initialized")
             else:
-                logger.warning("Stockfish not found at default path")
+                logger.warning(f"Stockfish not found at {stockfish_path}")
                 
         except Exception as e:
             logger.error(f"Failed to initialize Stockfish: {e}")
-            self.stockfish_engine = None
-
+            self.engine_pool = None
+            
+    def _engine_changed(self):
+        """Invalidate the cached engine status"""
+        self.engine_version += 1
@@ -0,0 +1,350 @@
+"""
+Robot connection manager for UR10 Robot Server
+Keeps persistent RTDE control/receive and dashboard connections alive,
+watches their liveness and reconnects with jittered exponential backoff
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+try:
+    import rtde_control
+    import dashboard_client
+    UR_RTDE_AVAILABLE = True
+except ImportError:
+    UR_RTDE_AVAILABLE = False
+
+from adapters.rtde_receiver import RTDEReceiver
+
+logger = logging.getLogger(__name__)
+
+# Connection states reported to listeners
+CONNECTION_DISCONNECTED = "disconnected"
+CONNECTION_CONNECTING = "connecting"
+CONNECTION_CONNECTED = "connected"
+CONNECTION_RECONNECTING = "reconnecting"
+
+# m/s², deceleration of a stop over the control link, as ur_rtde's stopL default
+STOP_DECELERATION = 10.0
+
+ConnectionListener = Callable[[str, str, str], Awaitable[None]]
+
+class URConnectionManager:
+    """Owns the robot's RTDE control, RTDE receive and dashboard links
+    
+    Links are opened once on ``connect`` and kept open, so commands never
+    pay for connection setup. A watchdog pings the dashboard and checks the
+    control link and the age of the latest RTDE sample; when any of them
+    fails every link is torn down and reopened with jittered exponential
+    backoff until it succeeds or ``disconnect`` is called.
+    
+    The controller runs one external control script at a time, so clients
+    that open their own control interface, such as robot_api's helpers,
+    must run inside ``released_control``. The watchdog defers reconnecting
+    until the control link is handed back and any emergency stop is
+    cleared, and no control link is opened while it is released.
+    """
+    
+    def __init__(self, hostname: str, receive_frequency: float = 125.0,
+                 connect_timeout: float = 5.0, keepalive_interval: float = 1.0,
+                 liveness_timeout: float = 0.5, backoff_initial: float = 0.5,
+                 backoff_max: float = 30.0):
+        self.hostname = hostname
+        self.receive_frequency = receive_frequency
+        self.connect_timeout = connect_timeout
+        self.keepalive_interval = keepalive_interval
+        self.liveness_timeout = liveness_timeout
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        
+        self.state = CONNECTION_DISCONNECTED
+        self.control = None
+        self.control_released = False
+        # Set by an emergency stop, until ``resume_control``
+        self.emergency_stopped = False
+        # Held while the control link is released, and while it is opened or closed
+        self.control_lock = threading.RLock()
+        self.dashboard = None
+        self.receiver: Optional[RTDEReceiver] = None
+        self.watchdog_task: Optional[asyncio.Task] = None
+        self.listeners: List[ConnectionListener] = []
+        
+        # Own worker so keep-alives never queue behind long robot moves
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ur-connection")
+        
+        # Statistics
+        self.connected_at = 0.0
+        self.reconnects = 0
+        self.failed_attempts = 0
+        self.last_error: Optional[str] = None
+        self.keepalive_rtt_ms = 0.0
+        
+    def add_listener(self, listener: ConnectionListener):
+        """Register ``listener(old_state, new_state, reason)`` for state transitions"""
+        self.listeners.append(listener)
+        
+    def is_connected(self) -> bool:
+        """Whether every link is up"""
+        return self.state == CONNECTION_CONNECTED
+        
+    async def connect(self) -> bool:
+        """Open all links and start the watchdog, returns False on failure"""
+        if not UR_RTDE_AVAILABLE:
+            raise RuntimeError("ur_rtde is not installed")
+        if self.state != CONNECTION_DISCONNECTED:
+            return self.is_connected()
+            
+        await self._transition(CONNECTION_CONNECTING, f"Connecting to {self.hostname}")
+        try:
+            await self._open()
+        except Exception as e:
+            self.last_error = str(e)
+            await self._close()
+            await self._transition(CONNECTION_DISCONNECTED, f"Connection failed: {e}")
+            return False
+            
+        self.connected_at = time.monotonic()
+        await self._transition(CONNECTION_CONNECTED, f"Connected to {self.hostname}")
+        self.watchdog_task = asyncio.create_task(self._watchdog())
+        return True
+        
+    async def disconnect(self):
+        """Stop the watchdog and close all links"""
+        if self.watchdog_task:
+            self.watchdog_task.cancel()
+            try:
+                await self.watchdog_task
+            except asyncio.CancelledError:
+                pass
+            self.watchdog_task = None
+            
+        await self._close()
+        if self.state != CONNECTION_DISCONNECTED:
+            await self._transition(CONNECTION_DISCONNECTED, "Disconnected")
+            
+    @contextmanager
+    def released_control(self) -> Iterator[None]:
+        """Stop and disconnect the control link for the block, reconnect after
+        
+        Blocking, run on the robot worker. The watchdog does not count the
+        released link as lost. Nested blocks keep the outer release. While
+        the link is down, the block still keeps a reconnect from opening one.
+        After an emergency stop the link stays disconnected until
+        ``resume_control``.
+        """
+        if self.control_released:
+            yield
+            return
+            
+        with self.control_lock:
+            control = self.control
+            if control is None:
+                yield
+                return
+                
+            self.control_released = True
+            try:
+                control.stopScript()
+                control.disconnect()
+                yield
+            finally:
+                try:
+                    if not self.emergency_stopped:
+                        control.reconnect()
+                finally:
+                    self.control_released = False
+                
+    def stop_motion(self, emergency: bool = False) -> bool:
+        """Stop the arm now, returns False when no link is up to stop it
+        
+        Blocking, but safe from any thread while the robot worker is
+        mid-move. The running move is stopped with ``stopL``; an emergency
+        stop ends the control script instead, until ``resume_control``.
+        While robot_api holds the released link, its program is stopped
+        through the dashboard.
+        """
+        if emergency:
+            self.emergency_stopped = True
+        if self.control_released and self.dashboard:
+            self.dashboard.stop()
+        elif self.control is None:
+            return False
+        elif emergency:
+            self.control.stopScript()
+        else:
+            self.control.stopL(STOP_DECELERATION)
+        return True
+        
+    def resume_control(self):
+        """Start the control script again after an emergency stop
+        
+        A link released at the time reconnects when robot_api hands it back.
+        """
+        self.emergency_stopped = False
+        control = self.control
+        if control is None or self.control_released:
+            return
+        if not control.isConnected():
+            control.reconnect()
+        elif not control.isProgramRunning():
+            control.reuploadScript()
+            
+    def shutdown(self):
+        """Release the connection worker thread"""
+        self.executor.shutdown(wait=False)
+        
+    def get_stats(self) -> Dict[str, Any]:
+        """Get connection state and reconnect statistics"""
+        return {
+            "state": self.state,
+            "hostname": self.hostname,
+            "uptime": time.monotonic() - self.connected_at if self.is_connected() else 0.0,
+            "reconnects": self.reconnects,
+            "failed_attempts": self.failed_attempts,
+            "last_error": self.last_error,
+            "keepalive_rtt_ms": self.keepalive_rtt_ms,
+            "receiver": self.receiver.get_stats() if self.receiver else None
+        }
+        
+    async def _open(self):
+        """Open control, dashboard and receive links"""
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(self.executor, self._open_sync)
+        
+        # The receive link only counts as up once data is flowing
+        deadline = time.monotonic() + self.connect_timeout
+        while self.receiver.read() is None:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"No RTDE data within {self.connect_timeout}s")
+            await asyncio.sleep(0.05)
+            
+    def _open_sync(self):
+        """Blocking part of ``_open``, run in the executor"""
+        self.dashboard = dashboard_client.DashboardClient(self.hostname)
+        self.dashboard.connect()
+        # Uploads the control script, so never while robot_api drives the arm
+        with self.control_lock:
+            self.control = rtde_control.RTDEControlInterface(self.hostname)
+        self.receiver = RTDEReceiver(self.hostname, self.receive_frequency)
+        self.receiver.start()
+        
+    async def _close(self):
+        """Close every link that is open"""
+        await asyncio.get_event_loop().run_in_executor(self.executor, self._close_sync)
+        
+    def _close_sync(self):
+        """Blocking part of ``_close``, run in the executor"""
+        if self.receiver:
+            self.receiver.stop()
+            self.receiver = None
+            
+        with self.control_lock:
+            if self.control:
+                try:
+                    self.control.stopScript()
+                    self.control.disconnect()
+                except Exception as e:
+                    logger.warning(f"Error closing RTDE control interface: {e}")
+                self.control = None
+            
+        if self.dashboard:
+            try:
+                self.dashboard.disconnect()
+            except Exception as e:
+                logger.warning(f"Error closing dashboard connection: {e}")
+            self.dashboard = None
+            
+    async def _watchdog(self):
+        """Keep the links alive and reconnect when one of them fails"""
+        try:
+            while True:
+                await asyncio.sleep(self.keepalive_interval)
+                
+                reason = await self._check_liveness()
+                if reason is None:
+                    continue
+                    
+                # Reopening now would upload a control script next to robot_api's,
+                # or restart the one an emergency stop ended
+                if self.control_released or self.emergency_stopped:
+                    logger.debug(f"Deferring reconnect while the control link is stopped or released: {reason}")
+                    continue
+                    
+                logger.warning(f"Robot link lost: {reason}")
+                self.last_error = reason
+                await self._transition(CONNECTION_RECONNECTING, reason)
+                await self._close()
+                await self._reconnect()
+                
+        except asyncio.CancelledError:
+            pass
+            
+    async def _check_liveness(self) -> Optional[str]:
+        """Return why the connection is considered dead, or None if it is alive"""
+        age = self.receiver.age() if self.receiver else None
+        if age is None or age > self.liveness_timeout:
+            return f"No RTDE data for {self.liveness_timeout}s"
+            
+        try:
+            return await asyncio.wait_for(
+                asyncio.get_event_loop().run_in_executor(self.executor, self._keepalive_sync),
+                timeout=self.connect_timeout
+            )
+        except asyncio.TimeoutError:
+            return f"Keep-alive timed out after {self.connect_timeout}s"
+            
+    def _keepalive_sync(self) -> Optional[str]:
+        """Ping the dashboard server and check the control link"""
+        try:
+            started = time.perf_counter()
+            if not self.dashboard.isConnected():
+                return "Dashboard connection closed"
+            self.dashboard.robotmode()
+            self.keepalive_rtt_ms = (time.perf_counter() - started) * 1000
+            
+            if not self.control_released and not self.emergency_stopped and not self.control.isConnected():
+                return "RTDE control connection closed"
+            return None
+            
+        except Exception as e:
+            return f"Keep-alive failed: {e}"
+            
+    async def _reconnect(self):
+        """Retry ``_open`` with jittered exponential backoff until it succeeds"""
+        attempt = 0
+        while True:
+            # Equal jitter: half the backoff is fixed, half random, so
+            # several clients do not retry in lockstep
+            backoff = min(self.backoff_max, self.backoff_initial * (2 ** attempt))
+            await asyncio.sleep(backoff / 2 + random.uniform(0, backoff / 2))
+            attempt += 1
+            
+            try:
+                await self._open()
+            except Exception as e:
+                self.failed_attempts += 1
+                self.last_error = str(e)
+                logger.warning(f"Reconnect attempt {attempt} to {self.hostname} failed: {e}")
+                await self._close()
+                continue
+                
+            self.reconnects += 1
+            self.connected_at = time.monotonic()
+            await self._transition(CONNECTION_CONNECTED, f"Reconnected after {attempt} attempt(s)")
+            return
+            
+    async def _transition(self, state: str, reason: str):
+        """Change state and notify listeners"""
+        previous, self.state = self.state, state
+        logger.info(f"Robot connection {previous} -> {state}: {reason}")
+        for listener in self.listeners:
+            try:
+                await listener(previous, state, reason)
+            except Exception as e:
+                logger.error(f"Error in connection listener: {e}")
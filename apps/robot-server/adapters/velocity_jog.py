@@ -0,0 +1,111 @@
+"""
+Velocity jog control for UR10 Robot Server
+Turns a stream of client velocity setpoints into a rate-limited velocity
+command, ramping to zero when setpoints stop arriving (deadman)
+"""
+
+import math
+import time
+from typing import List, Optional, Sequence, Tuple
+
+JOG_MODE_TCP = "tcp"
+JOG_MODE_JOINT = "joint"
+
+ZERO_VELOCITY = (0.0,) * 6
+
+class VelocityJogController:
+    """Deadman-guarded velocity setpoint shared by the client and control loop
+    
+    The event loop writes setpoints with ``set_target`` and the control loop
+    calls ``step`` once per period, on whatever thread it runs. The target is
+    replaced as a whole tuple, so no lock is needed between the two. If no
+    setpoint arrives within ``deadman_timeout`` the jog is released as if the
+    client had let go: it ramps down and ends, so a stalled client cannot
+    keep the robot. The commanded velocity never changes faster than
+    ``acceleration``.
+    """
+    
+    def __init__(self, mode: str, max_speed: float, max_angular_speed: float, max_joint_speed: float,
+                 acceleration: float, deadman_timeout: float,
+                 z_limits: Optional[Tuple[float, float]] = None):
+        if mode not in (JOG_MODE_TCP, JOG_MODE_JOINT):
+            raise ValueError(f"Invalid jog mode: {mode}")
+            
+        self.mode = mode
+        self.max_speed = max_speed
+        self.max_angular_speed = max_angular_speed
+        self.max_joint_speed = max_joint_speed
+        self.acceleration = acceleration
+        self.deadman_timeout = deadman_timeout
+        self.z_limits = z_limits
+        
+        self.target: Tuple[float, ...] = ZERO_VELOCITY
+        self.velocity: List[float] = list(ZERO_VELOCITY)
+        self.last_setpoint = time.monotonic()
+        self.released = False
+        
+        # Statistics
+        self.setpoints = 0
+        self.deadman_trips = 0
+        self.deadman_tripped = False
+        
+    @property
+    def finished(self) -> bool:
+        """Released and ramped down to standstill"""
+        return self.released and not any(self.velocity)
+        
+    def set_target(self, velocity: Sequence[float]):
+        """Accept a client setpoint, clamped to the speed limits"""
+        if len(velocity) != 6:
+            raise ValueError(f"Expected 6 velocity components, got {len(velocity)}")
+        if not all(math.isfinite(v) for v in velocity):
+            raise ValueError("Velocity components must be finite")
+        if self.released:
+            return
+            
+        self.target = self._clamp([float(v) for v in velocity])
+        self.last_setpoint = time.monotonic()
+        self.setpoints += 1
+        
+    def release(self):
+        """End the jog; the control loop ramps down and then exits"""
+        self.released = True
+        self.target = ZERO_VELOCITY
+        
+    def halt(self):
+        """End the jog without ramping, e.g. on stop or E-stop"""
+        self.release()
+        self.velocity = list(ZERO_VELOCITY)
+        
+    def step(self, dt: float, z: Optional[float] = None) -> List[float]:
+        """Advance the commanded velocity by one control period of ``dt`` seconds"""
+        if not self.released and time.monotonic() - self.last_setpoint > self.deadman_timeout:
+            self.deadman_tripped = True
+            self.deadman_trips += 1
+            self.release()
+        target = self.target
+        
+        # Never drive further out of the Z limits in TCP mode
+        if self.mode == JOG_MODE_TCP and self.z_limits and z is not None:
+            z_min, z_max = self.z_limits
+            if (z <= z_min and target[2] < 0) or (z >= z_max and target[2] > 0):
+                target = target[:2] + (0.0,) + target[3:]
+                self.velocity[2] = 0.0
+                
+        max_delta = self.acceleration * dt
+        self.velocity = [
+            current + max(-max_delta, min(max_delta, wanted - current))
+            for current, wanted in zip(self.velocity, target)
+        ]
+        return self.velocity
+        
+    def _clamp(self, velocity: List[float]) -> Tuple[float, ...]:
+        """Limit linear speed by norm and angular/joint speeds per component"""
+        if self.mode == JOG_MODE_JOINT:
+            limit = self.max_joint_speed
+            return tuple(max(-limit, min(limit, v)) for v in velocity)
+            
+        linear = math.sqrt(sum(v * v for v in velocity[:3]))
+        scale = self.max_speed / linear if linear > self.max_speed else 1.0
+        limit = self.max_angular_speed
+        return tuple(v * scale for v in velocity[:3]) + tuple(max(-limit, min(limit, v)) for v in velocity[3:])
@@ -0,0 +1,147 @@
+"""
+Hold-to-jog stream for UR10 Robot Server
+Feeds velocity setpoints from one WebSocket client at a time into the robot
+manager's velocity jog
+"""
+
+import json
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class JogStreamHandler:
+    """Serves ``/ws/jog``
+    
+    The client sends ``{"type": "velocity", "mode": "tcp", "velocity": [...]}``
+    at least every ``JOG_DEADMAN_TIMEOUT`` seconds while the jog button is
+    held, and ``{"type": "stop"}`` on release. The first setpoint starts the
+    jog; closing the socket or missing the deadman timeout stops it like a
+    release does. However the jog ends, the stream is released at once and
+    the client's next setpoint starts a new jog.
+    """
+    
+    def __init__(self):
+        # Only one client may drive the robot at a time
+        self.owner: Optional[WebSocket] = None
+        # Counts started jogs, so a late end callback cannot release a newer one
+        self.jogs = 0
+        
+    async def run(self, websocket: WebSocket, robot_manager, session_manager):
+        """Validate the session, then handle setpoints until the client leaves"""
+        session_id = websocket.query_params.get("session_id")
+        session = await session_manager.get_session(session_id) if session_id else None
+        if not session:
+            await websocket.close(code=1008)
+            return
+            
+        await websocket.accept()
+        await session_manager.update_session_activity(session_id)
+        logger.info(f"Jog stream connected: {websocket.client}")
+        
+        mode: Optional[str] = None
+        try:
+            while True:
+                message = await websocket.receive_text()
+                try:
+                    request = json.loads(message)
+                    if not isinstance(request, dict):
+                        raise ValueError("Message must be a JSON object")
+                        
+                    # The jog ended by deadman, stop or E-stop and released the stream
+                    if self.owner is not websocket:
+                        mode = None
+                        
+                    if request.get("type") == "stop":
+                        if mode is not None:
+                            mode = None
+                            await self._stop(websocket, robot_manager)
+                        continue
+                        
+                    if request.get("type") != "velocity":
+                        raise ValueError(f"Unknown message type: {request.get('type')!r}")
+                        
+                    requested_mode = request.get("mode", "tcp")
+                    if mode != requested_mode:
+                        if mode is not None:
+                            await self._stop(websocket, robot_manager)
+                        mode = None
+                        if not await self._start(websocket, robot_manager, requested_mode):
+                            continue
+                        mode = requested_mode
+                        
+                    velocity = request.get("velocity") or []
+                    try:
+                        robot_manager.set_jog_velocity(velocity)
+                    except RuntimeError:
+                        # Ended before its callback ran; this setpoint re-arms it
+                        await self._release(websocket, self.jogs)
+                        mode = None
+                        if await self._start(websocket, robot_manager, requested_mode):
+                            mode = requested_mode
+                            robot_manager.set_jog_velocity(velocity)
+                        
+                except (ValueError, TypeError) as e:
+                    await self._send(websocket, {"type": "error", "message": f"Invalid jog message: {e}"})
+                    
+        except WebSocketDisconnect:
+            logger.info(f"Jog stream disconnected: {websocket.client}")
+            
+        except Exception as e:
+            logger.error(f"Jog stream error: {e}")
+            
+        finally:
+            if self.owner is websocket:
+                await robot_manager.stop_velocity_jog()
+                self.owner = None
+                
+    async def _start(self, websocket: WebSocket, robot_manager, mode: str) -> bool:
+        """Claim the jog stream and start the velocity jog"""
+        if self.owner is not None and self.owner is not websocket:
+            await self._send(websocket, {"type": "error", "message": "Another client is jogging"})
+            return False
+            
+        self.owner = websocket
+        self.jogs += 1
+        jog = self.jogs
+        if not await robot_manager.start_velocity_jog(mode, on_end=lambda: self._release(websocket, jog)):
+            self.owner = None
+            errors = robot_manager.errors
+            await self._send(websocket, {
+                "type": "error",
+                "message": errors[-1] if errors else "Failed to start jog"
+            })
+            return False
+            
+        await self._send(websocket, {
+            "type": "jog",
+            "status": "started",
+            "mode": mode,
+            "deadman_timeout": settings.JOG_DEADMAN_TIMEOUT
+        })
+        return True
+        
+    async def _stop(self, websocket: WebSocket, robot_manager):
+        """Ramp the jog down and release the jog stream"""
+        await robot_manager.stop_velocity_jog()
+        await self._release(websocket, self.jogs)
+        
+    async def _release(self, websocket: WebSocket, jog: int):
+        """Release the jog stream if ``websocket`` still owns jog number ``jog``"""
+        if self.owner is not websocket or self.jogs != jog:
+            return
+        self.owner = None
+        try:
+            await self._send(websocket, {"type": "jog", "status": "stopped"})
+        except Exception as e:
+            logger.debug(f"Jog stream closed before the stop was reported: {e}")
+        
+    async def _send(self, websocket: WebSocket, message: Dict[str, Any]):
+        """Send a reply to the jogging client"""
+        message["timestamp"] = time.time()
+        await websocket.send_text(json.dumps(message, separators=(",", ":")))
@@ -3,7 +3,7 @@ API Routes for UR10 Robot Server
 Handles all REST endpoints for robot control, chess operations, and system management
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Header, Query
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Response
 from fastapi.responses import JSONResponse
 from typing import Optional, List, Dict, Any
 import logging
@@ -12,8 +12,8 @@ import asyncio
 
 from models.schemas import (
     SessionStartRequest, SessionStartResponse, RobotConnectRequest,
-    JogRequest, ChessMoveRequest, ChessRemoveRequest, EngineAnalyzeRequest,
-    TeachPointRequest, TeachPointResponse, LimitsUpdateRequest,
+    JogRequest, ChessMoveRequest, ChessRemoveRequest, EngineAnalyzeRequest, AnalysisJobRequest,
+    TeachPointRequest, TeachPointResponse, LimitsUpdateRequest, CalibrationUpdateRequest,
     HealthResponse, LogsResponse, LogEntry, Telemetry
 )
 from core.config import settings
@@ -38,6 +38,11 @@ async def get_websocket_manager():
     from main import websocket_manager
     return websocket_manager
 
+# Dependency to get telemetry scheduler
+async def get_telemetry_scheduler():
+    from main import telemetry_scheduler
+    return telemetry_scheduler
+
 # Dependency to validate session
 async def validate_session(
     session_id: Optional[str] = Header(None, alias="X-Session-ID"),
@@ -329,11 +334,25 @@ async def chess_move(
     try:
         move_id = f"move_{int(time.time())}"
         
+        # Plan first so clients see the estimated cycle time up front
+        program = None
+        if robot_manager.adapter:
+            program = robot_manager.adapter.plan_chess_move(
+                request.from_square, request.to_square, request.promotion
+            )
+            
         await websocket_manager.broadcast_job_update(
             move_id, "started", 0.0,
-            {"from": request.from_square, "to": request.to_square}
+            {
+                "from": request.from_square,
+                "to": request.to_square,
+                "plan": program.to_dict() if program else None
+            }
         )
         
+        # Search ahead while the arm is moving
+        robot_manager.speculate_after_move(request.from_square, request.to_square, request.promotion)
+        
         # Execute move through adapter
         if robot_manager.adapter:
             success = await robot_manager.adapter.chess_move(
@@ -344,6 +363,7 @@ async def chess_move(
         else:
             success = False
             
+        robot_manager.supersede_analysis()
         if success:
             await websocket_manager.broadcast_job_update(move_id, "completed", 100.0)
             await websocket_manager.broadcast_alert(
@@ -351,7 +371,11 @@ async def chess_move(
                 f"Move {request.from_square}-{request.to_square} completed",
                 "success"
             )
-            return {"status": "move_completed", "move": f"{request.from_square}{request.to_square}"}
+            return {
+                "status": "move_completed",
+                "move": f"{request.from_square}{request.to_square}",
+                **robot_manager.adapter.get_motion_stats()
+            }
         else:
             await websocket_manager.broadcast_job_update(move_id, "failed")
             raise HTTPException(status_code=400, detail="Chess move failed")
@@ -383,6 +407,7 @@ async def remove_piece(
             success = False
             
         if success:
+            robot_manager.supersede_analysis()
             await websocket_manager.broadcast_job_update(remove_id, "completed", 100.0)
             await websocket_manager.broadcast_alert(
                 "piece_removed",
@@ -426,17 +451,35 @@ async def analyze_position(
     try:
         if robot_manager.adapter:
             # Start analysis
-            await websocket_manager.broadcast_analysis("position_analysis", {"status": "started"})
+            await websocket_manager.broadcast_analysis("position_analysis", {
+                "status": "started",
+                "fen": request.fen,
+                "channel": request.channel
+            })
             
-            result = await robot_manager.adapter.analyze_position(
+            # Stream intermediate engine results while the search runs
+            async def stream_info(info: Dict[str, Any]):
+                await websocket_manager.broadcast_analysis("position_analysis", {
+                    "status": "info",
+                    "fen": request.fen,
+                    "channel": request.channel,
+                    "info": info
+                })
+                
+            result = await robot_manager.analyze_position(
                 request.fen,
                 request.depth,
-                request.time
+                request.time,
+                on_info=stream_info,
+                channel=request.channel,
+                priority=request.priority
             )
             
             # Broadcast result
             await websocket_manager.broadcast_analysis("position_analysis", {
-                "status": "completed",
+                "status": "cancelled" if result.get("cancelled") else "completed",
+                "fen": request.fen,
+                "channel": request.channel,
                 "result": result
             })
             
@@ -448,6 +491,105 @@ async def analyze_position(
         logger.error(f"Error analyzing position: {e}")
         raise HTTPException(status_code=500, detail="Analysis failed")
 
+@router.post("/chess/analyze/cancel")
+async def cancel_analysis(
+    channel: Optional[str] = Query(None, description="Channel to cancel, all channels if omitted"),
+    session = Depends(validate_session),
+    robot_manager = Depends(get_robot_manager)
+):
+    """Stop running analysis searches"""
+    try:
+        cancelled = robot_manager.cancel_analysis(channel)
+        return {"status": "cancelled", "channel": channel, "cancelled": cancelled}
+        
+    except Exception as e:
+        logger.error(f"Error cancelling analysis: {e}")
+        raise HTTPException(status_code=500, detail="Failed to cancel analysis")
+
+@router.post("/chess/analysis/jobs", status_code=202)
+async def submit_analysis_job(
+    request: AnalysisJobRequest,
+    session = Depends(validate_session),
+    robot_manager = Depends(get_robot_manager)
+):
+    """Queue an analysis job; progress is reported on /ws/analysis"""
+    try:
+        job = await robot_manager.submit_analysis_job(
+            request.fen,
+            request.priority,
+            request.depth,
+            request.time,
+            request.deadline
+        )
+        return job.to_dict()
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error submitting analysis job: {e}")
+        raise HTTPException(status_code=500, detail="Failed to submit analysis job")
+
+@router.get("/chess/analysis/jobs")
+async def list_analysis_jobs(
+    status: Optional[str] = Query(None, description="Only jobs in this state"),
+    session = Depends(validate_session),
+    robot_manager = Depends(get_robot_manager)
+):
+    """List queued, running and recently finished analysis jobs"""
+    try:
+        return {"jobs": [job.to_dict() for job in robot_manager.list_analysis_jobs(status)]}
+        
+    except Exception as e:
+        logger.error(f"Error listing analysis jobs: {e}")
+        raise HTTPException(status_code=500, detail="Failed to list analysis jobs")
+
+@router.get("/chess/analysis/jobs/{job_id}")
+async def get_analysis_job(
+    job_id: str,
+    session = Depends(validate_session),
+    robot_manager = Depends(get_robot_manager)
+):
+    """Get an analysis job's status and progress"""
+    job = robot_manager.get_analysis_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Analysis job not found")
+    return job.to_dict()
+
+@router.get("/chess/analysis/jobs/{job_id}/result")
+async def get_analysis_job_result(
+    job_id: str,
+    session = Depends(validate_session),
+    robot_manager = Depends(get_robot_manager)
+):
+    """Get a finished analysis job's result, 409 while it is still queued or running"""
+    job = robot_manager.get_analysis_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Analysis job not found")
+    if not job.finished:
+        raise HTTPException(status_code=409, detail=f"Analysis job is {job.status}")
+    return {"job_id": job.id, "status": job.status, "result": job.result, "error": job.error}
+
+@router.delete("/chess/analysis/jobs/{job_id}")
+async def cancel_analysis_job(
+    job_id: str,
+    session = Depends(validate_session),
+    robot_manager = Depends(get_robot_manager)
+):
+    """Cancel a queued or running analysis job"""
+    try:
+        if not robot_manager.get_analysis_job(job_id):
+            raise HTTPException(status_code=404, detail="Analysis job not found")
+        cancelled = await robot_manager.cancel_analysis_job(job_id)
+        return {"job_id": job_id, "cancelled": cancelled}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error cancelling analysis job: {e}")
+        raise HTTPException(status_code=500, detail="Failed to cancel analysis job")
+
 # System Management Routes
 @router.get("/system/health", response_model=HealthResponse)
 async def health_check(
@@ -472,18 +614,78 @@ async def health_check(
 
 @router.get("/system/telemetry", response_model=Telemetry)
 async def get_telemetry(
+    response: Response,
     session = Depends(validate_session),
     robot_manager = Depends(get_robot_manager)
 ):
-    """Get current system telemetry"""
+    """Get current system telemetry
+    
+    Served from the latest published snapshot so polling clients do not
+    add robot reads; falls back to a direct read if the producer is stale.
+    """
     try:
-        telemetry = await robot_manager.get_telemetry()
-        return telemetry
+        snapshot = robot_manager.get_telemetry_snapshot()
+        if snapshot is None or snapshot.age > robot_manager.telemetry_stale_threshold:
+            return await robot_manager.get_telemetry()
+            
+        response.headers["X-Telemetry-Version"] = str(snapshot.version)
+        response.headers["X-Telemetry-Age-Ms"] = f"{snapshot.age * 1000:.1f}"
+        return snapshot.telemetry
         
     except Exception as e:
         logger.error(f"Error getting telemetry: {e}")
         raise HTTPException(status_code=500, detail="Failed to get telemetry")
 
+@router.get("/system/telemetry/history")
+async def get_telemetry_history(
+    seconds: float = Query(30.0, gt=0, description="Length of the history window in seconds"),
+    session = Depends(validate_session),
+    robot_manager = Depends(get_robot_manager)
+):
+    """Get recent telemetry samples from the in-memory history buffer"""
+    try:
+        return robot_manager.get_telemetry_history(seconds)
+        
+    except Exception as e:
+        logger.error(f"Error getting telemetry history: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get telemetry history")
+
+@router.get("/system/telemetry/stats")
+async def get_telemetry_stats(
+    session = Depends(validate_session),
+    robot_manager = Depends(get_robot_manager),
+    telemetry_scheduler = Depends(get_telemetry_scheduler),
+    websocket_manager = Depends(get_websocket_manager)
+):
+    """Get telemetry scheduler jitter/overrun and broadcast timing statistics"""
+    try:
+        snapshot = robot_manager.get_telemetry_snapshot()
+        return {
+            "scheduler": telemetry_scheduler.get_stats(),
+            "snapshot": {
+                "version": snapshot.version,
+                "age_ms": snapshot.age * 1000
+            } if snapshot else None,
+            "broadcast": websocket_manager.get_broadcast_stats()
+        }
+        
+    except Exception as e:
+        logger.error(f"Error getting telemetry stats: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get telemetry stats")
+
+@router.get("/system/engine/stats")
+async def get_engine_stats(
+    session = Depends(validate_session),
+    robot_manager = Depends(get_robot_manager)
+):
+    """Get chess engine pool and analysis cache statistics"""
+    try:
+        return robot_manager.get_engine_stats()
+        
+    except Exception as e:
+        logger.error(f"Error getting engine stats: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get engine stats")
+
 @router.get("/system/logs", response_model=LogsResponse)
 async def get_logs(
     limit: int = Query(100, description="Maximum number of log entries"),
@@ -564,6 +766,46 @@ async def update_safety_limits(
         logger.error(f"Error updating limits: {e}")
         raise HTTPException(status_code=500, detail="Limits update failed")
 
+@router.post("/config/calibration")
+async def update_calibration(
+    request: CalibrationUpdateRequest,
+    session = Depends(validate_supervisor),
+    robot_manager = Depends(get_robot_manager),
+    websocket_manager = Depends(get_websocket_manager)
+):
+    """Update board calibration (supervisor only)"""
+    try:
+        success = await robot_manager.update_calibration(request.calibration, request.pin)
+        
+        if success:
+            await websocket_manager.broadcast_alert(
+                "calibration_updated",
+                "Board calibration updated",
+                "info"
+            )
+            return {"status": "calibration_updated"}
+        else:
+            raise HTTPException(status_code=400, detail="Failed to update calibration")
+            
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error updating calibration: {e}")
+        raise HTTPException(status_code=500, detail="Calibration update failed")
+
+@router.get("/config/geometry")
+async def get_board_geometry(
+    session = Depends(validate_session),
+    robot_manager = Depends(get_robot_manager)
+):
+    """Get robot coordinates of every square, the bin and approach heights"""
+    try:
+        return robot_manager.get_board_geometry()
+        
+    except Exception as e:
+        logger.error(f"Error getting board geometry: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get board geometry")
+
 @router.get("/config/current")
 async def get_current_config(
     session = Depends(validate_session)
@@ -0,0 +1,102 @@
+"""
+Binary telemetry codec for UR10 Robot Server
+Packs the hot telemetry fields into a fixed struct layout, with the rarely
+changing remainder carried as MessagePack (or JSON when msgpack is missing)
+"""
+
+import json
+import struct
+from typing import Any, Dict, Optional
+
+from core.telemetry_history import STATE_CODES
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+# Bumped whenever the JSON or binary telemetry layout changes
+TELEMETRY_SCHEMA_VERSION = 1
+
+# WebSocket subprotocols offered on /ws/telemetry
+SUBPROTOCOL_JSON = "ur10.telemetry.v1+json"
+SUBPROTOCOL_BINARY = "ur10.telemetry.v1+bin"
+
+TELEMETRY_ENCODING_JSON = "json"
+TELEMETRY_ENCODING_BINARY = "binary"
+
+MAGIC = b"UT"
+
+# Frame flags
+FLAG_VARIABLE = 0x01   # variable part present
+FLAG_MSGPACK = 0x02    # variable part is MessagePack, otherwise UTF-8 JSON
+FLAG_KEYFRAME = 0x04   # variable part was forced by the keyframe interval
+
+# Little-endian fixed layout, see packages/docs/websocket.md
+FIXED_LAYOUT = struct.Struct(
+    "<2sBB"   # magic, schema version, flags
+    "I"       # seq
+    "d"       # server timestamp (s)
+    "6f"      # joints (rad)
+    "6f"      # tcp pose x, y, z (m), rx, ry, rz (rad)
+    "f"       # tcp speed (m/s)
+    "f"       # rtt (ms)
+    "B"       # robot state code
+    "B"       # estop bits: 0 = hw, 1 = sw
+    "BB"      # number of digital inputs / outputs
+    "II"      # digital input / output bits
+    "I"       # variable part length
+)
+
+# Fields carried in the fixed part; everything else goes in the variable part
+FIXED_FIELDS = ("joints", "tcp_pose", "tcp_speed", "state", "estop", "iomap", "net")
+
+
+def _pack_bits(bits) -> int:
+    """Pack a list of flags into an integer bit mask"""
+    mask = 0
+    for i, bit in enumerate(bits[:32]):
+        if bit:
+            mask |= 1 << i
+    return mask
+
+
+def encode_variable_part(telemetry: Dict[str, Any]) -> bytes:
+    """Encode the slow-changing telemetry fields once per tick"""
+    variable = {key: value for key, value in telemetry.items() if key not in FIXED_FIELDS}
+    if MSGPACK_AVAILABLE:
+        return msgpack.packb(variable, default=str)
+    return json.dumps(variable, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def encode_binary_frame(telemetry: Dict[str, Any], seq: int, variable: Optional[bytes] = None,
+                        keyframe: bool = False) -> bytes:
+    """Pack one telemetry frame, optionally followed by the variable part"""
+    pose = telemetry["tcp_pose"]
+    iomap = telemetry["iomap"]
+    estop = telemetry["estop"]
+
+    flags = 0
+    if variable:
+        flags |= FLAG_VARIABLE
+        if MSGPACK_AVAILABLE:
+            flags |= FLAG_MSGPACK
+        if keyframe:
+            flags |= FLAG_KEYFRAME
+
+    header = FIXED_LAYOUT.pack(
+        MAGIC, TELEMETRY_SCHEMA_VERSION, flags,
+        seq & 0xFFFFFFFF,
+        telemetry["net"]["server_time"],
+        *telemetry["joints"][:6],
+        pose["x"], pose["y"], pose["z"], pose["rx"], pose["ry"], pose["rz"],
+        telemetry["tcp_speed"],
+        telemetry["net"]["rtt_ms"],
+        STATE_CODES.get(telemetry["state"], 0),
+        (1 if estop["hw"] else 0) | (2 if estop["sw"] else 0),
+        min(len(iomap["di"]), 32), min(len(iomap["do"]), 32),
+        _pack_bits(iomap["di"]), _pack_bits(iomap["do"]),
+        len(variable) if variable else 0
+    )
+    return header + variable if variable else header
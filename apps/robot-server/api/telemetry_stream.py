@@ -0,0 +1,49 @@
+"""
+Telemetry stream helpers for UR10 Robot Server
+Flattens telemetry into field paths and computes compact field diffs
+"""
+
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+# Telemetry stream modes selectable with ``/ws/telemetry?mode=``
+TELEMETRY_MODE_FULL = "full"
+TELEMETRY_MODE_DELTA = "delta"
+TELEMETRY_MODES = (TELEMETRY_MODE_FULL, TELEMETRY_MODE_DELTA)
+
+# Decimated subscribers are sent a frame once this fraction of their
+# interval has passed, so tick jitter does not push them to the next tick
+RATE_TOLERANCE = 0.9
+
+
+def flatten_fields(data: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
+    """Flatten nested dicts into dotted field paths
+
+    Lists are kept as leaf values so that e.g. ``joints`` is sent as a whole
+    when any joint changes.
+    """
+    flat: Dict[str, Any] = {}
+    for key, value in data.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict) and value:
+            flat.update(flatten_fields(value, f"{path}."))
+        else:
+            flat[path] = value
+    return flat
+
+
+def diff_fields(previous: Dict[str, Any], current: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+    """Compute changed and removed field paths between two flattened states"""
+    changed = {
+        path: value
+        for path, value in current.items()
+        if path not in previous or previous[path] != value
+    }
+    removed = [path for path in previous if path not in current]
+    return changed, removed
+
+
+def project_fields(data: Dict[str, Any], fields: Optional[FrozenSet[str]]) -> Dict[str, Any]:
+    """Keep only the requested top-level telemetry fields (all when ``None``)"""
+    if fields is None:
+        return data
+    return {key: value for key, value in data.items() if key in fields}
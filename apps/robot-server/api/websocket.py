@@ -7,7 +7,8 @@ import asyncio
 import logging
 import json
 import time
-from typing import Dict, List, Set, Any, Optional
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, FrozenSet, List, Set, Any, Optional, Tuple, Union
 from fastapi import WebSocket, WebSocketDisconnect
 import threading
 
@@ -15,9 +16,86 @@ from models.schemas import (
     Telemetry, TelemetryMessage, AlertMessage, JobMessage, AnalysisMessage,
     WebSocketMessage
 )
+from core.config import settings
+from api.telemetry_stream import (
+    TELEMETRY_MODE_FULL, TELEMETRY_MODE_DELTA, TELEMETRY_MODES, RATE_TOLERANCE,
+    flatten_fields, diff_fields, project_fields
+)
+from api.telemetry_codec import (
+    TELEMETRY_SCHEMA_VERSION, SUBPROTOCOL_JSON, SUBPROTOCOL_BINARY,
+    TELEMETRY_ENCODING_JSON, TELEMETRY_ENCODING_BINARY,
+    encode_variable_part, encode_binary_frame
+)
 
 logger = logging.getLogger(__name__)
 
+# Topics a client can subscribe to on the multiplexed /ws endpoint
+TOPIC_TELEMETRY = "telemetry"
+TOPIC_ALERTS = "alerts"
+TOPIC_JOB = "job"
+TOPIC_ANALYSIS = "analysis"
+TOPICS = (TOPIC_TELEMETRY, TOPIC_ALERTS, TOPIC_JOB, TOPIC_ANALYSIS)
+
+# Handles an inbound ``{"type": ...}`` request and returns an optional reply
+MessageHandler = Callable[[Dict[str, Any]], Awaitable[Optional[Dict[str, Any]]]]
+
+class ClientChannel:
+    """Per-connection send queue drained by a dedicated writer task
+    
+    Telemetry uses a single latest-value-wins slot, so a slow client simply
+    receives fewer frames. Alerts, job and analysis messages are queued in
+    order up to ``max_queue_size``; beyond that the oldest message is dropped.
+    """
+    
+    def __init__(self, websocket: WebSocket, max_queue_size: int):
+        self.websocket = websocket
+        self.max_queue_size = max_queue_size
+        self.telemetry: Optional[Union[str, bytes]] = None
+        self.messages: Deque[str] = deque()
+        self.wakeup = asyncio.Event()
+        self.writer: Optional[asyncio.Task] = None
+        self.closed = False
+        
+        # Backpressure counters
+        self.telemetry_dropped = 0
+        self.messages_dropped = 0
+        
+    @property
+    def queue_depth(self) -> int:
+        """Number of payloads waiting to be written"""
+        return len(self.messages) + (1 if self.telemetry is not None else 0)
+        
+    def push_telemetry(self, payload: Union[str, bytes]) -> bool:
+        """Replace the pending telemetry frame, returns True if one was dropped"""
+        dropped = self.telemetry is not None
+        if dropped:
+            self.telemetry_dropped += 1
+        self.telemetry = payload
+        self.wakeup.set()
+        return dropped
+        
+    def push_message(self, payload: str) -> bool:
+        """Queue a reliable message, returns True if the oldest was dropped"""
+        dropped = len(self.messages) >= self.max_queue_size
+        if dropped:
+            self.messages.popleft()
+            self.messages_dropped += 1
+        self.messages.append(payload)
+        self.wakeup.set()
+        return dropped
+        
+    def pop(self) -> Optional[Union[str, bytes]]:
+        """Next payload to write; queued messages go before telemetry"""
+        if self.messages:
+            return self.messages.popleft()
+        payload, self.telemetry = self.telemetry, None
+        return payload
+        
+    def close(self):
+        """Stop the writer after it finishes the current send"""
+        self.closed = True
+        self.wakeup.set()
+
 class WebSocketManager:
     """Manages WebSocket connections and broadcasting"""
     
@@ -27,6 +105,18 @@ class WebSocketManager:
         self.alert_connections: Set[WebSocket] = set()
         self.job_connections: Set[WebSocket] = set()
         self.analysis_connections: Set[WebSocket] = set()
+        self.topic_connections: Dict[str, Set[WebSocket]] = {
+            TOPIC_TELEMETRY: self.telemetry_connections,
+            TOPIC_ALERTS: self.alert_connections,
+            TOPIC_JOB: self.job_connections,
+            TOPIC_ANALYSIS: self.analysis_connections
+        }
+        
+        # Clients of the multiplexed /ws endpoint, subscribed to any topic set
+        self.multiplex_connections: Set[WebSocket] = set()
+        
+        # Inbound request types handled outside the manager, e.g. cancel_analysis
+        self.message_handlers: Dict[str, MessageHandler] = {}
         
         # Connection metadata
         self.connection_metadata: Dict[WebSocket, Dict[str, Any]] = {}
@@ -34,43 +124,84 @@ class WebSocketManager:
         # Thread safety
         self.connections_lock = threading.Lock()
         
-        # Message queues for reliable delivery
-        self.message_queues: Dict[WebSocket, List[Dict[str, Any]]] = {}
+        # Per-client send queues, each drained by its own writer task
+        self.channels: Dict[WebSocket, ClientChannel] = {}
         self.max_queue_size = 100
+        self.send_timeout = settings.WS_SEND_TIMEOUT
         
         # Statistics
         self.stats = {
             "total_connections": 0,
             "messages_sent": 0,
             "messages_failed": 0,
-            "connections_dropped": 0
+            "connections_dropped": 0,
+            "telemetry_dropped": 0,
+            "messages_dropped": 0,
+            "slow_client_disconnects": 0
         }
         
-    async def connect_telemetry(self, websocket: WebSocket):
-        """Connect client to telemetry stream"""
-        try:
-            await websocket.accept()
+        # Delta telemetry bookkeeping: last sent flattened state per subscriber
+        self.telemetry_delta_state: Dict[WebSocket, Dict[str, Any]] = {}
+        self.telemetry_seq = 0
+        self.keyframe_interval = settings.TELEMETRY_KEYFRAME_INTERVAL
+        
+        # Binary telemetry bookkeeping: last sent variable part per subscriber
+        self.telemetry_binary_state: Dict[WebSocket, Dict[str, Any]] = {}
+        self.last_variable_parts: Dict[Optional[FrozenSet[str]], bytes] = {}
+        
+        # Per-subscriber rate limits and field projections set by "subscribe"
+        self.telemetry_subscriptions: Dict[WebSocket, Dict[str, Any]] = {}
+        
+        # Per message type encode/fan-out timings
+        self.broadcast_stats: Dict[str, Dict[str, float]] = {}
+        
+    async def _connect(self, websocket: WebSocket, stream: str, connections: Set[WebSocket],
+                       metadata: Optional[Dict[str, Any]] = None, subprotocol: Optional[str] = None):
+        """Accept a connection, register it and start its writer task"""
+        await websocket.accept(subprotocol=subprotocol)
+        
+        channel = ClientChannel(websocket, self.max_queue_size)
+        with self.connections_lock:
+            connections.add(websocket)
+            self.connection_metadata[websocket] = {
+                "type": stream,
+                "connected_at": time.time(),
+                "last_ping": time.time(),
+                "messages_sent": 0,
+                **(metadata or {})
+            }
+            self.channels[websocket] = channel
+            self.stats["total_connections"] += 1
             
-            with self.connections_lock:
-                self.telemetry_connections.add(websocket)
-                self.connection_metadata[websocket] = {
-                    "type": "telemetry",
-                    "connected_at": time.time(),
-                    "last_ping": time.time(),
-                    "messages_sent": 0
-                }
-                self.message_queues[websocket] = []
-                self.stats["total_connections"] += 1
-                
-            logger.info(f"Telemetry WebSocket connected: {websocket.client}")
+        channel.writer = asyncio.create_task(self._writer(channel))
+        
+    async def connect_telemetry(self, websocket: WebSocket, mode: str = TELEMETRY_MODE_FULL):
+        """Connect client to telemetry stream
+        
+        In ``delta`` mode the client receives a full keyframe first and then
+        only the fields that changed since the last frame it was sent.
+        Clients offering the binary subprotocol in ``Sec-WebSocket-Protocol``
+        get struct-packed binary frames instead of JSON.
+        """
+        try:
+            mode = self._validate_telemetry_mode(mode)
+            encoding, subprotocol = self._negotiate_telemetry_encoding(websocket)
+            await self._connect(websocket, "telemetry", self.telemetry_connections,
+                                {"mode": mode, "encoding": encoding}, subprotocol)
+            self._init_telemetry_state(websocket, mode, encoding)
+            logger.info(f"Telemetry WebSocket connected ({mode}, {encoding}): {websocket.client}")
             
             # Send initial connection confirmation
-            await self._send_to_websocket(websocket, {
+            self._send_to_websocket(websocket, self._encode_message({
                 "type": "connection",
                 "status": "connected",
                 "stream": "telemetry",
+                "mode": mode,
+                "encoding": encoding,
+                "schema": TELEMETRY_SCHEMA_VERSION,
+                "keyframe_interval": self.keyframe_interval,
                 "timestamp": time.time()
-            })
+            }))
             
         except Exception as e:
             logger.error(f"Error connecting telemetry WebSocket: {e}")
@@ -78,91 +209,127 @@ class WebSocketManager:
             
     async def connect_alerts(self, websocket: WebSocket):
         """Connect client to alerts stream"""
-        try:
-            await websocket.accept()
-            
-            with self.connections_lock:
-                self.alert_connections.add(websocket)
-                self.connection_metadata[websocket] = {
-                    "type": "alerts",
-                    "connected_at": time.time(),
-                    "last_ping": time.time(),
-                    "messages_sent": 0
-                }
-                self.message_queues[websocket] = []
-                self.stats["total_connections"] += 1
-                
-            logger.info(f"Alerts WebSocket connected: {websocket.client}")
-            
-            await self._send_to_websocket(websocket, {
-                "type": "connection",
-                "status": "connected",
-                "stream": "alerts",
-                "timestamp": time.time()
-            })
-            
-        except Exception as e:
-            logger.error(f"Error connecting alerts WebSocket: {e}")
-            await self._cleanup_connection(websocket)
-            
+        await self._connect_stream(websocket, TOPIC_ALERTS)
+        
     async def connect_job(self, websocket: WebSocket):
         """Connect client to job updates stream"""
+        await self._connect_stream(websocket, TOPIC_JOB)
+        
+    async def connect_analysis(self, websocket: WebSocket):
+        """Connect client to analysis stream"""
+        await self._connect_stream(websocket, TOPIC_ANALYSIS)
+        
+    async def _connect_stream(self, websocket: WebSocket, topic: str):
+        """Connect a legacy single-topic endpoint"""
         try:
-            await websocket.accept()
-            
-            with self.connections_lock:
-                self.job_connections.add(websocket)
-                self.connection_metadata[websocket] = {
-                    "type": "job",
-                    "connected_at": time.time(),
-                    "last_ping": time.time(),
-                    "messages_sent": 0
-                }
-                self.message_queues[websocket] = []
-                self.stats["total_connections"] += 1
-                
-            logger.info(f"Job WebSocket connected: {websocket.client}")
+            await self._connect(websocket, topic, self.topic_connections[topic])
+            logger.info(f"{topic.title()} WebSocket connected: {websocket.client}")
             
-            await self._send_to_websocket(websocket, {
+            self._send_to_websocket(websocket, self._encode_message({
                 "type": "connection",
                 "status": "connected",
-                "stream": "job",
+                "stream": topic,
                 "timestamp": time.time()
-            })
+            }))
             
         except Exception as e:
-            logger.error(f"Error connecting job WebSocket: {e}")
+            logger.error(f"Error connecting {topic} WebSocket: {e}")
             await self._cleanup_connection(websocket)
             
-    async def connect_analysis(self, websocket: WebSocket):
-        """Connect client to analysis stream"""
+    async def connect_multiplexed(self, websocket: WebSocket, topics: Optional[List[str]] = None,
+                                  mode: str = TELEMETRY_MODE_FULL):
+        """Connect client to the multiplexed endpoint
+        
+        One connection carries any set of topics; every message keeps its
+        ``type`` tag so the client can route it. ``topics`` is the initial
+        subscription, further changes are made with subscribe/unsubscribe
+        messages (see ``handle_message``). ``mode`` and the negotiated
+        subprotocol apply to the telemetry topic as on ``/ws/telemetry``.
+        """
         try:
-            await websocket.accept()
-            
-            with self.connections_lock:
-                self.analysis_connections.add(websocket)
-                self.connection_metadata[websocket] = {
-                    "type": "analysis",
-                    "connected_at": time.time(),
-                    "last_ping": time.time(),
-                    "messages_sent": 0
-                }
-                self.message_queues[websocket] = []
-                self.stats["total_connections"] += 1
-                
-            logger.info(f"Analysis WebSocket connected: {websocket.client}")
-            
-            await self._send_to_websocket(websocket, {
+            mode = self._validate_telemetry_mode(mode)
+            encoding, subprotocol = self._negotiate_telemetry_encoding(websocket)
+            await self._connect(websocket, "multiplex", self.multiplex_connections,
+                                {"mode": mode, "encoding": encoding}, subprotocol)
+                                
+            unknown = set(topics or []) - set(TOPICS)
+            if unknown:
+                logger.warning(f"Ignoring unknown WebSocket topics: {sorted(unknown)}")
+            subscribed = self._subscribe_topics(websocket, [topic for topic in topics or [] if topic in TOPICS])
+            logger.info(f"Multiplexed WebSocket connected ({', '.join(subscribed) or 'no topics'}): {websocket.client}")
+            
+            self._send_to_websocket(websocket, self._encode_message({
                 "type": "connection",
                 "status": "connected",
-                "stream": "analysis",
+                "stream": "multiplex",
+                "topics": subscribed,
+                "available_topics": list(TOPICS),
+                "mode": mode,
+                "encoding": encoding,
+                "schema": TELEMETRY_SCHEMA_VERSION,
+                "keyframe_interval": self.keyframe_interval,
                 "timestamp": time.time()
-            })
+            }))
             
         except Exception as e:
-            logger.error(f"Error connecting analysis WebSocket: {e}")
+            logger.error(f"Error connecting multiplexed WebSocket: {e}")
             await self._cleanup_connection(websocket)
             
+    def _validate_telemetry_mode(self, mode: str) -> str:
+        """Fall back to full frames for an unknown telemetry mode"""
+        if mode not in TELEMETRY_MODES:
+            logger.warning(f"Unknown telemetry mode '{mode}', using '{TELEMETRY_MODE_FULL}'")
+            return TELEMETRY_MODE_FULL
+        return mode
+        
+    def _negotiate_telemetry_encoding(self, websocket: WebSocket) -> Tuple[str, Optional[str]]:
+        """Pick telemetry encoding and subprotocol from ``Sec-WebSocket-Protocol``"""
+        offered = websocket.scope.get("subprotocols") or []
+        if SUBPROTOCOL_BINARY in offered:
+            return TELEMETRY_ENCODING_BINARY, SUBPROTOCOL_BINARY
+        return TELEMETRY_ENCODING_JSON, SUBPROTOCOL_JSON if SUBPROTOCOL_JSON in offered else None
+        
+    def _init_telemetry_state(self, websocket: WebSocket, mode: str, encoding: str):
+        """Reset per-subscriber telemetry state so the next frame is a keyframe"""
+        if encoding == TELEMETRY_ENCODING_BINARY:
+            # Binary frames always carry the fixed part; the variable part
+            # is sent on keyframes and whenever it changes
+            self.telemetry_binary_state[websocket] = {"variable": None, "last_keyframe": 0.0}
+        elif mode == TELEMETRY_MODE_DELTA:
+            # No base yet, so the first frame is always a keyframe
+            self.telemetry_delta_state[websocket] = {"base": None, "last_keyframe": 0.0}
+            
+    def _subscribe_topics(self, websocket: WebSocket, topics: List[str]) -> List[str]:
+        """Add a multiplexed client to topics, returns its full topic list"""
+        with self.connections_lock:
+            metadata = self.connection_metadata.get(websocket)
+            if metadata is None:
+                return []
+            for topic in topics:
+                connections = self.topic_connections[topic]
+                if websocket in connections:
+                    continue
+                connections.add(websocket)
+                if topic == TOPIC_TELEMETRY:
+                    self._init_telemetry_state(websocket, metadata.get("mode", TELEMETRY_MODE_FULL),
+                                               metadata.get("encoding", TELEMETRY_ENCODING_JSON))
+            return self._get_topics(websocket)
+            
+    def _unsubscribe_topics(self, websocket: WebSocket, topics: List[str]) -> List[str]:
+        """Remove a multiplexed client from topics, returns its full topic list"""
+        with self.connections_lock:
+            for topic in topics:
+                self.topic_connections[topic].discard(websocket)
+                if topic == TOPIC_TELEMETRY:
+                    self.telemetry_delta_state.pop(websocket, None)
+                    self.telemetry_binary_state.pop(websocket, None)
+                    self.telemetry_subscriptions.pop(websocket, None)
+            return self._get_topics(websocket)
+            
+    def _get_topics(self, websocket: WebSocket) -> List[str]:
+        """Topics a connection currently receives"""
+        return [topic for topic in TOPICS if websocket in self.topic_connections[topic]]
+        
     def disconnect_telemetry(self, websocket: WebSocket):
         """Disconnect telemetry client"""
         asyncio.create_task(self._cleanup_connection(websocket))
@@ -179,6 +346,10 @@ class WebSocketManager:
         """Disconnect analysis client"""
         asyncio.create_task(self._cleanup_connection(websocket))
         
+    def disconnect(self, websocket: WebSocket):
+        """Disconnect multiplexed client"""
+        asyncio.create_task(self._cleanup_connection(websocket))
+        
     async def _cleanup_connection(self, websocket: WebSocket):
         """Clean up WebSocket connection"""
         try:
@@ -188,6 +359,7 @@ class WebSocketManager:
                 self.alert_connections.discard(websocket)
                 self.job_connections.discard(websocket)
                 self.analysis_connections.discard(websocket)
+                self.multiplex_connections.discard(websocket)
                 
                 # Clean up metadata and queues
                 if websocket in self.connection_metadata:
@@ -195,26 +367,385 @@ class WebSocketManager:
                     del self.connection_metadata[websocket]
                     logger.info(f"{connection_type.title()} WebSocket disconnected: {websocket.client}")
                     
-                if websocket in self.message_queues:
-                    del self.message_queues[websocket]
-                    
+                channel = self.channels.pop(websocket, None)
+                self.telemetry_delta_state.pop(websocket, None)
+                self.telemetry_binary_state.pop(websocket, None)
+                self.telemetry_subscriptions.pop(websocket, None)
+                
+                if channel is None:
+                    return
                 self.stats["connections_dropped"] += 1
                 
+            channel.close()
+            
         except Exception as e:
             logger.error(f"Error cleaning up WebSocket connection: {e}")
             
-    async def broadcast_telemetry(self, telemetry: Telemetry):
-        """Broadcast telemetry data to all connected clients"""
+    async def _writer(self, channel: ClientChannel):
+        """Drain one client's queue so a stalled socket only delays itself"""
+        websocket = channel.websocket
+        try:
+            while not channel.closed:
+                await channel.wakeup.wait()
+                channel.wakeup.clear()
+                
+                while not channel.closed:
+                    payload = channel.pop()
+                    if payload is None:
+                        break
+                        
+                    if not await self._write(websocket, payload):
+                        return
+                        
+        except asyncio.CancelledError:
+            pass
+            
+        except Exception as e:
+            logger.error(f"WebSocket writer error: {e}")
+            await self._cleanup_connection(websocket)
+            
+    async def _write(self, websocket: WebSocket, payload: Union[str, bytes]) -> bool:
+        """Write one payload to the socket, dropping the client if it stalls"""
         try:
-            message = TelemetryMessage(data=telemetry)
-            await self._broadcast_to_connections(self.telemetry_connections, message.dict())
+            if isinstance(payload, bytes):
+                send = websocket.send_bytes(payload)
+            else:
+                send = websocket.send_text(payload)
+            await asyncio.wait_for(send, timeout=self.send_timeout)
+            
+            # Update statistics
+            with self.connections_lock:
+                if websocket in self.connection_metadata:
+                    self.connection_metadata[websocket]["messages_sent"] += 1
+                    self.connection_metadata[websocket]["last_ping"] = time.time()
+                    
+                self.stats["messages_sent"] += 1
+            return True
+            
+        except asyncio.TimeoutError:
+            logger.warning(f"WebSocket send stalled for {self.send_timeout}s, dropping slow client: {websocket.client}")
+            self.stats["slow_client_disconnects"] += 1
+            self.stats["messages_failed"] += 1
+            await self._cleanup_connection(websocket)
+            try:
+                await websocket.close(code=1013)
+            except Exception:
+                pass
+            return False
+            
+        except WebSocketDisconnect:
+            logger.info(f"WebSocket disconnected during send: {websocket.client}")
+            await self._cleanup_connection(websocket)
+            return False
+            
+        except Exception as e:
+            logger.error(f"Error sending WebSocket message: {e}")
+            self.stats["messages_failed"] += 1
+            
+            # Clean up problematic connection
+            await self._cleanup_connection(websocket)
+            return False
             
+    async def broadcast_telemetry(self, telemetry: Telemetry, seq: Optional[int] = None):
+        """Broadcast telemetry data to all connected clients
+        
+        ``seq`` is the telemetry snapshot version; a local counter is used
+        when it is not given.
+        """
+        try:
+            if not self.telemetry_connections:
+                return
+                
+            started = time.perf_counter()
+            message_data = TelemetryMessage(data=telemetry).dict()
+            self.telemetry_seq = seq if seq is not None else self.telemetry_seq + 1
+            message_data["seq"] = self.telemetry_seq
+            message_data["schema"] = TELEMETRY_SCHEMA_VERSION
+            
+            # Group due subscribers by stream kind and field set, so each
+            # distinct combination is projected and encoded once per tick
+            now = time.monotonic()
+            groups: Dict[Tuple[str, Optional[FrozenSet[str]]], Set[WebSocket]] = {}
+            with self.connections_lock:
+                for websocket in self.telemetry_connections:
+                    fields = None
+                    subscription = self.telemetry_subscriptions.get(websocket)
+                    if subscription:
+                        if now - subscription["last_sent"] < subscription["min_interval"] * RATE_TOLERANCE:
+                            continue
+                        subscription["last_sent"] = now
+                        fields = subscription["fields"]
+                        
+                    if websocket in self.telemetry_binary_state:
+                        kind = "binary"
+                    elif websocket in self.telemetry_delta_state:
+                        kind = "delta"
+                    else:
+                        kind = "full"
+                    groups.setdefault((kind, fields), set()).add(websocket)
+                    
+            for (kind, fields), connections in groups.items():
+                if kind == "binary":
+                    self._broadcast_telemetry_binary(connections, message_data, fields)
+                    continue
+                    
+                group_data = {**message_data, "data": project_fields(message_data["data"], fields)}
+                if kind == "delta":
+                    self._broadcast_telemetry_delta(connections, group_data)
+                else:
+                    payload = self._encode_message(group_data)
+                    self._broadcast_encoded("telemetry", connections, payload, started, telemetry=True)
+                    
         except Exception as e:
             logger.error(f"Error broadcasting telemetry: {e}")
             
+    def _broadcast_telemetry_delta(self, connections: Set[WebSocket], message_data: Dict[str, Any]):
+        """Send keyframes or field diffs to delta-mode telemetry subscribers
+        
+        Subscribers that were sent the same previous frame share one base
+        state object, so each distinct diff is computed and encoded once.
+        A subscriber whose previous frame is still unsent gets a keyframe,
+        since replacing a pending diff would otherwise lose changes.
+        """
+        started = time.perf_counter()
+        now = time.monotonic()
+        current = flatten_fields(message_data["data"])
+        
+        keyframe_connections = set()
+        delta_groups: Dict[int, Dict[str, Any]] = {}
+        for websocket in connections:
+            state = self.telemetry_delta_state.get(websocket)
+            channel = self.channels.get(websocket)
+            if state is None or channel is None:
+                continue
+            if (state["base"] is None or channel.telemetry is not None
+                    or now - state["last_keyframe"] >= self.keyframe_interval):
+                keyframe_connections.add(websocket)
+                state["last_keyframe"] = now
+            else:
+                group = delta_groups.setdefault(id(state["base"]), {"base": state["base"], "connections": set()})
+                group["connections"].add(websocket)
+            state["base"] = current
+            
+        if keyframe_connections:
+            payload = self._encode_message({**message_data, "keyframe": True})
+            self._broadcast_encoded("telemetry_keyframe", keyframe_connections, payload, started, telemetry=True)
+            
+        for group in delta_groups.values():
+            group_started = time.perf_counter()
+            changed, removed = diff_fields(group["base"], current)
+            payload = self._encode_message({
+                "type": "telemetry_delta",
+                "timestamp": message_data["timestamp"],
+                "seq": message_data["seq"],
+                "schema": TELEMETRY_SCHEMA_VERSION,
+                "changed": changed,
+                "removed": removed
+            })
+            self._broadcast_encoded("telemetry_delta", group["connections"], payload, group_started, telemetry=True)
+            
+    def _broadcast_telemetry_binary(self, connections: Set[WebSocket], message_data: Dict[str, Any],
+                                    fields: Optional[FrozenSet[str]] = None):
+        """Send struct-packed telemetry frames to binary subscribers
+        
+        The variable part is encoded once per tick and field set, and only
+        attached for subscribers whose last received variable part differs,
+        whose previous frame is still unsent, or whose keyframe interval has
+        elapsed. The fixed part is always sent in full.
+        """
+        started = time.perf_counter()
+        now = time.monotonic()
+        data = message_data["data"]
+        seq = message_data["seq"]
+        variable = encode_variable_part(project_fields(data, fields))
+        last_variable = self.last_variable_parts.get(fields)
+        changed_since_last_tick = variable != last_variable
+        
+        groups: Dict[str, Set[WebSocket]] = {"keyframe": set(), "changed": set(), "fixed": set()}
+        for websocket in connections:
+            state = self.telemetry_binary_state.get(websocket)
+            channel = self.channels.get(websocket)
+            if state is None or channel is None:
+                continue
+            if (state["variable"] is None or channel.telemetry is not None
+                    or now - state["last_keyframe"] >= self.keyframe_interval):
+                groups["keyframe"].add(websocket)
+                state["last_keyframe"] = now
+            elif state["variable"] is last_variable:
+                groups["changed" if changed_since_last_tick else "fixed"].add(websocket)
+            else:
+                groups["changed" if state["variable"] != variable else "fixed"].add(websocket)
+            state["variable"] = variable
+        self.last_variable_parts[fields] = variable
+        
+        for group, group_connections in groups.items():
+            if not group_connections:
+                continue
+            group_started = started if group == "keyframe" else time.perf_counter()
+            payload = encode_binary_frame(
+                data, seq,
+                variable=variable if group != "fixed" else None,
+                keyframe=group == "keyframe"
+            )
+            self._broadcast_encoded(f"telemetry_binary_{group}", group_connections, payload, group_started, telemetry=True)
+            
+    async def handle_telemetry_message(self, websocket: WebSocket, message: str):
+        """Handle an inbound message on the telemetry stream
+        
+        ``{"type": "subscribe", "max_rate": 1, "fields": ["state", "estop"]}``
+        limits the client to ``max_rate`` Hz and the listed top-level fields.
+        Omitting either restores the full rate or the full field set.
+        """
+        try:
+            request = json.loads(message)
+            if not isinstance(request, dict) or request.get("type") != "subscribe":
+                return
+                
+            max_rate, fields = self._parse_telemetry_options(request)
+            if not self._apply_telemetry_options(websocket, max_rate, fields):
+                return
+                
+            self._send_to_websocket(websocket, self._encode_message({
+                "type": "subscribed",
+                "max_rate": max_rate,
+                "fields": sorted(fields) if fields is not None else None,
+                "timestamp": time.time()
+            }))
+            
+        except (ValueError, TypeError) as e:
+            self._send_error(websocket, f"Invalid subscription: {e}")
+            
+        except Exception as e:
+            logger.error(f"Error handling telemetry message: {e}")
+            
+    def add_message_handler(self, message_type: str, handler: MessageHandler):
+        """Route inbound ``{"type": message_type, ...}`` requests to ``handler``"""
+        self.message_handlers[message_type] = handler
+        
+    async def handle_command(self, websocket: WebSocket, message: str) -> bool:
+        """Pass an inbound request to its registered handler, returns whether one took it"""
+        try:
+            request = json.loads(message)
+        except ValueError:
+            return False
+        if not isinstance(request, dict) or request.get("type") not in self.message_handlers:
+            return False
+            
+        try:
+            reply = await self.message_handlers[request["type"]](request)
+            if reply is not None:
+                self._send_to_websocket(websocket, self._encode_message(reply))
+                
+        except (ValueError, TypeError) as e:
+            self._send_error(websocket, f"Invalid {request['type']} request: {e}")
+            
+        except Exception as e:
+            logger.error(f"Error handling {request['type']} request: {e}")
+            
+        return True
+        
+    async def handle_message(self, websocket: WebSocket, message: str):
+        """Handle an inbound message on the multiplexed endpoint
+        
+        ``{"type": "subscribe", "topics": ["telemetry", "alerts"]}`` adds
+        topics and ``{"type": "unsubscribe", "topics": ["alerts"]}`` removes
+        them. A subscribe may also carry the telemetry ``max_rate`` and
+        ``fields`` options accepted on ``/ws/telemetry``. Both are answered
+        with a ``subscribed`` message listing every current topic.
+        """
+        if await self.handle_command(websocket, message):
+            return
+            
+        try:
+            request = json.loads(message)
+            if not isinstance(request, dict):
+                return
+            action = request.get("type")
+            if action not in ("subscribe", "unsubscribe"):
+                return
+                
+            topics = request.get("topics") or []
+            if not isinstance(topics, list):
+                raise ValueError("topics must be a list")
+            unknown = set(topics) - set(TOPICS)
+            if unknown:
+                raise ValueError(f"Unknown topics: {sorted(unknown)}, available: {list(TOPICS)}")
+                
+            if action == "unsubscribe":
+                subscribed = self._unsubscribe_topics(websocket, topics)
+                reply = {"type": "subscribed", "topics": subscribed, "timestamp": time.time()}
+            else:
+                max_rate, fields = self._parse_telemetry_options(request)
+                has_options = "max_rate" in request or "fields" in request
+                if has_options and TOPIC_TELEMETRY not in topics and websocket not in self.telemetry_connections:
+                    raise ValueError("max_rate and fields require the telemetry topic")
+                    
+                subscribed = self._subscribe_topics(websocket, topics)
+                reply = {"type": "subscribed", "topics": subscribed, "timestamp": time.time()}
+                if has_options:
+                    self._apply_telemetry_options(websocket, max_rate, fields)
+                    reply["max_rate"] = max_rate
+                    reply["fields"] = sorted(fields) if fields is not None else None
+                    
+            self._send_to_websocket(websocket, self._encode_message(reply))
+            
+        except (ValueError, TypeError) as e:
+            self._send_error(websocket, f"Invalid subscription: {e}")
+            
+        except Exception as e:
+            logger.error(f"Error handling WebSocket message: {e}")
+            
+    def _parse_telemetry_options(self, request: Dict[str, Any]) -> Tuple[Optional[float], Optional[FrozenSet[str]]]:
+        """Validate the ``max_rate`` and ``fields`` of a telemetry subscription"""
+        max_rate = request.get("max_rate")
+        if max_rate is not None and (not isinstance(max_rate, (int, float)) or max_rate <= 0):
+            raise ValueError(f"max_rate must be a positive number, got {max_rate!r}")
+            
+        fields = request.get("fields")
+        if fields is not None:
+            unknown = set(fields) - set(Telemetry.__fields__)
+            if unknown:
+                raise ValueError(f"Unknown telemetry fields: {sorted(unknown)}")
+            fields = frozenset(fields)
+        return max_rate, fields
+        
+    def _apply_telemetry_options(self, websocket: WebSocket, max_rate: Optional[float],
+                                 fields: Optional[FrozenSet[str]]) -> bool:
+        """Set a telemetry subscriber's rate limit and field set"""
+        with self.connections_lock:
+            if websocket not in self.telemetry_connections:
+                return False
+            if max_rate is None and fields is None:
+                self.telemetry_subscriptions.pop(websocket, None)
+            else:
+                self.telemetry_subscriptions[websocket] = {
+                    "min_interval": 1.0 / max_rate if max_rate else 0.0,
+                    "fields": fields,
+                    "last_sent": 0.0
+                }
+                
+            # A new field set invalidates the client's delta/binary base
+            if websocket in self.telemetry_delta_state:
+                self.telemetry_delta_state[websocket]["base"] = None
+            if websocket in self.telemetry_binary_state:
+                self.telemetry_binary_state[websocket]["variable"] = None
+        return True
+        
+    def _send_error(self, websocket: WebSocket, message: str):
+        """Queue an error reply for a rejected client request"""
+        self._send_to_websocket(websocket, self._encode_message({
+            "type": "error",
+            "message": message,
+            "timestamp": time.time()
+        }))
+        
     async def broadcast_alert(self, alert_type: str, message: str, severity: str = "info", data: Optional[Dict[str, Any]] = None):
         """Broadcast alert to all connected clients"""
         try:
+            if not self.alert_connections:
+                return
+                
+            started = time.perf_counter()
             alert_data = {
                 "alert_type": alert_type,
                 "message": message,
@@ -223,7 +754,8 @@ class WebSocketManager:
             }
             
             message_obj = AlertMessage(data=alert_data)
-            await self._broadcast_to_connections(self.alert_connections, message_obj.dict())
+            payload = self._encode_message(message_obj.dict())
+            self._broadcast_encoded("alert", self.alert_connections, payload, started)
             
         except Exception as e:
             logger.error(f"Error broadcasting alert: {e}")
@@ -231,6 +763,10 @@ class WebSocketManager:
     async def broadcast_job_update(self, job_id: str, status: str, progress: Optional[float] = None, data: Optional[Dict[str, Any]] = None):
         """Broadcast job update to all connected clients"""
         try:
+            if not self.job_connections:
+                return
+                
+            started = time.perf_counter()
             job_data = {
                 "job_id": job_id,
                 "status": status,
@@ -239,7 +775,8 @@ class WebSocketManager:
             }
             
             message = JobMessage(data=job_data)
-            await self._broadcast_to_connections(self.job_connections, message.dict())
+            payload = self._encode_message(message.dict())
+            self._broadcast_encoded("job", self.job_connections, payload, started)
             
         except Exception as e:
             logger.error(f"Error broadcasting job update: {e}")
@@ -247,68 +784,72 @@ class WebSocketManager:
     async def broadcast_analysis(self, analysis_type: str, result: Dict[str, Any]):
         """Broadcast analysis result to all connected clients"""
         try:
+            if not self.analysis_connections:
+                return
+                
+            started = time.perf_counter()
             analysis_data = {
                 "analysis_type": analysis_type,
                 "result": result
             }
             
             message = AnalysisMessage(data=analysis_data)
-            await self._broadcast_to_connections(self.analysis_connections, message.dict())
+            payload = self._encode_message(message.dict())
+            self._broadcast_encoded("analysis", self.analysis_connections, payload, started)
             
         except Exception as e:
             logger.error(f"Error broadcasting analysis: {e}")
             
-    async def _broadcast_to_connections(self, connections: Set[WebSocket], message_data: Dict[str, Any]):
-        """Broadcast message to a set of connections"""
-        if not connections:
-            return
-            
-        # Create list of connections to avoid modification during iteration
-        connection_list = list(connections)
+    def _encode_message(self, message_data: Dict[str, Any]) -> str:
+        """Encode a message once so it can be shared by every subscriber"""
+        return json.dumps(message_data, separators=(",", ":"))
         
-        # Send to all connections concurrently
-        tasks = []
-        for websocket in connection_list:
-            task = asyncio.create_task(self._send_to_websocket(websocket, message_data))
-            tasks.append(task)
-            
-        # Wait for all sends to complete
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
-            
-    async def _send_to_websocket(self, websocket: WebSocket, message_data: Dict[str, Any]):
-        """Send message to a specific WebSocket connection"""
-        try:
-            # Add to message queue first
-            if websocket in self.message_queues:
-                self.message_queues[websocket].append(message_data)
-                
-                # Limit queue size
-                if len(self.message_queues[websocket]) > self.max_queue_size:
-                    self.message_queues[websocket] = self.message_queues[websocket][-self.max_queue_size:]
-                    
-            # Send message
-            await websocket.send_text(json.dumps(message_data))
-            
-            # Update statistics
-            with self.connections_lock:
-                if websocket in self.connection_metadata:
-                    self.connection_metadata[websocket]["messages_sent"] += 1
-                    self.connection_metadata[websocket]["last_ping"] = time.time()
-                    
-                self.stats["messages_sent"] += 1
+    def _broadcast_encoded(self, message_type: str, connections: Set[WebSocket], payload: Union[str, bytes],
+                           started: float, telemetry: bool = False):
+        """Fan out a pre-encoded payload and record encode/fan-out timings
+        
+        ``started`` is the ``time.perf_counter()`` value taken before the
+        message was built, so encode time covers model serialization too.
+        Fan-out only enqueues, so it never waits on a slow client.
+        """
+        encoded = time.perf_counter()
+        self._broadcast_to_connections(connections, payload, telemetry)
+        finished = time.perf_counter()
+        
+        timing = self.broadcast_stats.setdefault(message_type, {
+            "broadcasts": 0,
+            "recipients": 0,
+            "bytes_encoded": 0,
+            "encode_ms_total": 0.0,
+            "fanout_ms_total": 0.0,
+            "last_encode_ms": 0.0,
+            "last_fanout_ms": 0.0
+        })
+        timing["broadcasts"] += 1
+        timing["recipients"] += len(connections)
+        timing["bytes_encoded"] += len(payload)
+        timing["last_encode_ms"] = (encoded - started) * 1000
+        timing["last_fanout_ms"] = (finished - encoded) * 1000
+        timing["encode_ms_total"] += timing["last_encode_ms"]
+        timing["fanout_ms_total"] += timing["last_fanout_ms"]
+        
+    def _broadcast_to_connections(self, connections: Set[WebSocket], payload: Union[str, bytes], telemetry: bool = False):
+        """Queue a pre-encoded payload on each connection's channel"""
+        # Create list of connections to avoid modification during iteration
+        for websocket in list(connections):
+            channel = self.channels.get(websocket)
+            if channel is None:
+                continue
+            if telemetry:
+                if channel.push_telemetry(payload):
+                    self.stats["telemetry_dropped"] += 1
+            elif channel.push_message(payload):
+                self.stats["messages_dropped"] += 1
                 
-        except WebSocketDisconnect:
-            logger.info(f"WebSocket disconnected during send: {websocket.client}")
-            await self._cleanup_connection(websocket)
-            
-        except Exception as e:
-            logger.error(f"Error sending WebSocket message: {e}")
-            self.stats["messages_failed"] += 1
-            
-            # Clean up problematic connection
-            await self._cleanup_connection(websocket)
-            
+    def _send_to_websocket(self, websocket: WebSocket, payload: str):
+        """Queue a pre-encoded message for a specific WebSocket connection"""
+        self._broadcast_to_connections({websocket}, payload)
+        
     async def send_to_specific_client(self, websocket: WebSocket, message_type: str, data: Dict[str, Any]):
         """Send message to a specific client"""
         try:
@@ -318,7 +859,7 @@ class WebSocketManager:
                 "data": data
             }
             
-            await self._send_to_websocket(websocket, message)
+            self._send_to_websocket(websocket, self._encode_message(message))
             
         except Exception as e:
             logger.error(f"Error sending message to specific client: {e}")
@@ -326,11 +867,8 @@ class WebSocketManager:
     def get_connection_count(self) -> int:
         """Get total number of active connections"""
         with self.connections_lock:
-            return (len(self.telemetry_connections) + 
-                   len(self.alert_connections) + 
-                   len(self.job_connections) + 
-                   len(self.analysis_connections))
-                   
+            return len(self.channels)
+            
     def get_connection_stats(self) -> Dict[str, Any]:
         """Get connection statistics"""
         with self.connections_lock:
@@ -339,26 +877,36 @@ class WebSocketManager:
                 "alert_connections": len(self.alert_connections),
                 "job_connections": len(self.job_connections),
                 "analysis_connections": len(self.analysis_connections),
-                "total_active": self.get_connection_count(),
-                "stats": self.stats.copy()
+                "multiplex_connections": len(self.multiplex_connections),
+                "total_active": len(self.channels),
+                "stats": self.stats.copy(),
+                "broadcast": self.get_broadcast_stats()
             }
             
+    def get_broadcast_stats(self) -> Dict[str, Dict[str, float]]:
+        """Get encode and fan-out timings per message type"""
+        broadcast = {}
+        for message_type, timing in self.broadcast_stats.items():
+            count = timing["broadcasts"] or 1
+            broadcast[message_type] = {
+                **timing,
+                "avg_encode_ms": timing["encode_ms_total"] / count,
+                "avg_fanout_ms": timing["fanout_ms_total"] / count
+            }
+        return broadcast
+        
     async def ping_all_connections(self):
         """Send ping to all connections to check health"""
         try:
-            ping_message = {
+            ping_message = self._encode_message({
                 "type": "ping",
                 "timestamp": time.time()
-            }
+            })
             
-            all_connections = set()
             with self.connections_lock:
-                all_connections.update(self.telemetry_connections)
-                all_connections.update(self.alert_connections)
-                all_connections.update(self.job_connections)
-                all_connections.update(self.analysis_connections)
+                all_connections = set(self.channels)
                 
-            await self._broadcast_to_connections(all_connections, ping_message)
+            self._broadcast_to_connections(all_connections, ping_message)
             
         except Exception as e:
             logger.error(f"Error pinging connections: {e}")
@@ -370,13 +918,17 @@ class WebSocketManager:
             
             with self.connections_lock:
                 for websocket, metadata in self.connection_metadata.items():
+                    channel = self.channels.get(websocket)
                     info = {
                         "client": str(websocket.client) if websocket.client else "unknown",
                         "type": metadata.get("type", "unknown"),
+                        "topics": self._get_topics(websocket),
                         "connected_at": metadata.get("connected_at", 0),
                         "last_ping": metadata.get("last_ping", 0),
                         "messages_sent": metadata.get("messages_sent", 0),
-                        "queue_size": len(self.message_queues.get(websocket, []))
+                        "queue_size": channel.queue_depth if channel else 0,
+                        "telemetry_dropped": channel.telemetry_dropped if channel else 0,
+                        "messages_dropped": channel.messages_dropped if channel else 0
                     }
                     connection_info.append(info)
                     
@@ -385,4 +937,3 @@ class WebSocketManager:
         except Exception as e:
             logger.error(f"Error getting connection info: {e}")
             return []
-
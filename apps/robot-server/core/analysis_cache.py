@@ -0,0 +1,206 @@
+"""
+Position analysis cache for UR10 Robot Server
+Keeps engine results by normalized position in a bounded in-memory LRU,
+backed by an optional SQLite file that survives restarts
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import chess
+import chess.polyglot
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class CachedAnalysis:
+    """An engine result and the search effort behind it
+    
+    ``search_time`` is the time limit that cut the search short, or None
+    if the search completed ``depth``.
+    """
+    epd: str
+    depth: int
+    search_time: Optional[float]
+    result: Dict[str, Any]
+    stored_at: float
+    
+    def satisfies(self, depth: Optional[int], time_limit: Optional[float]) -> bool:
+        """Whether a request would have stopped no later than this search
+        
+        A search stops at whichever of its limits it reaches first. One that
+        completed its depth answers requests for that depth or less, whatever
+        their time limit. One cut short by time, whose last depth may be
+        unfinished, answers requests for that time or less, or for a depth
+        it got past.
+        """
+        if self.search_time is None:
+            return depth is not None and self.depth >= depth
+        if time_limit is not None and self.search_time >= time_limit:
+            return True
+        return depth is not None and self.depth > depth
+
+def position_key(board: chess.Board) -> int:
+    """Zobrist key of the position; move counters are not part of it"""
+    return chess.polyglot.zobrist_hash(board)
+
+class AnalysisCache:
+    """Two-tier analysis cache keyed by Zobrist hash
+    
+    Only the deepest result per position is kept, so one entry answers every
+    request that would have stopped no later than its search. The disk tier
+    is read through on memory misses and written behind on every store, on
+    its own worker thread.
+    """
+    
+    def __init__(self, max_entries: int = 1024, db_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self.entries: "OrderedDict[int, CachedAnalysis]" = OrderedDict()
+        
+        self.db: Optional[sqlite3.Connection] = None
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="analysis-cache")
+        
+        # Statistics
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        
+    async def open(self):
+        """Open the disk tier, if one is configured"""
+        if not self.db_path:
+            return
+        try:
+            await asyncio.get_event_loop().run_in_executor(self.executor, self._open_sync)
+            logger.info(f"Analysis cache disk tier at {self.db_path}")
+        except Exception as e:
+            logger.error(f"Failed to open analysis cache {self.db_path}: {e}")
+            self.db = None
+            
+    async def close(self):
+        """Close the disk tier and release the worker thread"""
+        if self.db:
+            await asyncio.get_event_loop().run_in_executor(self.executor, self.db.close)
+            self.db = None
+        self.executor.shutdown(wait=False)
+        
+    async def get(self, board: chess.Board, depth: Optional[int],
+                  time_limit: Optional[float]) -> Optional[CachedAnalysis]:
+        """Cached result for ``board`` that is at least as deep as requested"""
+        key = position_key(board)
+        epd = board.epd()
+        
+        entry = self.entries.get(key)
+        if entry and entry.epd == epd and entry.satisfies(depth, time_limit):
+            self.entries.move_to_end(key)
+            self.memory_hits += 1
+            return entry
+            
+        if self.db:
+            try:
+                stored = await asyncio.get_event_loop().run_in_executor(self.executor, self._load_sync, key)
+            except Exception as e:
+                logger.error(f"Analysis cache read error: {e}")
+                stored = None
+            if stored and stored.epd == epd and stored.satisfies(depth, time_limit):
+                self._remember(key, stored)
+                self.disk_hits += 1
+                return stored
+                
+        self.misses += 1
+        return None
+        
+    def peek(self, board: chess.Board) -> Optional[CachedAnalysis]:
+        """Memory-tier entry for ``board`` of any depth, without counting a lookup"""
+        entry = self.entries.get(position_key(board))
+        return entry if entry and entry.epd == board.epd() else None
+        
+    async def put(self, board: chess.Board, depth: int, search_time: Optional[float], result: Dict[str, Any]):
+        """Store a result unless a deeper one is already cached"""
+        key = position_key(board)
+        entry = CachedAnalysis(board.epd(), depth, search_time, result, time.time())
+        
+        current = self.entries.get(key)
+        if current and current.epd == entry.epd and current.depth > depth:
+            return
+            
+        self._remember(key, entry)
+        self.stores += 1
+        
+        if self.db:
+            try:
+                await asyncio.get_event_loop().run_in_executor(self.executor, self._store_sync, key, entry)
+            except Exception as e:
+                logger.error(f"Analysis cache write error: {e}")
+                
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit rates per tier and occupancy"""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "disk": self.db is not None,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions
+        }
+        
+    def _remember(self, key: int, entry: CachedAnalysis):
+        """Insert into the memory tier, evicting the least recently used"""
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+            
+    def _open_sync(self):
+        """Open the SQLite file and create the table"""
+        self.db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS analysis ("
+            "key INTEGER PRIMARY KEY, epd TEXT, depth INTEGER, "
+            "search_time REAL, result TEXT, stored_at REAL)"
+        )
+        self.db.commit()
+        
+    def _load_sync(self, key: int) -> Optional[CachedAnalysis]:
+        """Read one entry from the disk tier"""
+        row = self.db.execute(
+            "SELECT epd, depth, search_time, result, stored_at FROM analysis WHERE key = ?",
+            (self._signed(key),)
+        ).fetchone()
+        if row is None:
+            return None
+        epd, depth, search_time, result, stored_at = row
+        return CachedAnalysis(epd, depth, search_time, json.loads(result), stored_at)
+        
+    def _store_sync(self, key: int, entry: CachedAnalysis):
+        """Write one entry to the disk tier unless a deeper one is there"""
+        self.db.execute(
+            "INSERT INTO analysis (key, epd, depth, search_time, result, stored_at) "
+            "VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET epd = excluded.epd, depth = excluded.depth, "
+            "search_time = excluded.search_time, result = excluded.result, stored_at = excluded.stored_at "
+            "WHERE excluded.depth >= analysis.depth OR excluded.epd != analysis.epd",
+            (self._signed(key), entry.epd, entry.depth, entry.search_time,
+             json.dumps(entry.result), entry.stored_at)
+        )
+        self.db.commit()
+        
+    @staticmethod
+    def _signed(key: int) -> int:
+        """SQLite integers are signed 64-bit"""
+        return key - (1 << 64) if key >= (1 << 63) else key
@@ -0,0 +1,352 @@
+"""
+Analysis job queue for UR10 Robot Server
+Schedules submitted analysis jobs onto a fixed number of engine slots by
+priority class and deadline, preempting less important searches
+"""
+
+import asyncio
+import heapq
+import logging
+import math
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import chess
+
+from core.chess_analysis import ChessAnalysisService, JOB_CHANNEL_PREFIX, PRIORITIES, PRIORITY_HINT
+
+logger = logging.getLogger(__name__)
+
+# Job states
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+FINISHED_STATES = (JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED)
+
+# Seconds kept free before a deadline for the result to reach the caller
+DEADLINE_MARGIN = 0.1
+
+@dataclass
+class AnalysisJob:
+    """One submitted analysis and its progress"""
+    id: str
+    fen: str
+    priority: str
+    depth: Optional[int] = None
+    time_limit: Optional[float] = None
+    deadline: Optional[float] = None  # time.monotonic()
+    sequence: int = 0
+    status: str = JOB_QUEUED
+    progress: float = 0.0
+    info: Optional[Dict[str, Any]] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    preemptions: int = 0
+    deadline_missed: bool = False
+    
+    @property
+    def channel(self) -> str:
+        """Analysis channel the job searches on"""
+        return JOB_CHANNEL_PREFIX + self.id
+        
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+        
+    def sort_key(self):
+        """Priority class first, then earliest deadline, then submission order"""
+        return (PRIORITIES[self.priority], self.deadline if self.deadline is not None else math.inf, self.sequence)
+        
+    def __lt__(self, other: "AnalysisJob") -> bool:
+        return self.sort_key() < other.sort_key()
+        
+    def to_dict(self) -> Dict[str, Any]:
+        remaining = self.deadline - time.monotonic() if self.deadline is not None else None
+        return {
+            "job_id": self.id,
+            "fen": self.fen,
+            "priority": self.priority,
+            "depth": self.depth,
+            "time": self.time_limit,
+            "deadline_in": remaining,
+            "status": self.status,
+            "progress": self.progress,
+            "info": self.info,
+            "result": self.result,
+            "error": self.error,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "preemptions": self.preemptions,
+            "deadline_missed": self.deadline_missed
+        }
+
+JobListener = Callable[[AnalysisJob, str], Awaitable[None]]
+
+class AnalysisJobQueue:
+    """Runs analysis jobs on ``workers`` slots in priority and deadline order
+    
+    Queued jobs start by priority class, earliest deadline first within a
+    class. When every slot is busy, a job of a more important class preempts
+    the least important running one, which goes back to the queue and starts
+    over later (the analysis cache keeps whatever it finished). A job that
+    is still queued when its deadline passes fails without searching; a job
+    that starts has its search time capped to the time left. A running job
+    that waits for a pooled engine is served in its priority class, and
+    takes the engine of a less important direct request or speculative
+    search if none is free.
+    
+    ``on_update(job, event)`` is called on every state change and, while a
+    job searches, for each info line. ``version`` is bumped on every state
+    change, but not on progress, so queue summaries can be cached.
+    """
+    
+    def __init__(self, analysis: ChessAnalysisService, workers: int = 1, history: int = 256,
+                 on_update: Optional[JobListener] = None):
+        self.analysis = analysis
+        self.workers = max(1, workers)
+        self.history = history
+        self.on_update = on_update
+        
+        self.jobs: "OrderedDict[str, AnalysisJob]" = OrderedDict()
+        self.queue: List[AnalysisJob] = []
+        self.running: Dict[str, asyncio.Task] = {}
+        self.preempting: set = set()
+        self.next_sequence = 0
+        self.stopping = False
+        self.version = 0
+        
+        # Statistics
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.preemptions = 0
+        self.deadline_misses = 0
+        self.total_wait = 0.0
+        self.started = 0
+        
+    async def submit(self, fen: str, priority: str = PRIORITY_HINT, depth: Optional[int] = None,
+                     time_limit: Optional[float] = None, deadline: Optional[float] = None) -> AnalysisJob:
+        """Queue a job, ``deadline`` in seconds from now; raises ValueError on bad input"""
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority {priority!r}, expected one of {', '.join(PRIORITIES)}")
+        if deadline is not None and deadline <= 0:
+            raise ValueError("Deadline must be in the future")
+        chess.Board(fen)
+        
+        self.next_sequence += 1
+        job = AnalysisJob(
+            id=uuid.uuid4().hex,
+            fen=fen,
+            priority=priority,
+            depth=depth,
+            time_limit=time_limit,
+            deadline=time.monotonic() + deadline if deadline is not None else None,
+            sequence=self.next_sequence
+        )
+        self.jobs[job.id] = job
+        self.submitted += 1
+        self._prune()
+        
+        heapq.heappush(self.queue, job)
+        await self._notify(job, JOB_QUEUED)
+        await self._dispatch()
+        return job
+        
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        """Job by id, while it is queued, running or in the recent history"""
+        return self.jobs.get(job_id)
+        
+    def list_jobs(self, status: Optional[str] = None) -> List[AnalysisJob]:
+        """Known jobs, optionally only those in ``status``"""
+        return [job for job in self.jobs.values() if status is None or job.status == status]
+        
+    async def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job, returns False if it already finished"""
+        job = self.jobs.get(job_id)
+        if not job or job.finished:
+            return False
+            
+        task = self.running.get(job_id)
+        if task:
+            self.preempting.discard(job_id)
+            task.cancel()
+            return True
+            
+        self.queue.remove(job)
+        heapq.heapify(self.queue)
+        await self._finish(job, JOB_CANCELLED)
+        return True
+        
+    async def stop(self):
+        """Cancel every queued and running job"""
+        self.stopping = True
+        self.preempting.clear()
+        queued, self.queue = self.queue, []
+        for job in queued:
+            await self._finish(job, JOB_CANCELLED)
+        tasks = list(self.running.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth per priority, outcomes, preemptions and waits"""
+        return {
+            "workers": self.workers,
+            "running": len(self.running),
+            "queued": {name: sum(1 for job in self.queue if job.priority == name) for name in PRIORITIES},
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "preemptions": self.preemptions,
+            "deadline_misses": self.deadline_misses,
+            "avg_wait_ms": self.total_wait / self.started * 1000 if self.started else 0.0
+        }
+        
+    async def _dispatch(self):
+        """Start queued jobs on free slots, preempting for more important ones"""
+        while self.queue and not self.stopping:
+            job = self.queue[0]
+            if job.deadline is not None and job.deadline - DEADLINE_MARGIN <= time.monotonic():
+                heapq.heappop(self.queue)
+                job.deadline_missed = True
+                job.error = "Deadline expired before the job could start"
+                await self._finish(job, JOB_FAILED)
+                continue
+                
+            if len(self.running) >= self.workers:
+                # A preempted job frees its slot and dispatches again once its task unwinds
+                if not self.preempting:
+                    self._preempt_for(job)
+                return
+                
+            heapq.heappop(self.queue)
+            self.running[job.id] = asyncio.create_task(self._run(job))
+            
+    def _preempt_for(self, job: AnalysisJob) -> bool:
+        """Preempt the least important running job of a lower class than ``job``"""
+        candidates = [
+            self.jobs[job_id] for job_id in self.running
+            if job_id not in self.preempting
+            and PRIORITIES[self.jobs[job_id].priority] > PRIORITIES[job.priority]
+        ]
+        if not candidates:
+            return False
+            
+        victim = max(candidates, key=AnalysisJob.sort_key)
+        logger.info(f"Preempting {victim.priority} analysis job {victim.id} for {job.priority} job {job.id}")
+        self.preempting.add(victim.id)
+        self.running[victim.id].cancel()
+        return True
+        
+    async def _run(self, job: AnalysisJob):
+        """Search one job and record its outcome"""
+        depth, time_limit = job.depth, job.time_limit
+        if job.deadline is not None:
+            left = job.deadline - DEADLINE_MARGIN - time.monotonic()
+            if left <= 0:
+                # Expired between dispatch and start, no time left to search
+                self.running.pop(job.id, None)
+                self.preempting.discard(job.id)
+                job.deadline_missed = True
+                job.error = "Deadline expired before the job could start"
+                await self._finish(job, JOB_FAILED)
+                await self._dispatch()
+                return
+            if depth is None and time_limit is None:
+                depth, time_limit = self.analysis.default_depth, self.analysis.default_time
+            time_limit = min(time_limit, left) if time_limit is not None else left
+            
+        job.status = JOB_RUNNING
+        job.started_at = time.time()
+        job.progress = 0.0
+        self.started += 1
+        self.total_wait += job.started_at - job.submitted_at
+        started = time.monotonic()
+        
+        async def progress(info: Dict[str, Any]):
+            done = []
+            if depth:
+                done.append((info.get("depth") or 0) / depth)
+            if time_limit:
+                done.append((time.monotonic() - started) / time_limit)
+            job.info = info
+            job.progress = min(99.0, max(done, default=0.0) * 100)
+            await self._notify(job, "progress")
+            
+        try:
+            await self._notify(job, JOB_RUNNING)
+            result = await self.analysis.analyze(
+                job.fen, depth, time_limit, on_info=progress, channel=job.channel, priority=job.priority
+            )
+        except asyncio.CancelledError:
+            result = {"cancelled": True}
+        except Exception as e:
+            logger.error(f"Analysis job {job.id} failed: {e}")
+            result = {"error": str(e)}
+        self.running.pop(job.id, None)
+        
+        if job.id in self.preempting:
+            self.preempting.discard(job.id)
+            self.preemptions += 1
+            job.preemptions += 1
+            job.status = JOB_QUEUED
+            job.info = None
+            job.progress = 0.0
+            heapq.heappush(self.queue, job)
+            await self._notify(job, "preempted")
+        elif result.get("cancelled"):
+            await self._finish(job, JOB_CANCELLED)
+        elif "error" in result:
+            job.error = result["error"]
+            await self._finish(job, JOB_FAILED)
+        else:
+            job.result = result
+            job.progress = 100.0
+            await self._finish(job, JOB_COMPLETED)
+        await self._dispatch()
+        
+    async def _finish(self, job: AnalysisJob, status: str):
+        """Move a job to a final state"""
+        job.status = status
+        job.finished_at = time.time()
+        if job.deadline is not None and time.monotonic() > job.deadline and status == JOB_COMPLETED:
+            job.deadline_missed = True
+        if job.deadline_missed:
+            self.deadline_misses += 1
+            
+        if status == JOB_COMPLETED:
+            self.completed += 1
+        elif status == JOB_FAILED:
+            self.failed += 1
+        else:
+            self.cancelled += 1
+        await self._notify(job, status)
+        
+    async def _notify(self, job: AnalysisJob, event: str):
+        """Pass a job update to the listener"""
+        if event != "progress":
+            self.version += 1
+        if not self.on_update:
+            return
+        try:
+            await self.on_update(job, event)
+        except Exception as e:
+            logger.error(f"Error reporting analysis job update: {e}")
+            
+    def _prune(self):
+        """Forget the oldest finished jobs beyond ``history``"""
+        finished = [job_id for job_id, job in self.jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self.jobs[job_id]
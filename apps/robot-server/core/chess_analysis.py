@@ -0,0 +1,406 @@
+"""
+Chess analysis service for UR10 Robot Server
+Answers position analysis requests from the cache when it can and from
+the adapter's engine otherwise, streaming progress while it searches
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+import chess
+
+from core.analysis_cache import AnalysisCache
+
+logger = logging.getLogger(__name__)
+
+InfoCallback = Callable[[Dict[str, Any]], Awaitable[None]]
+
+# Channel used when a request does not name one
+DEFAULT_CHANNEL = "default"
+
+# Channel of the background search started ahead of requests
+SPECULATIVE_CHANNEL = "speculative"
+
+# Channels of queued analysis jobs, which only the job queue stops
+JOB_CHANNEL_PREFIX = "job:"
+
+# Priority classes, most important first, and their engine pool ranks
+PRIORITY_GAME = "game"
+PRIORITY_HINT = "hint"
+PRIORITY_BACKGROUND = "background"
+PRIORITIES = {PRIORITY_GAME: 0, PRIORITY_HINT: 1, PRIORITY_BACKGROUND: 2}
+
+@dataclass
+class RunningSearch:
+    """An engine search in progress and the channels waiting for it
+    
+    ``task`` is the engine search itself; ``result`` records and caches its
+    outcome once, whoever is still waiting. ``listeners`` and
+    ``priorities`` hold each channel's info callback and priority rank and
+    lose them when the channel leaves.
+    """
+    epd: str
+    task: asyncio.Task
+    started_at: float
+    depth: Optional[int] = None
+    time_limit: Optional[float] = None
+    channels: Set[str] = field(default_factory=set)
+    listeners: Dict[str, InfoCallback] = field(default_factory=dict)
+    priorities: Dict[str, int] = field(default_factory=dict)
+    result: Optional[asyncio.Task] = None
+    
+    @property
+    def priority(self) -> int:
+        """Rank of the most important channel still waiting"""
+        return min(self.priorities.values(), default=PRIORITIES[PRIORITY_BACKGROUND])
+        
+    def satisfies(self, depth: Optional[int], time_limit: Optional[float]) -> bool:
+        """Whether this search will stop no earlier than a request would
+        
+        A search stops at whichever of its limits it reaches first, so each
+        limit it has must also be set on the request, and no looser there.
+        """
+        if self.depth is not None and (depth is None or depth > self.depth):
+            return False
+        if self.time_limit is not None and (time_limit is None or time_limit > self.time_limit):
+            return False
+        return True
+
+class ChessAnalysisService:
+    """Front door for position analysis
+    
+    Requests without a depth or time limit get the configured defaults, so
+    every search is bounded and every result can be cached. Each search runs
+    on a named channel; a new request on the channel supersedes the running
+    one, and ``supersede`` stops every search of an outdated position.
+    
+    Requests for a position that is already being searched with limits no
+    tighter than their own attach to that search instead of starting
+    another, and all of them get its info lines and result. A search is stopped only once every
+    channel waiting for it has gone.
+    
+    Each request names a priority class, and a search waiting for a pooled
+    engine is served by the most important class still attached to it. A
+    search holding an engine gives it up when a more important one has to
+    wait, and waits for an engine again itself, so background work never
+    holds up a game move that needs an engine.
+    
+    While the robot executes a move, a speculative search of the resulting
+    position runs in the background, or, after the engine's own move, a
+    ponder search of the reply its PV predicts. A request for that position
+    joins the running search or finds its result in the cache. Both run
+    as background work.
+    """
+    
+    def __init__(self, adapter, cache: AnalysisCache, default_depth: int, default_time: float,
+                 info_rate: float = 5.0, speculative: bool = True):
+        self.adapter = adapter
+        self.cache = cache
+        self.default_depth = default_depth
+        self.default_time = default_time
+        self.info_interval = 1.0 / info_rate if info_rate > 0 else 0.0
+        self.running: Dict[str, RunningSearch] = {}
+        self.speculative = speculative
+        self.speculative_epd: Optional[str] = None
+        self.pondering = False
+        
+        # Statistics
+        self.requests = 0
+        self.executed = 0
+        self.coalesced = 0
+        self.searches = 0
+        self.search_time = 0.0
+        self.cancelled = 0
+        self.preempted = 0
+        self.info_sent = 0
+        self.info_dropped = 0
+        self.speculations = 0
+        self.ponders = 0
+        self.speculative_hits = 0
+        self.book_hits = 0
+        self.tablebase_hits = 0
+        
+    async def start(self):
+        """Open the cache's disk tier"""
+        await self.cache.open()
+        
+    async def stop(self):
+        """Stop running searches and close the cache"""
+        self.cancel()
+        await self.cache.close()
+        
+    async def analyze(self, fen: str, depth: Optional[int] = None, time_limit: Optional[float] = None,
+                      on_info: Optional[InfoCallback] = None, channel: str = DEFAULT_CHANNEL,
+                      priority: str = PRIORITY_HINT) -> Dict[str, Any]:
+        """Analyze a position, returning a cached result if one is deep enough
+        
+        Intermediate results go to ``on_info`` at most ``info_rate`` times
+        per second.
+        """
+        self.requests += 1
+        try:
+            board = chess.Board(fen)
+        except ValueError as e:
+            return {"error": f"Invalid FEN: {e}"}
+        if priority not in PRIORITIES:
+            return {"error": f"Unknown priority {priority!r}, expected one of {', '.join(PRIORITIES)}"}
+            
+        if depth is None and time_limit is None:
+            depth, time_limit = self.default_depth, self.default_time
+            
+        epd = board.epd()
+        speculative = channel != SPECULATIVE_CHANNEL and epd == self.speculative_epd
+        
+        cached = await self.cache.get(board, depth, time_limit)
+        if cached:
+            if speculative:
+                self.speculative_hits += 1
+            return {**cached.result, "cached": True, "speculative": speculative}
+            
+        # Attach to a search of this position instead of starting another
+        search = self._find_search(epd, depth, time_limit)
+        if search:
+            if self.running.get(channel) is not search:
+                self.cancel(channel)
+            self.coalesced += 1
+            if speculative:
+                self.speculative_hits += 1
+            search.channels.add(channel)
+            self.running[channel] = search
+            # A request on the channel supersedes the previous one's listener
+            search.priorities[channel] = PRIORITIES[priority]
+            if on_info:
+                search.listeners[channel] = self._throttle(on_info)
+            else:
+                search.listeners.pop(channel, None)
+            result = await self._wait(search, channel)
+            return {**result, "speculative": speculative, "coalesced": True}
+            
+        search = self._start_search(board, fen, depth, time_limit, on_info, channel, priority)
+        result = await self._wait(search, channel)
+        return {**result, "coalesced": False}
+        
+    def cancel(self, channel: Optional[str] = None) -> int:
+        """Leave the search on ``channel``, or every search, returns how many stopped
+        
+        A search other channels still wait for keeps running.
+        """
+        channels = [channel] if channel is not None else list(self.running)
+        cancelled = 0
+        for name in channels:
+            search = self.running.get(name)
+            if search and self._release(search, name):
+                cancelled += 1
+        self.cancelled += cancelled
+        return cancelled
+        
+    def speculate(self, fen: str, ponder: bool = False):
+        """Search ``fen`` in the background, replacing any earlier speculation"""
+        board = chess.Board(fen)
+        self.cancel(SPECULATIVE_CHANNEL)
+        if not self.speculative or board.is_game_over():
+            self.speculative_epd = None
+            return
+            
+        self.speculative_epd = board.epd()
+        self.pondering = ponder
+        if ponder:
+            self.ponders += 1
+        else:
+            self.speculations += 1
+        # Registered before returning, so a request right after can join it
+        self._start_search(board, fen, self.default_depth, self.default_time, None, SPECULATIVE_CHANNEL,
+                           PRIORITY_BACKGROUND)
+                           
+    def speculate_after_move(self, board: chess.Board, move: chess.Move):
+        """Start searching ahead once ``move`` is accepted on ``board``
+        
+        If the move is the engine's own best move, ponder on the reply its
+        PV predicts; otherwise search the position the move leads to. A
+        ponder search of the position the move reaches is kept running.
+        """
+        if not self.speculative:
+            return
+            
+        previous = self.cache.peek(board)
+        after = board.copy()
+        after.push(move)
+        
+        running = self.running.get(SPECULATIVE_CHANNEL)
+        if running and running.epd == after.epd():
+            return
+            
+        pv = previous.result.get("pv", []) if previous else []
+        if len(pv) >= 2 and pv[0] == move.uci():
+            reply = chess.Move.from_uci(pv[1])
+            if reply in after.legal_moves:
+                after.push(reply)
+                self.speculate(after.fen(), ponder=True)
+                return
+                
+        self.speculate(after.fen())
+        
+    def supersede(self, fen: str) -> int:
+        """Stop every search that is not of the position ``fen``
+        
+        A ponder search is kept while its position can still follow in one
+        move, and so are analysis jobs, which may review any position.
+        """
+        board = chess.Board(fen)
+        epd = board.epd()
+        ponder = self.running.get(SPECULATIVE_CHANNEL) if self.pondering else None
+        keep_ponder = ponder is not None and self._follows(board, ponder.epd)
+        stale = [
+            channel for channel, search in self.running.items()
+            if search.epd != epd
+            and not (channel == SPECULATIVE_CHANNEL and keep_ponder)
+            and not channel.startswith(JOB_CHANNEL_PREFIX)
+        ]
+        cancelled = sum(self.cancel(channel) for channel in stale)
+        if cancelled:
+            logger.info(f"Superseded {cancelled} analysis search(es) for an outdated position")
+        return cancelled
+        
+    @staticmethod
+    def _follows(board: chess.Board, epd: str) -> bool:
+        """Whether ``epd`` is ``board``'s position or one legal move after it"""
+        if board.epd() == epd:
+            return True
+        for move in board.legal_moves:
+            board.push(move)
+            reached = board.epd() == epd
+            board.pop()
+            if reached:
+                return True
+        return False
+        
+    def _find_search(self, epd: str, depth: Optional[int], time_limit: Optional[float]) -> Optional[RunningSearch]:
+        """Running search of ``epd`` that will stop no earlier than requested"""
+        for search in self.running.values():
+            if search.epd == epd and search.satisfies(depth, time_limit) and not search.task.done():
+                return search
+        return None
+        
+    def _start_search(self, board: chess.Board, fen: str, depth: Optional[int], time_limit: Optional[float],
+                      on_info: Optional[InfoCallback], channel: str, priority: str) -> RunningSearch:
+        """Start an engine search on ``channel``, replacing the one running there"""
+        self.cancel(channel)
+        listeners: Dict[str, InfoCallback] = {channel: self._throttle(on_info)} if on_info else {}
+        
+        async def forward(info: Dict[str, Any]):
+            for listener in list(listeners.values()):
+                await listener(info)
+                
+        # The pool reads the rank whenever it compares requests, after ``search`` is bound
+        def run() -> asyncio.Task:
+            return asyncio.create_task(self.adapter.analyze_position(
+                fen, depth, time_limit, on_info=forward, priority=lambda: search.priority, preemptible=True
+            ))
+            
+        search = RunningSearch(board.epd(), run(), time.monotonic(), depth, time_limit, {channel}, listeners,
+                               {channel: PRIORITIES[priority]})
+        search.result = asyncio.create_task(self._record(board, search, run))
+        self.running[channel] = search
+        return search
+        
+    async def _wait(self, search: RunningSearch, channel: str) -> Dict[str, Any]:
+        """Wait for the result of a search on behalf of ``channel``"""
+        try:
+            # wait() leaves the search running if this caller is cancelled
+            await asyncio.wait({search.result})
+        except asyncio.CancelledError:
+            self._release(search, channel)
+            raise
+        return search.result.result()
+        
+    def _release(self, search: RunningSearch, channel: str) -> bool:
+        """Detach ``channel`` and its listener from a search, stopping it if nobody else waits"""
+        if self.running.get(channel) is search:
+            del self.running[channel]
+        search.channels.discard(channel)
+        search.listeners.pop(channel, None)
+        search.priorities.pop(channel, None)
+        return not search.channels and search.task.cancel()
+        
+    async def _record(self, board: chess.Board, search: RunningSearch,
+                      restart: Callable[[], asyncio.Task]) -> Dict[str, Any]:
+        """Wait for the engine, then record and cache its result
+        
+        A search cancelled while channels still wait for it was preempted by
+        the engine pool, and is started again with ``restart``.
+        """
+        await asyncio.wait({search.task})
+        while search.task.cancelled() and search.channels:
+            self.preempted += 1
+            search.task = restart()
+            await asyncio.wait({search.task})
+        for channel in list(search.channels):
+            if self.running.get(channel) is search:
+                del self.running[channel]
+                
+        if search.task.cancelled():
+            self.executed += 1
+            return {"error": "Analysis cancelled", "cancelled": True}
+            
+        # Book and tablebase answers are counted apart from engine searches
+        result = search.task.result()
+        elapsed = time.monotonic() - search.started_at
+        if result.get("book"):
+            # Book moves are picked at random, so each request probes again
+            self.book_hits += 1
+        elif result.get("tablebase"):
+            # The tablebase keeps its own exact results
+            self.tablebase_hits += 1
+        else:
+            self.executed += 1
+            self.searches += 1
+            self.search_time += elapsed
+            if "error" not in result:
+                depth = result.get("depth") or 0
+                # Only a search that stopped short of its depth ran its full time
+                timed_out = search.depth is None or depth < search.depth
+                await self.cache.put(board, depth, search.time_limit if timed_out else None, result)
+        return {"book": False, "tablebase": False, **result, "cached": False, "speculative": False}
+        
+    def _throttle(self, on_info: InfoCallback) -> InfoCallback:
+        """Wrap ``on_info`` so it is called at most once per ``info_interval``"""
+        last_sent = 0.0
+        
+        async def forward(info: Dict[str, Any]):
+            nonlocal last_sent
+            now = time.monotonic()
+            if now - last_sent < self.info_interval:
+                self.info_dropped += 1
+                return
+            last_sent = now
+            self.info_sent += 1
+            try:
+                await on_info(info)
+            except Exception as e:
+                logger.error(f"Error forwarding analysis info: {e}")
+                
+        return forward
+        
+    def get_stats(self) -> Dict[str, Any]:
+        """Get request, search and cache statistics"""
+        return {
+            "requests": self.requests,
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "searches": self.searches,
+            "avg_search_ms": self.search_time / self.searches * 1000 if self.searches else 0.0,
+            "running": {channel: search.epd for channel, search in self.running.items()},
+            "cancelled": self.cancelled,
+            "preempted": self.preempted,
+            "info_sent": self.info_sent,
+            "info_dropped": self.info_dropped,
+            "speculations": self.speculations,
+            "ponders": self.ponders,
+            "speculative_hits": self.speculative_hits,
+            "book_hits": self.book_hits,
+            "tablebase_hits": self.tablebase_hits,
+            "cache": self.cache.get_stats()
+        }
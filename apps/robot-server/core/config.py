@@ -20,15 +20,32 @@ class Settings(BaseSettings):
     robot_hostname: str = Field(default="192.168.1.100", env="ROBOT_HOSTNAME")
     robot_port: int = Field(default=30004, env="ROBOT_PORT")
     rtde_frequency: int = Field(default=10, env="RTDE_FREQUENCY")  # Hz
+    rtde_receive_frequency: float = Field(default=125.0, env="RTDE_RECEIVE_FREQUENCY")  # Hz, 125 on CB3, up to 500 on e-Series
     ROBOT_IP: str = Field(default="192.168.1.100", env="ROBOT_IP")
     ROBOT_PORT: int = Field(default=30004, env="ROBOT_PORT")
     ROBOT_TIMEOUT: float = Field(default=5.0, env="ROBOT_TIMEOUT")
+    ROBOT_KEEPALIVE_INTERVAL: float = Field(default=1.0, env="ROBOT_KEEPALIVE_INTERVAL")  # seconds
+    ROBOT_LIVENESS_TIMEOUT: float = Field(default=0.5, env="ROBOT_LIVENESS_TIMEOUT")  # max RTDE sample age
+    ROBOT_RECONNECT_BACKOFF_INITIAL: float = Field(default=0.5, env="ROBOT_RECONNECT_BACKOFF_INITIAL")  # seconds
+    ROBOT_RECONNECT_BACKOFF_MAX: float = Field(default=30.0, env="ROBOT_RECONNECT_BACKOFF_MAX")  # seconds
     ALLOW_MOCK_ROBOT: bool = Field(default=True, env="ALLOW_MOCK_ROBOT")
     
     # Chess engine settings
     stockfish_path: str = Field(default="/usr/bin/stockfish", env="STOCKFISH_PATH")
     stockfish_depth: int = Field(default=15, env="STOCKFISH_DEPTH")
     stockfish_time: float = Field(default=1.0, env="STOCKFISH_TIME")  # seconds
+    engine_pool_size: int = Field(default=0, env="ENGINE_POOL_SIZE")  # 0 = one engine per ENGINE_THREADS cores
+    engine_threads: int = Field(default=1, env="ENGINE_THREADS")  # UCI Threads per engine
+    engine_hash: int = Field(default=64, env="ENGINE_HASH")  # UCI Hash per engine, MB
+    engine_ping_interval: float = Field(default=10.0, env="ENGINE_PING_INTERVAL")  # seconds between health checks, 0 = off
+    analysis_cache_size: int = Field(default=1024, env="ANALYSIS_CACHE_SIZE")  # positions kept in memory
+    analysis_cache_path: str = Field(default="", env="ANALYSIS_CACHE_PATH")  # SQLite file, empty = memory only
+    analysis_info_rate: float = Field(default=5.0, env="ANALYSIS_INFO_RATE")  # Hz, streamed engine info lines
+    analysis_speculative: bool = Field(default=True, env="ANALYSIS_SPECULATIVE")  # search ahead during robot moves
+    analysis_job_workers: int = Field(default=0, env="ANALYSIS_JOB_WORKERS")  # concurrent jobs, 0 = engine pool size
+    analysis_job_history: int = Field(default=256, env="ANALYSIS_JOB_HISTORY")  # finished jobs kept for polling
+    opening_book_path: str = Field(default="", env="OPENING_BOOK_PATH")  # Polyglot .bin, empty = no book
+    syzygy_path: str = Field(default="", env="SYZYGY_PATH")  # Syzygy table directories, empty = no tablebase
     
     # Robot parameters
     move_speed: float = Field(default=0.3, env="MOVE_SPEED")  # m/s
@@ -36,6 +53,7 @@ class Settings(BaseSettings):
     lift_height: float = Field(default=0.05, env="LIFT_HEIGHT")  # meters
     board_height: float = Field(default=0.0, env="BOARD_HEIGHT")  # meters
     board_lift_height: float = Field(default=0.02, env="BOARD_LIFT_HEIGHT")  # meters
+    board_square_size: float = Field(default=0.05, env="BOARD_SQUARE_SIZE")  # meters
     
     # Safety limits
     speed_max: float = Field(default=0.5, env="SPEED_MAX")  # m/s
@@ -45,6 +63,13 @@ class Settings(BaseSettings):
     MAX_VELOCITY: float = Field(default=0.5, env="MAX_VELOCITY")
     MAX_ACCELERATION: float = Field(default=1.0, env="MAX_ACCELERATION")
     
+    # Hold-to-jog velocity streaming
+    JOG_RATE: float = Field(default=125.0, env="JOG_RATE")  # Hz, speedL/speedJ command rate
+    JOG_DEADMAN_TIMEOUT: float = Field(default=0.25, env="JOG_DEADMAN_TIMEOUT")  # seconds without a setpoint
+    JOG_ACCELERATION: float = Field(default=0.5, env="JOG_ACCELERATION")  # m/s² or rad/s²
+    JOG_MAX_ANGULAR_SPEED: float = Field(default=0.5, env="JOG_MAX_ANGULAR_SPEED")  # rad/s
+    JOG_MAX_JOINT_SPEED: float = Field(default=0.5, env="JOG_MAX_JOINT_SPEED")  # rad/s
+    
     # Force control parameters
     force_seconds: int = Field(default=2, env="FORCE_SECONDS")
     force_type: int = Field(default=2, env="FORCE_TYPE")
@@ -55,6 +80,7 @@ class Settings(BaseSettings):
     websocket_ping_timeout: int = Field(default=10, env="WS_PING_TIMEOUT")  # seconds
     WS_HEARTBEAT_INTERVAL: float = Field(default=30.0, env="WS_HEARTBEAT_INTERVAL")
     WS_TIMEOUT: float = Field(default=60.0, env="WS_TIMEOUT")
+    WS_SEND_TIMEOUT: float = Field(default=5.0, env="WS_SEND_TIMEOUT")  # drop clients stalled this long
     
     # Session settings
     session_timeout: int = Field(default=3600, env="SESSION_TIMEOUT")  # seconds
@@ -104,7 +130,8 @@ class Settings(BaseSettings):
     
     # Telemetry Configuration
     TELEMETRY_RATE: float = Field(default=10.0, env="TELEMETRY_RATE")
-    TELEMETRY_BUFFER_SIZE: int = Field(default=100, env="TELEMETRY_BUFFER_SIZE")
+    TELEMETRY_BUFFER_SIZE: int = Field(default=600, env="TELEMETRY_BUFFER_SIZE")  # samples kept in history
+    TELEMETRY_KEYFRAME_INTERVAL: float = Field(default=5.0, env="TELEMETRY_KEYFRAME_INTERVAL")  # seconds
     
     # Logging settings
     log_level: str = Field(default="INFO", env="LOG_LEVEL")
@@ -155,7 +182,13 @@ ROBOT_CONFIG_TEMPLATE = {
     "robot": {
         "hostname": settings.robot_hostname,
         "host_port": settings.robot_port,
-        "rtde_frequency": settings.rtde_frequency
+        "rtde_frequency": settings.rtde_frequency,
+        "rtde_receive_frequency": settings.rtde_receive_frequency,
+        "connect_timeout": settings.ROBOT_TIMEOUT,
+        "keepalive_interval": settings.ROBOT_KEEPALIVE_INTERVAL,
+        "liveness_timeout": settings.ROBOT_LIVENESS_TIMEOUT,
+        "reconnect_backoff_initial": settings.ROBOT_RECONNECT_BACKOFF_INITIAL,
+        "reconnect_backoff_max": settings.ROBOT_RECONNECT_BACKOFF_MAX
     },
     "robot_parameters": {
         "angle": 0.0,
@@ -163,6 +196,7 @@ ROBOT_CONFIG_TEMPLATE = {
         "dy": 0.0,
         "board_height": settings.board_height,
         "board_lift_height": settings.board_lift_height,
+        "square_size": settings.board_square_size,
         "tcp_rx": 0.0,
         "tcp_ry": 0.0,
         "tcp_rz": 0.0,
@@ -170,6 +204,22 @@ ROBOT_CONFIG_TEMPLATE = {
         "move_speed": settings.move_speed,
         "move_accel": settings.move_acceleration
     },
+    "jog": {
+        "rate": settings.JOG_RATE,
+        "deadman_timeout": settings.JOG_DEADMAN_TIMEOUT,
+        "acceleration": settings.JOG_ACCELERATION,
+        "max_angular_speed": settings.JOG_MAX_ANGULAR_SPEED,
+        "max_joint_speed": settings.JOG_MAX_JOINT_SPEED
+    },
+    "engine": {
+        "path": settings.stockfish_path,
+        "pool_size": settings.engine_pool_size,
+        "threads": settings.engine_threads,
+        "hash": settings.engine_hash,
+        "ping_interval": settings.engine_ping_interval,
+        "opening_book": settings.opening_book_path,
+        "syzygy": settings.syzygy_path
+    },
     "force_control": {
         "force_seconds": settings.force_seconds,
         "task_frame": [0, 0, 0, 0, 0, 0],
@@ -0,0 +1,167 @@
+"""
+Endgame tablebase for UR10 Robot Server
+Answers endgame positions from local Syzygy tables with an exact result
+instead of an engine search
+"""
+
+import logging
+import os
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import chess
+import chess.syzygy
+
+logger = logging.getLogger(__name__)
+
+# Centipawn score of a tablebase win, less one per move to zeroing (DTZ)
+TB_WIN_SCORE = 20000
+
+class EndgameTablebase:
+    """Syzygy WDL/DTZ tables probed through python-chess
+    
+    Positions with more pieces than the largest table, or with castling
+    rights, are left to the engine. The best move wins fastest (smallest
+    DTZ), holds the draw, or loses slowest. Probe results are exact, so they
+    are kept in a bounded in-process LRU by position.
+    """
+    
+    def __init__(self, path: str, cache_size: int = 4096):
+        self.path = path
+        self.cache_size = cache_size
+        self.tables: Optional[chess.syzygy.Tablebase] = None
+        self.max_pieces = 0
+        self.results: "OrderedDict[str, Optional[Dict[str, Any]]]" = OrderedDict()
+        
+        # Statistics
+        self.probes = 0
+        self.hits = 0
+        self.cache_hits = 0
+        self.misses = 0
+        
+    @property
+    def loaded(self) -> bool:
+        """Whether any table was found"""
+        return self.tables is not None
+        
+    def open(self) -> bool:
+        """Open every table in the ``os.pathsep`` separated directories"""
+        try:
+            self.tables = chess.syzygy.Tablebase()
+            for directory in filter(None, self.path.split(os.pathsep)):
+                self.tables.add_directory(directory)
+            names = list(self.tables.wdl)
+            if not names:
+                raise FileNotFoundError("no Syzygy tables found")
+            # Table names list every piece, e.g. "KRPvKR"
+            self.max_pieces = max(len(name) - 1 for name in names)
+            logger.info(f"Syzygy tablebase loaded: {self.path} ({len(names)} tables, up to {self.max_pieces} pieces)")
+        except Exception as e:
+            logger.error(f"Failed to load Syzygy tablebase {self.path}: {e}")
+            self.close()
+        return self.loaded
+        
+    def close(self):
+        """Close the table files"""
+        if self.tables:
+            self.tables.close()
+            self.tables = None
+        self.max_pieces = 0
+        
+    def covers(self, board: chess.Board) -> bool:
+        """Whether ``board`` is small enough to be in the tables"""
+        return (
+            self.tables is not None
+            and chess.popcount(board.occupied) <= self.max_pieces
+            and not board.castling_rights
+        )
+        
+    def probe(self, board: chess.Board) -> Optional[Dict[str, Any]]:
+        """Best move and exact result for ``board`` in the analysis result format, or None"""
+        if not self.covers(board):
+            return None
+            
+        self.probes += 1
+        epd = board.epd()
+        if epd in self.results:
+            self.results.move_to_end(epd)
+            self.cache_hits += 1
+            result = self.results[epd]
+        else:
+            result = self._probe_root(board)
+            self.results[epd] = result
+            while len(self.results) > self.cache_size:
+                self.results.popitem(last=False)
+                
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+        
+    def get_stats(self) -> Dict[str, Any]:
+        """Get probe hit rates"""
+        return {
+            "loaded": self.loaded,
+            "path": self.path,
+            "max_pieces": self.max_pieces,
+            "probes": self.probes,
+            "hits": self.hits,
+            "cache_hits": self.cache_hits,
+            "misses": self.misses,
+            "cached": len(self.results)
+        }
+        
+    def _probe_root(self, board: chess.Board) -> Optional[Dict[str, Any]]:
+        """Rank every legal move by the tables, None if a table is missing"""
+        try:
+            wdl = self.tables.probe_wdl(board)
+            dtz = self.tables.probe_dtz(board)
+            
+            best_move, best_rank = None, None
+            for move in board.legal_moves:
+                board.push(move)
+                try:
+                    rank = self._rank(board)
+                finally:
+                    board.pop()
+                if best_rank is None or rank > best_rank:
+                    best_move, best_rank = move, rank
+        except KeyError:
+            # MissingTableError: the position or a reply is outside the table set
+            return None
+        except Exception as e:
+            logger.error(f"Syzygy probe error: {e}")
+            return None
+            
+        if best_move is None:
+            return None
+            
+        score = 0
+        if abs(wdl) == 2:
+            score = (TB_WIN_SCORE - abs(dtz)) * (1 if wdl > 0 else -1)
+        return {
+            "bestmove": best_move.uci(),
+            "eval": score if board.turn == chess.WHITE else -score,
+            "mate": None,
+            "depth": 0,
+            "pv": [best_move.uci()],
+            "nodes": None,
+            "nps": None,
+            "tablebase": True,
+            "wdl": wdl,
+            "dtz": dtz
+        }
+        
+    def _rank(self, board: chess.Board) -> Tuple[int, int]:
+        """Sort key of the move just played, higher is better for its mover"""
+        if board.is_checkmate():
+            return (3, 0)
+        wdl = -self.tables.probe_wdl(board)
+        # A capture or pawn move is itself the zeroing move
+        dtz = 0 if board.halfmove_clock == 0 else abs(self.tables.probe_dtz(board))
+        if wdl > 0:
+            return (wdl, -dtz)
+        if wdl < 0:
+            return (wdl, dtz)
+        return (0, 0)
@@ -0,0 +1,388 @@
+"""
+Chess engine pool for UR10 Robot Server
+Runs several UCI engine processes through python-chess's asyncio protocol,
+checks one out per analysis request and keeps the processes healthy
+"""
+
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+import chess
+import chess.engine
+
+logger = logging.getLogger(__name__)
+
+# Seconds an engine has to answer isready before it is considered hung
+PING_TIMEOUT = 5.0
+
+# Minimum seconds between status changes reported for search speed alone
+NPS_REPORT_INTERVAL = 1.0
+
+# Priority is called for the current rank of a waiting request, lowest served first
+Priority = Callable[[], int]
+
+@dataclass
+class PooledEngine:
+    """One engine process and its usage counters"""
+    id: int
+    transport: asyncio.SubprocessTransport
+    protocol: chess.engine.UciProtocol
+    started_at: float
+    analyses: int = 0
+    searching: bool = False
+    nps: Optional[int] = None
+    holder: Optional[asyncio.Task] = None
+    priority: Optional[Priority] = None
+    preempted: bool = False
+
+@dataclass
+class CheckoutWaiter:
+    """A request waiting for an engine"""
+    priority: Priority
+    sequence: int
+    future: asyncio.Future
+    
+    def sort_key(self):
+        """Current priority rank first, then arrival order"""
+        return (self.priority(), self.sequence)
+
+def default_pool_size(threads: int) -> int:
+    """One engine per ``threads`` cores, keeping one core for the server and robot"""
+    cores = os.cpu_count() or 1
+    return max(1, (cores - 1) // max(1, threads))
+
+class EnginePool:
+    """Fixed-size pool of UCI engines driven from the event loop
+    
+    Engines talk to the event loop over pipes, so searches use no executor
+    threads and never compete with robot commands. Each request checks out
+    an idle engine for its whole search; when all are busy, a freed engine
+    goes to the waiting request of the lowest priority rank, in arrival
+    order within a rank. The rank is read when an engine frees up, so a
+    waiting request can be promoted. A preemptible checkout is cancelled
+    when a request of a more important rank has to wait, so its engine goes
+    to that request. An engine that dies is replaced on return.
+    
+    Every engine is warmed up with a trivial search as it starts, so network
+    weights and hash are loaded before the first request. A supervisor task
+    pings idle engines every ``ping_interval`` seconds, replaces any that
+    died or hung, and brings the pool back to full size. ``on_change`` is
+    called whenever the status reported by ``get_status`` changes; speed
+    updates from info lines are reported at most every NPS_REPORT_INTERVAL.
+    """
+    
+    def __init__(self, path: str, size: int = 0, threads: int = 1, hash_mb: int = 64,
+                 ping_interval: float = 10.0, on_change: Optional[Callable[[], None]] = None):
+        self.path = path
+        self.size = size or default_pool_size(threads)
+        self.options = {"Threads": threads, "Hash": hash_mb}
+        self.ping_interval = ping_interval
+        self.on_change = on_change
+        
+        self.engines: List[PooledEngine] = []
+        self.idle: List[PooledEngine] = []
+        self.waiters: List[CheckoutWaiter] = []
+        self.next_id = 0
+        self.next_sequence = 0
+        self.started_at: Optional[float] = None
+        self.supervisor: Optional[asyncio.Task] = None
+        self.last_nps: Optional[int] = None
+        self.nps_reported_at = 0.0
+        
+        # Statistics
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.restarts = 0
+        self.failures = 0
+        self.preemptions = 0
+        self.health_checks = 0
+        self.warmup_time = 0.0
+        
+    @property
+    def running(self) -> bool:
+        """Whether any engine is up"""
+        return bool(self.engines)
+        
+    async def start(self) -> bool:
+        """Start every engine, returns False if none could be started"""
+        for _ in range(self.size):
+            try:
+                self._return(await self._spawn())
+            except Exception as e:
+                logger.error(f"Failed to start engine {self.path}: {e}")
+                
+        if self.engines:
+            logger.info(
+                f"Engine pool started: {len(self.engines)} x {self.path} "
+                f"(Threads={self.options['Threads']}, Hash={self.options['Hash']} MB, "
+                f"warm-up {self.warmup_time * 1000:.0f} ms)"
+            )
+            self.started_at = time.time()
+            if self.ping_interval > 0:
+                self.supervisor = asyncio.create_task(self._supervise())
+            self._changed()
+        return self.running
+        
+    async def stop(self):
+        """Stop the supervisor and quit every engine"""
+        if self.supervisor:
+            self.supervisor.cancel()
+            await asyncio.gather(self.supervisor, return_exceptions=True)
+            self.supervisor = None
+            
+        engines, self.engines = self.engines, []
+        for engine in engines:
+            await self._quit(engine)
+        self.idle = []
+        waiters, self.waiters = self.waiters, []
+        for waiter in waiters:
+            if not waiter.future.done():
+                waiter.future.set_exception(RuntimeError("Engine pool stopped"))
+        self.started_at = None
+        self._changed()
+        logger.info("Engine pool stopped")
+        
+    @asynccontextmanager
+    async def checkout(self, priority: Optional[Priority] = None,
+                       preemptible: bool = False) -> AsyncIterator[chess.engine.UciProtocol]:
+        """Borrow an idle engine for the duration of the block
+        
+        ``priority`` returns the request's rank, 0 if omitted. A
+        ``preemptible`` checkout's task is cancelled when a request of a
+        more important rank is waiting for an engine.
+        """
+        if not self.running:
+            raise RuntimeError("Engine pool is not running")
+            
+        priority = priority or (lambda: 0)
+        queued = time.monotonic()
+        engine = await self._acquire(priority)
+        
+        wait = time.monotonic() - queued
+        self.checkouts += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        
+        engine.searching = True
+        if preemptible:
+            engine.holder = asyncio.current_task()
+            engine.priority = priority
+        self._changed()
+        try:
+            yield engine.protocol
+            engine.analyses += 1
+        except chess.engine.EngineTerminatedError:
+            self.failures += 1
+            engine.searching = False
+            engine = await self._replace(engine)
+            raise
+        finally:
+            if engine is not None:
+                engine.searching = False
+                self._release_holder(engine)
+                self._return(engine)
+            self._changed()
+            
+    def record(self, protocol: chess.engine.UciProtocol, info: chess.engine.InfoDict):
+        """Note the search speed reported by a checked-out engine"""
+        nps = info.get("nps")
+        if not nps:
+            return
+        for engine in self.engines:
+            if engine.protocol is protocol:
+                engine.nps = nps
+        self.last_nps = nps
+        
+        now = time.monotonic()
+        if now - self.nps_reported_at >= NPS_REPORT_INTERVAL:
+            self.nps_reported_at = now
+            self._changed()
+        
+    async def check_health(self):
+        """Ping every idle engine, replace dead ones and refill the pool"""
+        # Only the engine being pinged leaves the pool, the rest stay free for checkouts
+        for engine in list(self.idle):
+            if engine not in self.idle:
+                continue
+            self.idle.remove(engine)
+            if not await self._is_alive(engine):
+                self.failures += 1
+                engine = await self._replace(engine)
+            if engine is not None:
+                self._return(engine)
+                
+        while len(self.engines) < self.size:
+            try:
+                self._return(await self._spawn())
+                self.restarts += 1
+            except Exception as e:
+                logger.error(f"Failed to restart engine {self.path}: {e}")
+                break
+                
+        self.health_checks += 1
+        self._changed()
+        
+    def get_status(self) -> Dict[str, Any]:
+        """Get whether the engines are searching, their speed, uptime and restarts"""
+        searching = [engine for engine in self.engines if engine.searching]
+        nps = sum(engine.nps or 0 for engine in searching) if searching else self.last_nps
+        return {
+            "state": "searching" if searching else "idle",
+            "engines": len(self.engines),
+            "nps": nps or None,
+            "uptime": time.time() - self.started_at if self.started_at else 0.0,
+            "restarts": self.restarts
+        }
+        
+    async def analyse(self, board: chess.Board, limit: chess.engine.Limit, priority: Optional[Priority] = None,
+                      preemptible: bool = False, **kwargs: Any) -> chess.engine.InfoDict:
+        """Run one search on a pooled engine"""
+        async with self.checkout(priority, preemptible) as engine:
+            return await engine.analyse(board, limit, **kwargs)
+            
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool size, utilisation and queueing statistics"""
+        idle = len(self.idle)
+        return {
+            "size": len(self.engines),
+            "idle": idle,
+            "busy": len(self.engines) - idle,
+            "waiting": len(self.waiters),
+            "checkouts": self.checkouts,
+            "avg_wait_ms": self.total_wait / self.checkouts * 1000 if self.checkouts else 0.0,
+            "max_wait_ms": self.max_wait * 1000,
+            "restarts": self.restarts,
+            "failures": self.failures,
+            "preemptions": self.preemptions,
+            "health_checks": self.health_checks,
+            "warmup_ms": self.warmup_time * 1000,
+            "threads": self.options["Threads"],
+            "hash_mb": self.options["Hash"],
+            "analyses": [engine.analyses for engine in self.engines]
+        }
+        
+    async def _acquire(self, priority: Priority) -> PooledEngine:
+        """Take an idle engine, or wait until one is handed over"""
+        if self.idle:
+            return self.idle.pop(0)
+            
+        self.next_sequence += 1
+        waiter = CheckoutWaiter(priority, self.next_sequence, asyncio.get_running_loop().create_future())
+        self.waiters.append(waiter)
+        self._preempt_for(waiter)
+        try:
+            return await waiter.future
+        except asyncio.CancelledError:
+            if waiter in self.waiters:
+                self.waiters.remove(waiter)
+            elif waiter.future.done() and not waiter.future.cancelled():
+                # Handed an engine just as the request was cancelled
+                self._return(waiter.future.result())
+            raise
+            
+    def _preempt_for(self, waiter: CheckoutWaiter):
+        """Cancel the least important preemptible checkout ranked below ``waiter``"""
+        rank = waiter.priority()
+        candidates = [
+            engine for engine in self.engines
+            if engine.holder is not None and not engine.preempted and engine.priority() > rank
+        ]
+        if not candidates:
+            return
+            
+        victim = max(candidates, key=lambda engine: engine.priority())
+        logger.info(f"Preempting rank {victim.priority()} search on engine {victim.id} for a rank {rank} request")
+        victim.preempted = True
+        self.preemptions += 1
+        victim.holder.cancel()
+        
+    @staticmethod
+    def _release_holder(engine: PooledEngine):
+        """Forget a checkout's task once it gives its engine back"""
+        engine.holder = None
+        engine.priority = None
+        engine.preempted = False
+        
+    def _return(self, engine: PooledEngine):
+        """Hand a free engine to the most important waiter, or put it back idle"""
+        while self.waiters:
+            waiter = min(self.waiters, key=CheckoutWaiter.sort_key)
+            self.waiters.remove(waiter)
+            if not waiter.future.done():
+                waiter.future.set_result(engine)
+                return
+        self.idle.append(engine)
+        
+    async def _spawn(self) -> PooledEngine:
+        """Start, configure and warm up one engine process"""
+        transport, protocol = await chess.engine.popen_uci(self.path)
+        try:
+            await protocol.configure({
+                name: value for name, value in self.options.items() if name in protocol.options
+            })
+            
+            # isready waits for the hash allocation, the search loads the network
+            warmup_started = time.monotonic()
+            await asyncio.wait_for(protocol.ping(), timeout=PING_TIMEOUT)
+            await protocol.analyse(chess.Board(), chess.engine.Limit(depth=1))
+            self.warmup_time = time.monotonic() - warmup_started
+        except Exception:
+            transport.close()
+            raise
+            
+        self.next_id += 1
+        engine = PooledEngine(self.next_id, transport, protocol, time.monotonic())
+        self.engines.append(engine)
+        return engine
+        
+    async def _replace(self, engine: PooledEngine) -> Optional[PooledEngine]:
+        """Drop a dead engine and start a new one in its place"""
+        logger.warning(f"Engine {engine.id} terminated, restarting")
+        if engine in self.engines:
+            self.engines.remove(engine)
+        await self._quit(engine)
+        try:
+            replacement = await self._spawn()
+        except Exception as e:
+            logger.error(f"Failed to restart engine: {e}")
+            return None
+        self.restarts += 1
+        return replacement
+        
+    async def _supervise(self):
+        """Run health checks until the pool is stopped"""
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            try:
+                await self.check_health()
+            except Exception as e:
+                logger.error(f"Engine health check error: {e}")
+                
+    async def _is_alive(self, engine: PooledEngine) -> bool:
+        """Whether an engine's process is up and answers isready"""
+        if engine.transport.get_returncode() is not None:
+            return False
+        try:
+            await asyncio.wait_for(engine.protocol.ping(), timeout=PING_TIMEOUT)
+            return True
+        except Exception:
+            return False
+            
+    def _changed(self):
+        """Tell the owner the reported status changed"""
+        if self.on_change:
+            self.on_change()
+            
+    async def _quit(self, engine: PooledEngine):
+        """Ask an engine to quit and close its process"""
+        try:
+            await asyncio.wait_for(engine.protocol.quit(), timeout=2.0)
+        except Exception:
+            pass
+        engine.transport.close()
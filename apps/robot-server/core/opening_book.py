@@ -0,0 +1,94 @@
+"""
+Opening book for UR10 Robot Server
+Answers well-known opening positions from a local Polyglot book before any
+engine search is started
+"""
+
+import logging
+import random
+from typing import Any, Dict, Optional
+
+import chess
+import chess.polyglot
+
+logger = logging.getLogger(__name__)
+
+class OpeningBook:
+    """Polyglot opening book probed by Zobrist key
+    
+    python-chess memory-maps the book file and binary-searches its sorted
+    entries, so a probe reads a few pages and never loads the whole book.
+    Among the book moves of a position, one is picked at random in
+    proportion to its weight, so the robot varies its openings.
+    """
+    
+    def __init__(self, path: str, min_weight: int = 1):
+        self.path = path
+        self.min_weight = min_weight
+        self.reader: Optional[chess.polyglot.MemoryMappedReader] = None
+        
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        
+    @property
+    def loaded(self) -> bool:
+        """Whether the book file is open"""
+        return self.reader is not None
+        
+    def open(self) -> bool:
+        """Map the book file, returns False if it cannot be read"""
+        try:
+            self.reader = chess.polyglot.open_reader(self.path)
+            logger.info(f"Opening book loaded: {self.path} ({len(self.reader)} entries)")
+        except Exception as e:
+            logger.error(f"Failed to load opening book {self.path}: {e}")
+            self.reader = None
+        return self.loaded
+        
+    def close(self):
+        """Unmap the book file"""
+        if self.reader:
+            self.reader.close()
+            self.reader = None
+            
+    def probe(self, board: chess.Board) -> Optional[Dict[str, Any]]:
+        """Book move for ``board`` in the analysis result format, or None"""
+        if not self.reader:
+            return None
+            
+        try:
+            entries = list(self.reader.find_all(board, minimum_weight=self.min_weight))
+        except Exception as e:
+            logger.error(f"Opening book read error: {e}")
+            entries = []
+            
+        if not entries:
+            self.misses += 1
+            return None
+            
+        self.hits += 1
+        choice = random.choices(entries, weights=[entry.weight for entry in entries])[0]
+        return {
+            "bestmove": choice.move.uci(),
+            "eval": None,
+            "mate": None,
+            "depth": 0,
+            "pv": [choice.move.uci()],
+            "nodes": None,
+            "nps": None,
+            "book": True,
+            "book_moves": [{"move": entry.move.uci(), "weight": entry.weight} for entry in entries]
+        }
+        
+    def get_stats(self) -> Dict[str, Any]:
+        """Get probe hit rate"""
+        probes = self.hits + self.misses
+        return {
+            "loaded": self.loaded,
+            "path": self.path,
+            "entries": len(self.reader) if self.reader else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / probes if probes else 0.0
+        }
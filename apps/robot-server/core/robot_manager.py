@@ -6,20 +6,42 @@ Handles robot communication, state management, and safety interlocks
 import asyncio
 import logging
 import time
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Callable, Awaitable
+from dataclasses import dataclass
 from enum import Enum
 import json
 
+import chess
+
 from models.schemas import (
     RobotState, Telemetry, TCPPose, EStopStatus, SafetyLimits,
-    IOMap, ProgramStatus, NetworkStatus, JointPositions
+    IOMap, ProgramStatus, NetworkStatus, JointPositions, BoardCalibration, RobotDiagnostics
 )
 from core.config import settings, ROBOT_CONFIG_TEMPLATE
+from core.telemetry_history import TelemetryHistory
+from core.analysis_cache import AnalysisCache
+from core.chess_analysis import ChessAnalysisService, InfoCallback, DEFAULT_CHANNEL, PRIORITY_HINT
+from core.analysis_jobs import AnalysisJobQueue, AnalysisJob, JobListener
 from adapters.ur10_adapter import UR10Adapter
 from adapters.mock_adapter import MockAdapter
+from adapters.ur_connection import (
+    ConnectionListener, CONNECTION_CONNECTED, CONNECTION_RECONNECTING
+)
 
 logger = logging.getLogger(__name__)
 
+@dataclass(frozen=True)
+class TelemetrySnapshot:
+    """Telemetry published by the telemetry producer, shared read-only by all consumers"""
+    version: int
+    telemetry: Telemetry
+    captured_at: float  # time.monotonic()
+    
+    @property
+    def age(self) -> float:
+        """Seconds since the snapshot was captured"""
+        return time.monotonic() - self.captured_at
+
 class RobotManager:
     """Manages robot connection, state, and operations"""
     
@@ -37,6 +59,7 @@ class RobotManager:
         self.current_joints = [0.0] * 6
         self.current_speed = 0.0
         self.io_state = IOMap()
+        self.diagnostics: Optional[RobotDiagnostics] = None
         self.safety_limits = SafetyLimits(
             speed_max=settings.speed_max,
             z_min=settings.z_min,
@@ -46,12 +69,33 @@ class RobotManager:
         
         # Program execution state
         self.current_program: Optional[ProgramStatus] = None
+        self.velocity_jog_watch: Optional[asyncio.Task] = None
         self.job_queue: List[Dict[str, Any]] = []
         
+        # Board / queue / engine sub-models cached as (version, model)
+        self.substate_cache: Dict[str, Any] = {}
+        
         # Network monitoring
         self.last_ping_time = time.time()
         self.rtt_ms = 0.0
         
+        # Recent telemetry samples for post-incident review
+        self.telemetry_history = TelemetryHistory(settings.TELEMETRY_BUFFER_SIZE)
+        
+        # Latest published telemetry, read by REST and WebSocket consumers
+        self.latest_snapshot: Optional[TelemetrySnapshot] = None
+        self.snapshot_version = 0
+        
+        # Notified of robot link state transitions
+        self.connection_listeners: List[ConnectionListener] = []
+        
+        # Position analysis in front of the adapter's engine, set up on initialize
+        self.analysis: Optional[ChessAnalysisService] = None
+        self.analysis_jobs: Optional[AnalysisJobQueue] = None
+        
+        # Notified of analysis job state changes and progress
+        self.analysis_job_listeners: List[JobListener] = []
+        
     async def initialize(self):
         """Initialize robot manager"""
         logger.info("Initializing Robot Manager...")
@@ -62,13 +106,35 @@ class RobotManager:
         else:
             logger.info(f"Connecting to robot at {settings.robot_hostname}:{settings.robot_port}")
             self.adapter = UR10Adapter()
-        
+            self.adapter.add_connection_listener(self._on_connection_change)
+            
         await self.adapter.initialize(ROBOT_CONFIG_TEMPLATE)
+        
+        self.analysis = ChessAnalysisService(
+            self.adapter,
+            AnalysisCache(settings.analysis_cache_size, settings.analysis_cache_path or None),
+            default_depth=settings.stockfish_depth,
+            default_time=settings.stockfish_time,
+            info_rate=settings.analysis_info_rate,
+            speculative=settings.analysis_speculative
+        )
+        await self.analysis.start()
+        
+        self.analysis_jobs = AnalysisJobQueue(
+            self.analysis,
+            workers=settings.analysis_job_workers or self.adapter.get_engine_stats().get("size") or 1,
+            history=settings.analysis_job_history,
+            on_update=self._on_analysis_job_update
+        )
         self.state = RobotState.CONNECTING
         
     async def cleanup(self):
         """Cleanup robot manager"""
         logger.info("Cleaning up Robot Manager...")
+        if self.analysis_jobs:
+            await self.analysis_jobs.stop()
+        if self.analysis:
+            await self.analysis.stop()
         if self.adapter:
             await self.adapter.cleanup()
         self.state = RobotState.IDLE
@@ -77,6 +143,34 @@ class RobotManager:
         """Check if robot is connected"""
         return self.adapter is not None and self.adapter.is_connected()
         
+    def add_connection_listener(self, listener: ConnectionListener):
+        """Register ``listener(old_state, new_state, reason)`` for robot link changes"""
+        self.connection_listeners.append(listener)
+        
+    def add_analysis_job_listener(self, listener: JobListener):
+        """Register ``listener(job, event)`` for analysis job updates"""
+        self.analysis_job_listeners.append(listener)
+        
+    async def _on_analysis_job_update(self, job: AnalysisJob, event: str):
+        """Pass analysis job updates to the listeners"""
+        for listener in self.analysis_job_listeners:
+            await listener(job, event)
+            
+    async def _on_connection_change(self, previous: str, state: str, reason: str):
+        """Track robot link drops and recoveries reported by the adapter"""
+        if state == CONNECTION_RECONNECTING:
+            if self.state == RobotState.EXECUTING:
+                self.state = RobotState.FAULT
+            elif self.state not in (RobotState.FAULT, RobotState.ESTOP):
+                self.state = RobotState.CONNECTING
+            self.add_error(f"Robot link lost: {reason}")
+        elif state == CONNECTION_CONNECTED and previous == CONNECTION_RECONNECTING:
+            if self.state == RobotState.CONNECTING:
+                self.state = RobotState.IDLE
+                
+        for listener in self.connection_listeners:
+            await listener(previous, state, reason)
+            
     async def connect_robot(self, hostname: Optional[str] = None, port: Optional[int] = None) -> bool:
         """Connect to robot"""
         try:
@@ -134,8 +228,10 @@ class RobotManager:
                 logger.info("Robot homed successfully")
                 return True
             else:
-                self.state = RobotState.FAULT
-                self.add_error("Failed to home robot")
+                # A stop that withdrew the command has already set the state
+                if self.state == RobotState.EXECUTING:
+                    self.state = RobotState.FAULT
+                    self.add_error("Failed to home robot")
                 return False
                 
         except Exception as e:
@@ -171,8 +267,10 @@ class RobotManager:
                 self.state = RobotState.READY
                 return True
             else:
-                self.state = RobotState.FAULT
-                self.add_error("Jog operation failed")
+                # A stop that withdrew the command has already set the state
+                if self.state == RobotState.EXECUTING:
+                    self.state = RobotState.FAULT
+                    self.add_error("Jog operation failed")
                 return False
                 
         except Exception as e:
@@ -181,6 +279,62 @@ class RobotManager:
             self.add_error(f"Jog error: {str(e)}")
             return False
             
+    async def start_velocity_jog(self, mode: str, on_end: Optional[Callable[[], Awaitable[None]]] = None) -> bool:
+        """Start a hold-to-jog stream in ``tcp`` or ``joint`` mode
+        
+        ``on_end()`` is awaited once the jog ends, whether by release,
+        deadman trip, stop or E-stop.
+        """
+        try:
+            if not self.is_ready_for_movement():
+                return False
+                
+            if mode not in ("tcp", "joint"):
+                self.add_error(f"Invalid jog mode: {mode}")
+                return False
+                
+            success = await self.adapter.start_velocity_jog(
+                mode, self.safety_limits.speed_max,
+                z_limits=(self.safety_limits.z_min, self.safety_limits.z_max)
+            )
+            if success:
+                self.state = RobotState.EXECUTING
+                self.velocity_jog_watch = asyncio.create_task(self._watch_velocity_jog(on_end))
+                return True
+            self.add_error("Failed to start velocity jog")
+            return False
+            
+        except Exception as e:
+            logger.error(f"Error starting velocity jog: {e}")
+            self.add_error(f"Velocity jog error: {str(e)}")
+            return False
+            
+    async def _watch_velocity_jog(self, on_end: Optional[Callable[[], Awaitable[None]]] = None):
+        """Leave EXECUTING when the jog ends on its own, e.g. on a deadman trip"""
+        try:
+            await self.adapter.wait_velocity_jog()
+            # A jog started after this one has taken over the state
+            if self.adapter.velocity_jog is None and self.state == RobotState.EXECUTING:
+                self.state = RobotState.READY
+            if on_end:
+                await on_end()
+        except Exception as e:
+            logger.error(f"Error watching velocity jog: {e}")
+            
+    def set_jog_velocity(self, velocity: List[float]):
+        """Stream one velocity setpoint to the active jog, clamped to the limits"""
+        self.adapter.set_jog_velocity(velocity)
+        
+    async def stop_velocity_jog(self):
+        """Release the active jog and wait for standstill"""
+        try:
+            if self.adapter:
+                await self.adapter.stop_velocity_jog()
+            if self.state == RobotState.EXECUTING:
+                self.state = RobotState.READY
+        except Exception as e:
+            logger.error(f"Error stopping velocity jog: {e}")
+            
     async def stop_robot(self) -> bool:
         """Stop robot movement (graceful)"""
         try:
@@ -255,8 +409,10 @@ class RobotManager:
                 logger.info(f"Moved to safe Z position: {safe_z}")
                 return True
             else:
-                self.state = RobotState.FAULT
-                self.add_error("Failed to move to safe Z")
+                # A stop that withdrew the command has already set the state
+                if self.state == RobotState.EXECUTING:
+                    self.state = RobotState.FAULT
+                    self.add_error("Failed to move to safe Z")
                 return False
                 
         except Exception as e:
@@ -278,10 +434,24 @@ class RobotManager:
                 self.current_speed = telemetry_data.get("tcp_speed", self.current_speed)
                 self.io_state = telemetry_data.get("iomap", self.io_state)
                 
-                self.last_telemetry_time = time.time()
+                # Adapters without an RTDE receiver report no sample age and
+                # are read synchronously, so their data is always fresh
+                sample_age = telemetry_data.get("sample_age")
+                self.diagnostics = None
+                if sample_age is not None:
+                    self.diagnostics = RobotDiagnostics(
+                        joint_speeds=telemetry_data["joint_speeds"],
+                        joint_currents=telemetry_data["joint_currents"],
+                        joint_temperatures=telemetry_data["joint_temperatures"],
+                        robot_mode=telemetry_data["robot_mode"],
+                        safety_mode=telemetry_data["safety_mode"],
+                        sample_age=sample_age
+                    )
+                    
+                self.last_telemetry_time = time.time() - (sample_age or 0.0)
                 
                 # Check for stale telemetry
-                if time.time() - self.last_telemetry_time > self.telemetry_stale_threshold:
+                if sample_age is not None and sample_age > self.telemetry_stale_threshold:
                     if self.state == RobotState.EXECUTING:
                         self.state = RobotState.PAUSED
                         self.add_error("Telemetry stale - auto-paused")
@@ -305,6 +475,7 @@ class RobotManager:
                 queue=await self.get_queue_status(),
                 engine=await self.get_engine_status(),
                 net=NetworkStatus(rtt_ms=self.rtt_ms),
+                diagnostics=self.diagnostics,
                 errors=self.errors.copy()
             )
             
@@ -312,6 +483,46 @@ class RobotManager:
             logger.error(f"Error getting telemetry: {e}")
             return self.get_default_telemetry()
             
+    async def publish_telemetry(self) -> TelemetrySnapshot:
+        """Read telemetry once and publish it as the latest snapshot
+        
+        Only the telemetry producer should call this; every other consumer
+        reads ``get_telemetry_snapshot`` so polling never adds adapter reads.
+        """
+        telemetry = await self.get_telemetry()
+        if self.is_connected():
+            self.record_telemetry(telemetry)
+            
+        self.snapshot_version += 1
+        snapshot = TelemetrySnapshot(
+            version=self.snapshot_version,
+            telemetry=telemetry,
+            captured_at=time.monotonic()
+        )
+        self.latest_snapshot = snapshot
+        return snapshot
+        
+    def get_telemetry_snapshot(self) -> Optional[TelemetrySnapshot]:
+        """Get the latest published telemetry snapshot, if any"""
+        return self.latest_snapshot
+        
+    def record_telemetry(self, telemetry: Telemetry):
+        """Append a telemetry sample to the history ring buffer"""
+        pose = telemetry.tcp_pose
+        self.telemetry_history.record(
+            timestamp=telemetry.net.server_time,
+            joints=telemetry.joints,
+            tcp_pose=[pose.x, pose.y, pose.z, pose.rx, pose.ry, pose.rz],
+            tcp_speed=telemetry.tcp_speed,
+            state=telemetry.state,
+            di=telemetry.iomap.di,
+            do=telemetry.iomap.do
+        )
+        
+    def get_telemetry_history(self, seconds: float) -> Dict[str, Any]:
+        """Get recorded telemetry samples from the last ``seconds`` seconds"""
+        return self.telemetry_history.window(seconds)
+        
     def get_default_telemetry(self) -> Telemetry:
         """Get default telemetry when robot is not available"""
         from models.schemas import BoardState, QueueStatus, EngineStatus
@@ -335,22 +546,49 @@ class RobotManager:
     async def get_board_state(self):
         """Get current chess board state"""
         if self.adapter:
-            return await self.adapter.get_board_state()
+            return await self._get_cached_substate("board", self.adapter.board_version, self.adapter.get_board_state)
         from models.schemas import BoardState
         return BoardState(fen="rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1", turn="w", move_no=1)
         
     async def get_queue_status(self):
         """Get job queue status"""
         from models.schemas import QueueStatus
-        return QueueStatus(pending=len(self.job_queue), active=None)
+        if not self.analysis_jobs:
+            return QueueStatus(pending=len(self.job_queue), active=None)
+            
+        jobs = self.analysis_jobs
+        
+        async def build():
+            return QueueStatus(pending=len(jobs.queue), active=next(iter(jobs.running), None))
+            
+        return await self._get_cached_substate("queue", jobs.version, build)
         
     async def get_engine_status(self):
         """Get chess engine status"""
         if self.adapter:
-            return await self.adapter.get_engine_status()
+            status = await self._get_cached_substate("engine", self.adapter.engine_version, self.adapter.get_engine_status)
+            # Uptime changes without a version bump, so it is filled in per call
+            started_at = self.adapter.engine_started_at
+            if started_at:
+                status = status.copy(update={"uptime": time.time() - started_at})
+            return status
         from models.schemas import EngineStatus
         return EngineStatus(running=False)
         
+    async def _get_cached_substate(self, name: str, version: int, fetch):
+        """Reuse a cached sub-model until its version counter changes
+        
+        The version is read before fetching, so a change that lands while
+        the fetch is awaited is picked up on the next call.
+        """
+        cached = self.substate_cache.get(name)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+            
+        model = await fetch()
+        self.substate_cache[name] = (version, model)
+        return model
+        
     def is_ready_for_movement(self) -> bool:
         """Check if robot is ready for movement"""
         if not self.is_connected():
@@ -395,4 +633,87 @@ class RobotManager:
             logger.error(f"Error updating safety limits: {e}")
             self.add_error(f"Limits update error: {str(e)}")
             return False
-
+            
+    async def update_calibration(self, calibration: BoardCalibration, supervisor_pin: str) -> bool:
+        """Update board calibration (requires supervisor PIN)"""
+        try:
+            if supervisor_pin != self.supervisor_pin:
+                self.add_error("Invalid supervisor PIN")
+                return False
+                
+            if not self.adapter:
+                return False
+                
+            success = self.adapter.update_calibration(calibration.dict(exclude_none=True))
+            if success:
+                logger.info("Board calibration updated")
+            return success
+            
+        except Exception as e:
+            logger.error(f"Error updating calibration: {e}")
+            self.add_error(f"Calibration update error: {str(e)}")
+            return False
+            
+    def get_board_geometry(self) -> Dict[str, Any]:
+        """Get robot coordinates of every square, the bin and approach heights"""
+        return self.adapter.get_board_geometry() if self.adapter else {}
+        
+    async def analyze_position(self, fen: str, depth: Optional[int] = None, time_limit: Optional[float] = None,
+                               on_info: Optional[InfoCallback] = None,
+                               channel: str = DEFAULT_CHANNEL,
+                               priority: str = PRIORITY_HINT) -> Dict[str, Any]:
+        """Analyze a chess position, served from the analysis cache when possible"""
+        if not self.analysis:
+            return {"error": "Engine not available"}
+        return await self.analysis.analyze(fen, depth, time_limit, on_info=on_info, channel=channel,
+                                           priority=priority)
+        
+    def cancel_analysis(self, channel: Optional[str] = None) -> int:
+        """Stop the running search on ``channel``, or every search"""
+        return self.analysis.cancel(channel) if self.analysis else 0
+        
+    async def submit_analysis_job(self, fen: str, priority: str, depth: Optional[int] = None,
+                                  time_limit: Optional[float] = None,
+                                  deadline: Optional[float] = None) -> AnalysisJob:
+        """Queue an analysis job, raises ValueError on an invalid request"""
+        if not self.analysis_jobs:
+            raise RuntimeError("Engine not available")
+        return await self.analysis_jobs.submit(fen, priority, depth, time_limit, deadline)
+        
+    def get_analysis_job(self, job_id: str) -> Optional[AnalysisJob]:
+        """Queued, running or recently finished analysis job"""
+        return self.analysis_jobs.get(job_id) if self.analysis_jobs else None
+        
+    def list_analysis_jobs(self, status: Optional[str] = None) -> List[AnalysisJob]:
+        """Known analysis jobs, optionally only those in ``status``"""
+        return self.analysis_jobs.list_jobs(status) if self.analysis_jobs else []
+        
+    async def cancel_analysis_job(self, job_id: str) -> bool:
+        """Cancel a queued or running analysis job"""
+        return await self.analysis_jobs.cancel(job_id) if self.analysis_jobs else False
+        
+    def speculate_after_move(self, from_square: str, to_square: str, promotion: Optional[str] = None):
+        """Search ahead while the robot executes an accepted move"""
+        if not self.analysis or not self.adapter or not self.adapter.chess_board:
+            return
+        try:
+            board = self.adapter.chess_board
+            move = chess.Move.from_uci(from_square + to_square + (promotion or ""))
+            if move in board.legal_moves:
+                self.analysis.speculate_after_move(board, move)
+        except ValueError as e:
+            logger.warning(f"Not speculating on invalid move: {e}")
+            
+    def supersede_analysis(self) -> int:
+        """Stop searches of positions other than the current board"""
+        if not self.analysis or not self.adapter or not self.adapter.chess_board:
+            return 0
+        return self.analysis.supersede(self.adapter.chess_board.fen())
+        
+    def get_engine_stats(self) -> Dict[str, Any]:
+        """Get chess engine, analysis cache and job queue statistics"""
+        return {
+            "engine": self.adapter.get_engine_stats() if self.adapter else {},
+            "analysis": self.analysis.get_stats() if self.analysis else {},
+            "jobs": self.analysis_jobs.get_stats() if self.analysis_jobs else {}
+        }
@@ -0,0 +1,97 @@
+"""
+Fixed-rate scheduler for UR10 Robot Server
+Runs periodic work against the monotonic clock without drift
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+class FixedRateScheduler:
+    """Calls a coroutine function at a fixed rate
+    
+    Deadlines advance by exactly one period per tick, so the time the work
+    takes does not lower the rate. When a tick overruns one or more later
+    deadlines those ticks are skipped instead of being run back to back.
+    """
+    
+    def __init__(self, rate_hz: float, name: str = "scheduler"):
+        if rate_hz <= 0:
+            raise ValueError(f"Scheduler rate must be positive, got {rate_hz}")
+            
+        self.name = name
+        self.rate_hz = rate_hz
+        self.period = 1.0 / rate_hz
+        self.running = False
+        
+        # Statistics
+        self.ticks = 0
+        self.overruns = 0
+        self.skipped_ticks = 0
+        self.last_jitter_ms = 0.0
+        self.max_jitter_ms = 0.0
+        self.jitter_ms_total = 0.0
+        self.last_duration_ms = 0.0
+        self.max_duration_ms = 0.0
+        self.started_at = 0.0
+        
+    async def run(self, tick: Callable[[], Awaitable[Any]]):
+        """Run ``tick`` every period until ``stop`` is called"""
+        self.running = True
+        self.started_at = time.monotonic()
+        deadline = self.started_at
+        logger.info(f"{self.name} running at {self.rate_hz:g} Hz")
+        
+        while self.running:
+            started = time.monotonic()
+            jitter_ms = (started - deadline) * 1000
+            self.last_jitter_ms = jitter_ms
+            self.max_jitter_ms = max(self.max_jitter_ms, jitter_ms)
+            self.jitter_ms_total += jitter_ms
+            
+            try:
+                await tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in {self.name} tick: {e}")
+                
+            finished = time.monotonic()
+            self.ticks += 1
+            self.last_duration_ms = (finished - started) * 1000
+            self.max_duration_ms = max(self.max_duration_ms, self.last_duration_ms)
+            
+            deadline += self.period
+            if finished > deadline:
+                # Skip every deadline that already passed rather than bursting
+                missed = int((finished - deadline) // self.period) + 1
+                self.overruns += 1
+                self.skipped_ticks += missed
+                deadline += missed * self.period
+                
+            await asyncio.sleep(max(0.0, deadline - time.monotonic()))
+            
+    def stop(self):
+        """Stop after the current tick"""
+        self.running = False
+        
+    def get_stats(self) -> Dict[str, Any]:
+        """Get rate, jitter and overrun statistics"""
+        elapsed = time.monotonic() - self.started_at if self.started_at else 0.0
+        return {
+            "name": self.name,
+            "running": self.running,
+            "target_rate_hz": self.rate_hz,
+            "actual_rate_hz": self.ticks / elapsed if elapsed > 0 else 0.0,
+            "ticks": self.ticks,
+            "overruns": self.overruns,
+            "skipped_ticks": self.skipped_ticks,
+            "last_jitter_ms": self.last_jitter_ms,
+            "max_jitter_ms": self.max_jitter_ms,
+            "avg_jitter_ms": self.jitter_ms_total / self.ticks if self.ticks else 0.0,
+            "last_duration_ms": self.last_duration_ms,
+            "max_duration_ms": self.max_duration_ms
+        }
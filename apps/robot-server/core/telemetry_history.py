@@ -0,0 +1,125 @@
+"""
+Telemetry history for UR10 Robot Server
+Fixed-size ring buffer of recent telemetry samples backed by preallocated arrays
+"""
+
+import time
+from array import array
+from typing import Any, Dict, List, Optional
+
+from models.schemas import RobotState
+
+# Robot states are stored as small integer codes
+STATE_CODES = {state: code for code, state in enumerate(RobotState)}
+STATE_NAMES = [state.value for state in RobotState]
+
+class TelemetryHistory:
+    """Ring buffer of telemetry samples
+    
+    Each field lives in its own preallocated ``array`` so the buffer never
+    grows, and reading a time window only copies that window.
+    """
+    
+    def __init__(self, capacity: int):
+        self.capacity = max(1, capacity)
+        
+        # Preallocated column storage, 6 values per sample for joints and pose
+        self.timestamps = array("d", [0.0]) * self.capacity
+        self.joints = array("d", [0.0]) * (self.capacity * 6)
+        self.tcp_pose = array("d", [0.0]) * (self.capacity * 6)
+        self.tcp_speed = array("d", [0.0]) * self.capacity
+        self.state = array("B", [0]) * self.capacity
+        self.di = array("Q", [0]) * self.capacity
+        self.do = array("Q", [0]) * self.capacity
+        
+        # Next slot to write and number of valid samples
+        self.head = 0
+        self.count = 0
+        
+    def record(self, timestamp: float, joints: List[float], tcp_pose: List[float], tcp_speed: float,
+               state: RobotState, di: List[bool], do: List[bool]):
+        """Store one sample, overwriting the oldest when full"""
+        slot = self.head
+        self.timestamps[slot] = timestamp
+        self.joints[slot * 6:slot * 6 + 6] = array("d", joints[:6])
+        self.tcp_pose[slot * 6:slot * 6 + 6] = array("d", tcp_pose[:6])
+        self.tcp_speed[slot] = tcp_speed
+        self.state[slot] = STATE_CODES.get(state, 0)
+        self.di[slot] = self._pack_bits(di)
+        self.do[slot] = self._pack_bits(do)
+        
+        self.head = (slot + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        
+    def window(self, seconds: float, now: Optional[float] = None) -> Dict[str, Any]:
+        """Get samples from the last ``seconds`` seconds, oldest first"""
+        now = time.time() if now is None else now
+        start = self._first_index_since(now - seconds)
+        
+        timestamps: List[float] = []
+        joints: List[List[float]] = []
+        tcp_pose: List[List[float]] = []
+        tcp_speed: List[float] = []
+        states: List[str] = []
+        di: List[int] = []
+        do: List[int] = []
+        
+        # Copy at most two contiguous runs, split where the ring wraps
+        for lo, hi in self._physical_runs(start, self.count):
+            timestamps.extend(self.timestamps[lo:hi])
+            tcp_speed.extend(self.tcp_speed[lo:hi])
+            di.extend(self.di[lo:hi])
+            do.extend(self.do[lo:hi])
+            states.extend(STATE_NAMES[code] for code in self.state[lo:hi])
+            joint_values = self.joints[lo * 6:hi * 6]
+            pose_values = self.tcp_pose[lo * 6:hi * 6]
+            for i in range(0, len(joint_values), 6):
+                joints.append(joint_values[i:i + 6].tolist())
+                tcp_pose.append(pose_values[i:i + 6].tolist())
+                
+        return {
+            "seconds": seconds,
+            "capacity": self.capacity,
+            "samples": len(timestamps),
+            "timestamps": timestamps,
+            "joints": joints,
+            "tcp_pose": tcp_pose,
+            "tcp_speed": tcp_speed,
+            "state": states,
+            "di": di,
+            "do": do
+        }
+        
+    def _slot(self, index: int) -> int:
+        """Physical slot of the ``index``-th oldest sample"""
+        return (self.head - self.count + index) % self.capacity
+        
+    def _first_index_since(self, since: float) -> int:
+        """Binary search for the oldest sample at or after ``since``"""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.timestamps[self._slot(mid)] < since:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+        
+    def _physical_runs(self, start: int, end: int):
+        """Split logical range [start, end) into contiguous physical slices"""
+        if start >= end:
+            return []
+        first = self._slot(start)
+        length = end - start
+        if first + length <= self.capacity:
+            return [(first, first + length)]
+        return [(first, self.capacity), (0, first + length - self.capacity)]
+        
+    @staticmethod
+    def _pack_bits(bits: List[bool]) -> int:
+        """Pack a list of digital I/O flags into an integer bit mask"""
+        mask = 0
+        for i, bit in enumerate(bits[:64]):
+            if bit:
+                mask |= 1 << i
+        return mask
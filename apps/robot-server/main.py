@@ -19,15 +19,19 @@ from fastapi import FastAPI, HTTPException, Depends, Request, WebSocket, WebSock
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 import asyncio
+import time
 import uvicorn
+from typing import Any, Dict
 
 from core.config import settings
 from core.robot_manager import RobotManager
 from core.session_manager import SessionManager
 from core.security import setup_security, security_exception_handler, APIKeyAuth
+from core.scheduler import FixedRateScheduler
 from api.routes import router as api_router
 from api.websocket import WebSocketManager
-from models.schemas import ErrorResponse
+from api.jog_stream import JogStreamHandler
+from adapters.ur_connection import CONNECTION_RECONNECTING
 
 # Configure logging
 logging.basicConfig(
@@ -40,8 +44,22 @@ logger = logging.getLogger(__name__)
 robot_manager = RobotManager()
 session_manager = SessionManager()
 websocket_manager = WebSocketManager()
+jog_stream = JogStreamHandler()
 api_key_auth = None
 
+def get_telemetry_rate() -> float:
+    """Telemetry rate for this deployment, capped by the robot data rate"""
+    rate = settings.TELEMETRY_RATE
+    if not settings.mock_mode and rate > settings.rtde_receive_frequency:
+        logger.warning(
+            f"TELEMETRY_RATE {rate:g} Hz exceeds RTDE_RECEIVE_FREQUENCY {settings.rtde_receive_frequency:g} Hz, "
+            f"capping telemetry at {settings.rtde_receive_frequency:g} Hz"
+        )
+        rate = settings.rtde_receive_frequency
+    return rate
+
+telemetry_scheduler = FixedRateScheduler(get_telemetry_rate(), name="telemetry")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager"""
@@ -53,6 +71,9 @@ async def lifespan(app: FastAPI):
     api_key_auth = APIKeyAuth()
     
     # Initialize robot manager
+    robot_manager.add_connection_listener(alert_connection_change)
+    robot_manager.add_analysis_job_listener(broadcast_analysis_job)
+    websocket_manager.add_message_handler("cancel_analysis", cancel_analysis_request)
     try:
         await robot_manager.initialize()
         logger.info("Robot manager initialized successfully")
@@ -62,13 +83,14 @@ async def lifespan(app: FastAPI):
             raise
     
     # Start telemetry broadcasting
-    asyncio.create_task(broadcast_telemetry())
+    telemetry_task = asyncio.create_task(broadcast_telemetry())
     
     # Store managers in app state
     app.state.robot_manager = robot_manager
     app.state.session_manager = session_manager
     app.state.websocket_manager = websocket_manager
     app.state.api_key_auth = api_key_auth
+    app.state.telemetry_scheduler = telemetry_scheduler
     
     logger.info("UR10 Robot Server started successfully")
     
@@ -77,22 +99,61 @@ async def lifespan(app: FastAPI):
     # Cleanup
     logger.info("Shutting down UR10 Robot Server...")
     
+    telemetry_scheduler.stop()
+    telemetry_task.cancel()
+    
     await robot_manager.cleanup()
     await session_manager.cleanup()
     
     logger.info("UR10 Robot Server shutdown complete")
 
+async def cancel_analysis_request(request: Dict[str, Any]) -> Dict[str, Any]:
+    """Stop analysis searches on request from /ws or /ws/analysis"""
+    channel = request.get("channel")
+    if channel is not None and not isinstance(channel, str):
+        raise ValueError("channel must be a string")
+    return {
+        "type": "analysis_cancelled",
+        "channel": channel,
+        "cancelled": robot_manager.cancel_analysis(channel),
+        "timestamp": time.time()
+    }
+
+async def broadcast_analysis_job(job, event: str):
+    """Report analysis job state changes and progress on /ws/analysis"""
+    await websocket_manager.broadcast_analysis("analysis_job", {
+        "event": event,
+        "job_id": job.id,
+        "status": job.status,
+        "priority": job.priority,
+        "progress": job.progress,
+        "info": job.info if event == "progress" else None,
+        "result": job.result if job.finished else None,
+        "error": job.error
+    })
+
+async def alert_connection_change(previous: str, state: str, reason: str):
+    """Broadcast robot link state transitions as alerts"""
+    severity = "warning" if state == CONNECTION_RECONNECTING else "info"
+    await websocket_manager.broadcast_alert(
+        "robot_connection",
+        f"Robot connection {state}: {reason}",
+        severity,
+        {"previous": previous, "state": state}
+    )
+
 async def broadcast_telemetry():
     """Broadcast telemetry data to all connected WebSocket clients"""
-    while True:
-        try:
-            if robot_manager.is_connected():
-                telemetry = await robot_manager.get_telemetry()
-                await websocket_manager.broadcast_telemetry(telemetry)
-            await asyncio.sleep(0.1)  # 10Hz telemetry
-        except Exception as e:
-            logger.error(f"Error broadcasting telemetry: {e}")
-            await asyncio.sleep(1)
+    try:
+        await telemetry_scheduler.run(broadcast_telemetry_tick)
+    except asyncio.CancelledError:
+        pass
+
+async def broadcast_telemetry_tick():
+    """Publish one telemetry snapshot and broadcast it"""
+    snapshot = await robot_manager.publish_telemetry()
+    if robot_manager.is_connected():
+        await websocket_manager.broadcast_telemetry(snapshot.telemetry, seq=snapshot.version)
 
 # Create FastAPI application
 app = FastAPI(
@@ -146,14 +207,33 @@ async def root():
 # Include API routes
 app.include_router(api_router, prefix="/api/v1", tags=["API"])
 
+# Multiplexed WebSocket endpoint, one connection for any set of topics
+@app.websocket("/ws")
+async def websocket_multiplexed(websocket: WebSocket):
+    # ?topics=telemetry,alerts subscribes on connect, ?mode= as for /ws/telemetry
+    topics = [topic for topic in websocket.query_params.get("topics", "").split(",") if topic]
+    mode = websocket.query_params.get("mode", "full")
+    await websocket_manager.connect_multiplexed(websocket, topics=topics, mode=mode)
+    try:
+        while True:
+            # Subscribe/unsubscribe messages change the client's topic set
+            message = await websocket.receive_text()
+            await websocket_manager.handle_message(websocket, message)
+    except WebSocketDisconnect:
+        websocket_manager.disconnect(websocket)
+
+# Single-topic endpoints kept for existing clients
 # WebSocket endpoint for telemetry
 @app.websocket("/ws/telemetry")
 async def websocket_telemetry(websocket: WebSocket):
-    await websocket_manager.connect_telemetry(websocket)
+    # ?mode=delta sends keyframes plus changed fields only
+    mode = websocket.query_params.get("mode", "full")
+    await websocket_manager.connect_telemetry(websocket, mode=mode)
     try:
         while True:
-            # Keep connection alive
-            await websocket.receive_text()
+            # Subscription messages set per-client rate and field set
+            message = await websocket.receive_text()
+            await websocket_manager.handle_telemetry_message(websocket, message)
     except WebSocketDisconnect:
         websocket_manager.disconnect_telemetry(websocket)
 
@@ -183,10 +263,18 @@ async def websocket_analysis(websocket: WebSocket):
     await websocket_manager.connect_analysis(websocket)
     try:
         while True:
-            await websocket.receive_text()
+            # {"type": "cancel_analysis", "channel": ...} stops a search
+            message = await websocket.receive_text()
+            await websocket_manager.handle_command(websocket, message)
     except WebSocketDisconnect:
         websocket_manager.disconnect_analysis(websocket)
 
+# WebSocket endpoint for hold-to-jog velocity streaming
+@app.websocket("/ws/jog")
+async def websocket_jog(websocket: WebSocket):
+    # ?session_id= is required, since setpoints move the robot
+    await jog_stream.run(websocket, robot_manager, session_manager)
+
 # Serve static files in development
 if settings.DEBUG:
     try:
@@ -56,6 +56,16 @@ class SafetyLimits(BaseModel):
     z_max: float = Field(..., description="Maximum Z position in meters")
     keepout: List[Dict[str, Any]] = Field(default_factory=list, description="Keep-out volumes")
 
+class BoardCalibration(BaseModel):
+    """Board calibration; unset fields keep their current value"""
+    angle: Optional[float] = Field(None, description="Board rotation in radians")
+    dx: Optional[float] = Field(None, description="Board X offset in meters")
+    dy: Optional[float] = Field(None, description="Board Y offset in meters")
+    square_size: Optional[float] = Field(None, gt=0, description="Square edge length in meters")
+    board_height: Optional[float] = Field(None, description="Board surface height in meters")
+    board_lift_height: Optional[float] = Field(None, description="Piece lift height in meters")
+    bin_position: Optional[List[float]] = Field(None, min_items=3, max_items=3, description="Bin X, Y, Z in meters")
+
 class ProgramStatus(BaseModel):
     """Program execution status"""
     name: Optional[str] = Field(None, description="Program name")
@@ -79,12 +89,26 @@ class EngineStatus(BaseModel):
     eval: Optional[float] = Field(None, description="Current evaluation")
     bestmove: Optional[str] = Field(None, description="Best move in UCI format")
     depth: Optional[int] = Field(None, description="Search depth")
+    state: Optional[str] = Field(None, description="Engine state (idle, searching)")
+    engines: Optional[int] = Field(None, description="Engine processes running")
+    nps: Optional[int] = Field(None, description="Search speed in nodes per second")
+    uptime: Optional[float] = Field(None, description="Seconds since the engines were started")
+    restarts: int = Field(default=0, description="Engine processes restarted after a crash")
 
 class NetworkStatus(BaseModel):
     """Network status"""
     rtt_ms: float = Field(..., description="Round-trip time in milliseconds")
     server_time: float = Field(default_factory=time.time, description="Server timestamp")
 
+class RobotDiagnostics(BaseModel):
+    """Controller state from the latest RTDE sample"""
+    joint_speeds: List[float] = Field(..., description="Joint speeds in rad/s")
+    joint_currents: List[float] = Field(..., description="Joint motor currents in A")
+    joint_temperatures: List[float] = Field(..., description="Joint temperatures in degrees C")
+    robot_mode: int = Field(..., description="Controller robot mode code")
+    safety_mode: int = Field(..., description="Controller safety mode code")
+    sample_age: float = Field(..., description="Seconds since the sample was received")
+
 # Main telemetry model
 class Telemetry(BaseModel):
     """Main telemetry data structure"""
@@ -100,6 +124,7 @@ class Telemetry(BaseModel):
     queue: QueueStatus = Field(..., description="Job queue status")
     engine: EngineStatus = Field(default_factory=EngineStatus, description="Chess engine status")
     net: NetworkStatus = Field(default_factory=NetworkStatus, description="Network status")
+    diagnostics: Optional[RobotDiagnostics] = Field(None, description="Controller diagnostics, while RTDE is streaming")
     errors: List[str] = Field(default_factory=list, description="Error messages")
 
 # Request models
@@ -138,6 +163,16 @@ class EngineAnalyzeRequest(BaseModel):
     fen: str = Field(..., description="FEN position to analyze")
     depth: Optional[int] = Field(None, description="Analysis depth")
     time: Optional[float] = Field(None, description="Analysis time in seconds")
+    channel: str = Field("default", description="Analysis channel; a new request supersedes the running one")
+    priority: Literal["game", "hint", "background"] = Field("hint", description="Engine priority class: game > hint > background")
+
+class AnalysisJobRequest(BaseModel):
+    """Analysis job submission"""
+    fen: str = Field(..., description="FEN position to analyze")
+    priority: Literal["game", "hint", "background"] = Field("hint", description="Priority class: game > hint > background")
+    depth: Optional[int] = Field(None, description="Analysis depth")
+    time: Optional[float] = Field(None, description="Analysis time in seconds")
+    deadline: Optional[float] = Field(None, description="Seconds from now by which the result is needed", gt=0)
 
 class TeachPointRequest(BaseModel):
     """Teach point request"""
@@ -150,6 +185,11 @@ class LimitsUpdateRequest(BaseModel):
     limits: SafetyLimits = Field(..., description="New safety limits")
     pin: str = Field(..., description="Supervisor PIN")
 
+class CalibrationUpdateRequest(BaseModel):
+    """Board calibration update request"""
+    calibration: BoardCalibration = Field(..., description="New calibration values")
+    pin: str = Field(..., description="Supervisor PIN")
+
 # Response models
 class SessionStartResponse(BaseModel):
     """Session start response"""
@@ -0,0 +1,50 @@
+"""
+Shared fixtures for the robot server tests
+"""
+
+import asyncio
+import copy
+from typing import Any, Dict, Optional
+
+import pytest
+
+import adapters.ur10_adapter as ur10_module
+from adapters.mock_adapter import MockAdapter
+from adapters.ur10_adapter import UR10Adapter
+from core.config import ROBOT_CONFIG_TEMPLATE
+from core.robot_manager import RobotManager
+
+@pytest.fixture
+def make_manager():
+    """Build a RobotManager around an initialized adapter, a MockAdapter by default"""
+    def make(adapter: Optional[MockAdapter] = None, config: Optional[Dict[str, Any]] = None,
+             connected: bool = False) -> RobotManager:
+        manager = RobotManager()
+        manager.adapter = adapter or MockAdapter()
+        asyncio.run(manager.adapter.initialize(config or ROBOT_CONFIG_TEMPLATE))
+        manager.adapter.connected = connected
+        return manager
+        
+    return make
+
+@pytest.fixture
+def manager(make_manager) -> RobotManager:
+    return make_manager()
+
+@pytest.fixture
+def ur10_adapter() -> UR10Adapter:
+    """UR10 adapter with its own config and board geometry, without robot_api or a link"""
+    adapter = UR10Adapter()
+    adapter.config = copy.deepcopy(ROBOT_CONFIG_TEMPLATE)
+    adapter._build_geometry()
+    return adapter
+
+@pytest.fixture
+def robot_api(monkeypatch):
+    """Record every robot_api call the adapter makes, in order, as ``(name, args)``"""
+    calls = []
+    for name in ("move_to_square", "forcemode_lower", "lift_piece", "lower_piece"):
+        monkeypatch.setattr(
+            ur10_module, name, lambda *args, name=name: calls.append((name, args)), raising=False
+        )
+    return calls
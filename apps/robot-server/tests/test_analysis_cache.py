@@ -0,0 +1,183 @@
+"""
+Tests for the two-tier position analysis cache
+"""
+
+import asyncio
+
+import chess
+import pytest
+
+from core.analysis_cache import AnalysisCache
+
+def board_after(*moves: str) -> chess.Board:
+    board = chess.Board()
+    for move in moves:
+        board.push_uci(move)
+    return board
+
+def result(bestmove: str, depth: int):
+    return {"bestmove": bestmove, "depth": depth}
+
+def test_deeper_entry_answers_shallower_requests():
+    async def scenario():
+        cache = AnalysisCache(8)
+        board = chess.Board()
+        await cache.put(board, 20, 1.0, result("e2e4", 20))
+        hits = (
+            await cache.get(board, 12, None),
+            await cache.get(board, None, 0.5),
+            await cache.get(board, 25, None)
+        )
+        await cache.close()
+        return cache, hits
+        
+    cache, (shallow, shorter, deeper) = asyncio.run(scenario())
+    
+    assert shallow.result["bestmove"] == "e2e4"
+    assert shorter is not None
+    assert deeper is None
+    assert (cache.memory_hits, cache.misses) == (2, 1)
+
+def test_shallower_result_does_not_replace_deeper():
+    async def scenario():
+        cache = AnalysisCache(8)
+        board = chess.Board()
+        await cache.put(board, 20, 1.0, result("e2e4", 20))
+        await cache.put(board, 10, 0.2, result("d2d4", 10))
+        entry = await cache.get(board, 1, None)
+        await cache.close()
+        return entry
+        
+    assert asyncio.run(scenario()).result["bestmove"] == "e2e4"
+
+def test_transpositions_share_an_entry():
+    async def scenario():
+        cache = AnalysisCache(8)
+        await cache.put(board_after("g1f3", "g8f6", "b1c3"), 10, None, result("b8c6", 10))
+        entry = await cache.get(board_after("b1c3", "g8f6", "g1f3"), 10, None)
+        await cache.close()
+        return entry
+        
+    assert asyncio.run(scenario()).result["bestmove"] == "b8c6"
+
+def test_lru_evicts_least_recently_used():
+    async def scenario():
+        cache = AnalysisCache(2)
+        first, second, third = board_after("e2e4"), board_after("d2d4"), board_after("c2c4")
+        await cache.put(first, 10, None, result("e7e5", 10))
+        await cache.put(second, 10, None, result("d7d5", 10))
+        await cache.get(first, 10, None)
+        await cache.put(third, 10, None, result("e7e5", 10))
+        found = [cache.peek(board) is not None for board in (first, second, third)]
+        await cache.close()
+        return cache, found
+        
+    cache, found = asyncio.run(scenario())
+    
+    assert found == [True, False, True]
+    assert cache.evictions == 1
+
+def test_disk_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "analysis.db")
+    
+    async def scenario():
+        cache = AnalysisCache(8, path)
+        await cache.open()
+        await cache.put(chess.Board(), 18, None, result("e2e4", 18))
+        await cache.close()
+        
+        reopened = AnalysisCache(8, path)
+        await reopened.open()
+        entry = await reopened.get(chess.Board(), 18, None)
+        memory = reopened.peek(chess.Board())
+        await reopened.close()
+        return reopened, entry, memory
+        
+    reopened, entry, memory = asyncio.run(scenario())
+    
+    assert entry.result == result("e2e4", 18)
+    assert reopened.disk_hits == 1
+    assert memory is entry
+
+def test_disk_upsert_keeps_the_deepest_result(tmp_path):
+    path = str(tmp_path / "analysis.db")
+    
+    async def scenario():
+        deep = AnalysisCache(8, path)
+        await deep.open()
+        await deep.put(chess.Board(), 20, 1.0, result("e2e4", 20))
+        await deep.close()
+        
+        # A second process with an empty memory tier stores a shallower result
+        shallow = AnalysisCache(8, path)
+        await shallow.open()
+        await shallow.put(chess.Board(), 8, 0.1, result("d2d4", 8))
+        await shallow.put(board_after("e2e4"), 8, 0.1, result("e7e5", 8))
+        await shallow.close()
+        
+        reader = AnalysisCache(8, path)
+        await reader.open()
+        start = await reader.get(chess.Board(), 1, None)
+        after = await reader.get(board_after("e2e4"), 1, None)
+        await reader.close()
+        return start, after
+        
+    start, after = asyncio.run(scenario())
+    
+    assert (start.depth, start.result["bestmove"]) == (20, "e2e4")
+    assert after.result["bestmove"] == "e7e5"
+
+def test_deeper_result_overwrites_disk_entry(tmp_path):
+    path = str(tmp_path / "analysis.db")
+    
+    async def scenario():
+        cache = AnalysisCache(8, path)
+        await cache.open()
+        await cache.put(chess.Board(), 10, 0.5, result("d2d4", 10))
+        await cache.put(chess.Board(), 22, None, result("e2e4", 22))
+        await cache.close()
+        
+        reader = AnalysisCache(8, path)
+        await reader.open()
+        entry = await reader.get(chess.Board(), 22, None)
+        await reader.close()
+        return entry
+        
+    assert asyncio.run(scenario()).result["bestmove"] == "e2e4"
+
+def test_signed_keys_round_trip():
+    for key in (0, (1 << 63) - 1, 1 << 63, (1 << 64) - 1):
+        signed = AnalysisCache._signed(key)
+        assert -(1 << 63) <= signed < (1 << 63)
+        assert signed % (1 << 64) == key
+
+@pytest.mark.parametrize("search_time, depth, time_limit, expected", [
+    # Completed depth 10
+    (None, None, None, False), (None, 10, None, True), (None, 11, None, False),
+    (None, 10, 5.0, True), (None, None, 0.5, False), (None, 11, 0.5, False),
+    # Cut short at 0.5 seconds while on depth 10
+    (0.5, None, 0.5, True), (0.5, 11, 0.5, True), (0.5, 9, None, True),
+    (0.5, 10, None, False), (0.5, None, 1.0, False)
+])
+def test_satisfies(search_time, depth, time_limit, expected):
+    async def scenario():
+        cache = AnalysisCache(8)
+        await cache.put(chess.Board(), 10, search_time, result("e2e4", 10))
+        entry = cache.peek(chess.Board())
+        await cache.close()
+        return entry
+        
+    assert asyncio.run(scenario()).satisfies(depth, time_limit) is expected
+
+def test_timed_out_search_does_not_answer_longer_request_at_same_depth():
+    async def scenario():
+        cache = AnalysisCache(8)
+        await cache.put(chess.Board(), 10, 0.5, result("e2e4", 10))
+        entry = await cache.get(chess.Board(), 10, 2.0)
+        await cache.close()
+        return cache, entry
+        
+    cache, entry = asyncio.run(scenario())
+    
+    assert entry is None
+    assert cache.misses == 1
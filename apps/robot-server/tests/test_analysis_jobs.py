@@ -0,0 +1,225 @@
+"""
+Tests for analysis job scheduling and preemption
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List, Tuple
+
+import chess
+import pytest
+
+from core import analysis_jobs
+from core.analysis_jobs import (
+    JOB_CANCELLED, JOB_COMPLETED, JOB_FAILED, JOB_QUEUED, JOB_RUNNING, AnalysisJobQueue
+)
+
+START_FEN = chess.STARTING_FEN
+
+class FakeAnalysis:
+    """Analysis service stand-in whose searches finish one per ``finish_one``"""
+    
+    def __init__(self):
+        self.default_depth = 12
+        self.default_time = 1.0
+        self.started: List[Tuple[str, str]] = []
+        self.finished = asyncio.Queue()
+        
+    async def analyze(self, fen: str, depth=None, time_limit=None, on_info=None, channel="default",
+                      priority="hint") -> Dict[str, Any]:
+        self.started.append((channel, priority))
+        await self.finished.get()
+        return {"bestmove": "e2e4", "depth": depth}
+        
+    async def finish_one(self):
+        self.finished.put_nowait(None)
+        await settle()
+
+async def settle():
+    """Let started tasks run up to their next wait"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+def started_jobs(analysis: FakeAnalysis, jobs) -> List[str]:
+    """Names of the started jobs in start order"""
+    names = {job.channel: name for name, job in jobs.items()}
+    return [names[channel] for channel, _ in analysis.started]
+
+def test_jobs_start_by_priority_then_deadline_then_submission():
+    async def scenario():
+        analysis = FakeAnalysis()
+        queue = AnalysisJobQueue(analysis, workers=1)
+        jobs = {"running": await queue.submit(START_FEN, "game")}
+        jobs["background"] = await queue.submit(START_FEN, "background")
+        jobs["hint"] = await queue.submit(START_FEN, "hint")
+        jobs["hint late"] = await queue.submit(START_FEN, "hint", deadline=60)
+        jobs["hint soon"] = await queue.submit(START_FEN, "hint", deadline=30)
+        jobs["game"] = await queue.submit(START_FEN, "game")
+        await settle()
+        for _ in range(len(jobs)):
+            await analysis.finish_one()
+        await queue.stop()
+        return analysis, queue, jobs
+        
+    analysis, queue, jobs = asyncio.run(scenario())
+    
+    assert started_jobs(analysis, jobs) == ["running", "game", "hint soon", "hint late", "hint", "background"]
+    assert all(job.status == JOB_COMPLETED for job in jobs.values())
+    assert queue.get_stats()["preemptions"] == 0
+
+def test_jobs_search_with_their_priority():
+    async def scenario():
+        analysis = FakeAnalysis()
+        queue = AnalysisJobQueue(analysis, workers=2)
+        await queue.submit(START_FEN, "game")
+        await queue.submit(START_FEN, "background")
+        await settle()
+        await queue.stop()
+        return analysis
+        
+    assert [priority for _, priority in asyncio.run(scenario()).started] == ["game", "background"]
+
+def test_more_important_job_preempts_running_one():
+    async def scenario():
+        analysis = FakeAnalysis()
+        events = []
+        
+        async def on_update(job, event):
+            events.append((job.priority, event))
+            
+        queue = AnalysisJobQueue(analysis, workers=1, on_update=on_update)
+        background = await queue.submit(START_FEN, "background")
+        await settle()
+        game = await queue.submit(START_FEN, "game")
+        await settle()
+        preempted = (background.status, game.status)
+        await analysis.finish_one()
+        await analysis.finish_one()
+        await queue.stop()
+        return analysis, queue, background, game, preempted, events
+        
+    analysis, queue, background, game, preempted, events = asyncio.run(scenario())
+    
+    assert preempted == (JOB_QUEUED, JOB_RUNNING)
+    assert ("background", "preempted") in events
+    assert [channel for channel, _ in analysis.started] == [background.channel, game.channel, background.channel]
+    assert (background.status, game.status) == (JOB_COMPLETED, JOB_COMPLETED)
+    assert background.preemptions == 1
+    assert queue.get_stats()["preemptions"] == 1
+
+def test_equal_priority_does_not_preempt():
+    async def scenario():
+        analysis = FakeAnalysis()
+        queue = AnalysisJobQueue(analysis, workers=1)
+        first = await queue.submit(START_FEN, "hint")
+        await settle()
+        second = await queue.submit(START_FEN, "hint", deadline=30)
+        await settle()
+        statuses = (first.status, second.status)
+        await queue.stop()
+        return statuses
+        
+    assert asyncio.run(scenario()) == (JOB_RUNNING, JOB_QUEUED)
+
+def test_job_fails_when_deadline_passes_in_queue():
+    async def scenario():
+        analysis = FakeAnalysis()
+        queue = AnalysisJobQueue(analysis, workers=1)
+        await queue.submit(START_FEN, "game")
+        await settle()
+        late = await queue.submit(START_FEN, "hint", deadline=0.15)
+        await asyncio.sleep(0.1)
+        await analysis.finish_one()
+        await queue.stop()
+        return analysis, queue, late
+        
+    analysis, queue, late = asyncio.run(scenario())
+    
+    assert late.status == JOB_FAILED
+    assert late.deadline_missed
+    assert len(analysis.started) == 1
+    assert queue.get_stats()["deadline_misses"] == 1
+
+def test_job_fails_when_deadline_expires_before_it_starts(monkeypatch):
+    clock = {"now": 1000.0}
+    monkeypatch.setattr(analysis_jobs, "time", SimpleNamespace(
+        monotonic=lambda: clock["now"], time=time.time
+    ))
+    
+    async def scenario():
+        analysis = FakeAnalysis()
+        queue = AnalysisJobQueue(analysis, workers=1)
+        expired = await queue.submit(START_FEN, "hint", deadline=5)
+        clock["now"] += 10
+        await settle()
+        await queue.stop()
+        return analysis, queue, expired
+        
+    analysis, queue, expired = asyncio.run(scenario())
+    
+    assert expired.status == JOB_FAILED
+    assert expired.deadline_missed
+    assert analysis.started == []
+    stats = queue.get_stats()
+    assert (stats["deadline_misses"], stats["failed"], stats["running"]) == (1, 1, 0)
+
+def test_cancel_queued_and_running_jobs():
+    async def scenario():
+        analysis = FakeAnalysis()
+        queue = AnalysisJobQueue(analysis, workers=1)
+        running = await queue.submit(START_FEN, "game")
+        queued = await queue.submit(START_FEN, "hint")
+        await settle()
+        cancelled = (await queue.cancel(queued.id), await queue.cancel(running.id))
+        await settle()
+        again = await queue.cancel(running.id)
+        await queue.stop()
+        return analysis, queue, running, queued, cancelled, again
+        
+    analysis, queue, running, queued, cancelled, again = asyncio.run(scenario())
+    
+    assert cancelled == (True, True)
+    assert again is False
+    assert (running.status, queued.status) == (JOB_CANCELLED, JOB_CANCELLED)
+    assert len(analysis.started) == 1
+    assert queue.get_stats()["cancelled"] == 2
+
+@pytest.mark.parametrize("fen, priority, deadline", [
+    (START_FEN, "urgent", None), ("not a fen", "hint", None), (START_FEN, "hint", 0)
+])
+def test_submit_rejects_invalid_jobs(fen, priority, deadline):
+    async def scenario():
+        queue = AnalysisJobQueue(FakeAnalysis())
+        with pytest.raises(ValueError):
+            await queue.submit(fen, priority, deadline=deadline)
+        return queue
+        
+    assert asyncio.run(scenario()).submitted == 0
+
+def test_version_changes_on_state_changes_but_not_progress():
+    class ProgressAnalysis(FakeAnalysis):
+        async def analyze(self, fen, depth=None, time_limit=None, on_info=None, channel="default",
+                          priority="hint"):
+            await on_info({"depth": 1})
+            return await super().analyze(fen, depth, time_limit, on_info, channel, priority)
+            
+    async def scenario():
+        analysis = ProgressAnalysis()
+        queue = AnalysisJobQueue(analysis, workers=1)
+        await queue.submit(START_FEN, "game")
+        await settle()
+        running = queue.version
+        await queue.submit(START_FEN, "hint")
+        queued = queue.version
+        await settle()
+        unchanged = queue.version
+        await analysis.finish_one()
+        await analysis.finish_one()
+        return running, queued, unchanged, queue.version
+        
+    running, queued, unchanged, finished = asyncio.run(scenario())
+    
+    assert running == 2
+    assert queued == unchanged == 3
+    assert finished == 6
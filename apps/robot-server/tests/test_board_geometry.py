@@ -0,0 +1,23 @@
+"""
+Tests for board calibration updates on the adapters
+"""
+
+import asyncio
+import copy
+
+import chess
+import pytest
+
+from adapters.mock_adapter import MockAdapter
+from core.config import ROBOT_CONFIG_TEMPLATE
+
+def test_calibration_update_leaves_the_config_template_alone():
+    template = copy.deepcopy(ROBOT_CONFIG_TEMPLATE)
+    adapter = MockAdapter()
+    asyncio.run(adapter.initialize(ROBOT_CONFIG_TEMPLATE))
+    
+    assert adapter.update_calibration({"dx": 0.25, "dy": -0.1})
+    
+    assert ROBOT_CONFIG_TEMPLATE == template
+    assert adapter.config["robot_parameters"]["dx"] == 0.25
+    assert adapter.geometry.square(chess.A1)[0] == pytest.approx(0.25 + adapter.geometry.square_size / 2)
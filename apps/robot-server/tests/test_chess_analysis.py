@@ -0,0 +1,354 @@
+"""
+Tests for the chess analysis service
+"""
+
+import asyncio
+from typing import Any, Dict, List
+
+import chess
+import pytest
+
+from core.analysis_cache import AnalysisCache
+from core.chess_analysis import PRIORITIES, SPECULATIVE_CHANNEL, ChessAnalysisService
+from core.engine_pool import EnginePool, PooledEngine
+
+START_FEN = chess.STARTING_FEN
+
+class FakeAdapter:
+    """Engine stand-in whose searches finish when ``finish`` is set"""
+    
+    def __init__(self, book: bool = False):
+        self.book = book
+        self.calls: List[str] = []
+        self.cancelled = 0
+        self.finish = asyncio.Event()
+        self.on_info = None
+        self.priority = None
+        
+    async def analyze_position(self, fen: str, depth=None, time_limit=None, on_info=None, priority=None,
+                               preemptible=False) -> Dict[str, Any]:
+        self.calls.append(fen)
+        self.on_info = on_info
+        self.priority = priority
+        if self.book:
+            return {"bestmove": "e2e4", "eval": None, "depth": 0, "pv": ["e2e4"], "book": True}
+        try:
+            if on_info:
+                await on_info({"bestmove": "e2e4", "depth": 1, "pv": ["e2e4"]})
+            await self.finish.wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return {"bestmove": "e2e4", "eval": 25, "depth": depth or 1, "pv": ["e2e4", "e7e5"]}
+
+class PooledAdapter:
+    """Adapter whose searches hold an engine of a one-engine pool until their position is finished"""
+    
+    def __init__(self):
+        self.pool = EnginePool("stockfish", size=1, ping_interval=0)
+        engine = PooledEngine(1, None, None, 0.0)
+        self.pool.engines.append(engine)
+        self.pool.idle.append(engine)
+        self.searched: List[str] = []
+        self.finished: Dict[str, asyncio.Event] = {}
+        
+    async def analyze_position(self, fen: str, depth=None, time_limit=None, on_info=None, priority=None,
+                               preemptible=False) -> Dict[str, Any]:
+        async with self.pool.checkout(priority, preemptible):
+            self.searched.append(fen)
+            await self.finished.setdefault(fen, asyncio.Event()).wait()
+        return {"bestmove": "e2e4", "eval": 25, "depth": depth or 1, "pv": ["e2e4"]}
+        
+    def finish(self, fen: str):
+        self.finished.setdefault(fen, asyncio.Event()).set()
+
+def collector(infos: List[Dict[str, Any]]):
+    async def on_info(info: Dict[str, Any]):
+        infos.append(info)
+    return on_info
+
+async def settle():
+    """Let started tasks run up to their next wait"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+def make_service(adapter: FakeAdapter) -> ChessAnalysisService:
+    return ChessAnalysisService(adapter, AnalysisCache(16), default_depth=12, default_time=1.0,
+                                info_rate=0, speculative=False)
+
+def test_book_hits_are_not_counted_as_engine_searches():
+    async def scenario():
+        adapter = FakeAdapter(book=True)
+        service = make_service(adapter)
+        result = await service.analyze(START_FEN, depth=10)
+        await service.stop()
+        return result, service.get_stats()
+        
+    result, stats = asyncio.run(scenario())
+    
+    assert result["book"] is True
+    assert stats["book_hits"] == 1
+    assert stats["searches"] == 0
+    assert stats["executed"] == 0
+    assert stats["cache"]["stores"] == 0
+
+def test_engine_searches_are_counted_and_cached():
+    async def scenario():
+        adapter = FakeAdapter()
+        adapter.finish.set()
+        service = make_service(adapter)
+        first = await service.analyze(START_FEN, depth=10)
+        second = await service.analyze(START_FEN, depth=10)
+        await service.stop()
+        return first, second, service.get_stats()
+        
+    first, second, stats = asyncio.run(scenario())
+    
+    assert first["cached"] is False
+    assert second["cached"] is True
+    assert stats["executed"] == 1
+    assert stats["searches"] == 1
+    assert stats["book_hits"] == 0
+
+def test_identical_requests_share_one_search():
+    async def scenario():
+        adapter = FakeAdapter()
+        service = make_service(adapter)
+        first_infos, second_infos = [], []
+        first = asyncio.create_task(service.analyze(START_FEN, depth=10, on_info=collector(first_infos), channel="a"))
+        await settle()
+        second = asyncio.create_task(service.analyze(START_FEN, depth=8, on_info=collector(second_infos), channel="b"))
+        await settle()
+        await adapter.on_info({"bestmove": "e2e4", "depth": 5, "pv": ["e2e4"]})
+        adapter.finish.set()
+        results = await asyncio.gather(first, second)
+        await service.stop()
+        return adapter, service.get_stats(), results, first_infos, second_infos
+        
+    adapter, stats, (first, second), first_infos, second_infos = asyncio.run(scenario())
+    
+    assert len(adapter.calls) == 1
+    assert first["coalesced"] is False
+    assert second["coalesced"] is True
+    assert first["bestmove"] == second["bestmove"] == "e2e4"
+    assert (stats["executed"], stats["coalesced"]) == (1, 1)
+    assert [info["depth"] for info in first_infos] == [1, 5]
+    assert [info["depth"] for info in second_infos] == [5]
+
+def test_deeper_request_does_not_join_shallower_search():
+    async def scenario():
+        adapter = FakeAdapter()
+        service = make_service(adapter)
+        shallow = asyncio.create_task(service.analyze(START_FEN, depth=8, channel="a"))
+        await settle()
+        deep = asyncio.create_task(service.analyze(START_FEN, depth=16, channel="b"))
+        await settle()
+        adapter.finish.set()
+        results = await asyncio.gather(shallow, deep)
+        await service.stop()
+        return adapter, results
+        
+    adapter, (shallow, deep) = asyncio.run(scenario())
+    
+    assert len(adapter.calls) == 2
+    assert deep["coalesced"] is False
+
+def test_cancelled_caller_leaves_search_running_for_others():
+    async def scenario():
+        adapter = FakeAdapter()
+        service = make_service(adapter)
+        leaving_infos, staying_infos = [], []
+        staying = asyncio.create_task(service.analyze(START_FEN, depth=10, on_info=collector(staying_infos), channel="a"))
+        await settle()
+        leaving = asyncio.create_task(service.analyze(START_FEN, depth=10, on_info=collector(leaving_infos), channel="b"))
+        await settle()
+        
+        leaving.cancel()
+        await asyncio.gather(leaving, return_exceptions=True)
+        await adapter.on_info({"bestmove": "e2e4", "depth": 7, "pv": ["e2e4"]})
+        running = dict(service.running)
+        adapter.finish.set()
+        result = await staying
+        await service.stop()
+        return adapter, running, result, leaving_infos, staying_infos
+        
+    adapter, running, result, leaving_infos, staying_infos = asyncio.run(scenario())
+    
+    assert adapter.cancelled == 0
+    assert list(running) == ["a"]
+    assert result["bestmove"] == "e2e4"
+    assert leaving_infos == []
+    assert [info["depth"] for info in staying_infos] == [1, 7]
+
+def test_search_stops_when_every_caller_cancels():
+    async def scenario():
+        adapter = FakeAdapter()
+        service = make_service(adapter)
+        callers = [
+            asyncio.create_task(service.analyze(START_FEN, depth=10, channel=channel))
+            for channel in ("a", "b")
+        ]
+        await settle()
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await settle()
+        stats = service.get_stats()
+        await service.stop()
+        return adapter, stats
+        
+    adapter, stats = asyncio.run(scenario())
+    
+    assert adapter.cancelled == 1
+    assert stats["running"] == {}
+    assert stats["cache"]["stores"] == 0
+
+def test_new_request_on_a_channel_replaces_its_search():
+    async def scenario():
+        adapter = FakeAdapter()
+        service = make_service(adapter)
+        old = asyncio.create_task(service.analyze(START_FEN, depth=10, channel="a"))
+        await settle()
+        board = chess.Board()
+        board.push_uci("e2e4")
+        new = asyncio.create_task(service.analyze(board.fen(), depth=10, channel="a"))
+        await settle()
+        adapter.finish.set()
+        results = await asyncio.gather(old, new)
+        await service.stop()
+        return adapter, results
+        
+    adapter, (old, new) = asyncio.run(scenario())
+    
+    assert adapter.cancelled == 1
+    assert old["cancelled"] is True
+    assert new["bestmove"] == "e2e4"
+
+def test_speculative_search_is_promoted_while_a_game_request_waits():
+    async def scenario():
+        adapter = FakeAdapter()
+        service = ChessAnalysisService(adapter, AnalysisCache(16), default_depth=12, default_time=1.0,
+                                       info_rate=0, speculative=True)
+        service.speculate(START_FEN)
+        await settle()
+        ranks = [adapter.priority()]
+        game = asyncio.create_task(service.analyze(START_FEN, priority="game", channel="game"))
+        await settle()
+        ranks.append(adapter.priority())
+        game.cancel()
+        await asyncio.gather(game, return_exceptions=True)
+        ranks.append(adapter.priority())
+        running = dict(service.running)
+        await service.stop()
+        return adapter, ranks, running
+        
+    adapter, ranks, running = asyncio.run(scenario())
+    
+    assert len(adapter.calls) == 1
+    assert ranks == [PRIORITIES["background"], PRIORITIES["game"], PRIORITIES["background"]]
+    assert list(running) == [SPECULATIVE_CHANNEL]
+
+def test_unknown_priority_is_rejected():
+    async def scenario():
+        adapter = FakeAdapter()
+        service = make_service(adapter)
+        result = await service.analyze(START_FEN, priority="urgent")
+        await service.stop()
+        return adapter, result
+        
+    adapter, result = asyncio.run(scenario())
+    
+    assert "error" in result
+    assert adapter.calls == []
+
+def test_search_that_completed_its_depth_does_not_answer_deeper_request():
+    async def scenario():
+        adapter = FakeAdapter()
+        adapter.finish.set()
+        service = make_service(adapter)
+        await service.analyze(START_FEN)
+        deeper = await service.analyze(START_FEN, depth=20, time_limit=1.0)
+        same = await service.analyze(START_FEN, depth=12, time_limit=5.0)
+        await service.stop()
+        return adapter, deeper, same
+        
+    adapter, deeper, same = asyncio.run(scenario())
+    
+    assert len(adapter.calls) == 2
+    assert (deeper["cached"], deeper["depth"]) == (False, 20)
+    assert same["cached"] is True
+
+@pytest.mark.parametrize("depth, time_limit, joins", [
+    (10, 1.0, True), (15, 0.5, True), (10, 10.0, False), (10, None, False), (None, 1.0, False), (20, 1.0, False)
+])
+def test_request_joins_only_a_search_that_stops_no_earlier(depth, time_limit, joins):
+    async def scenario():
+        adapter = FakeAdapter()
+        service = make_service(adapter)
+        running = asyncio.create_task(service.analyze(START_FEN, depth=15, time_limit=1.0, channel="a"))
+        await settle()
+        request = asyncio.create_task(service.analyze(START_FEN, depth, time_limit, channel="b"))
+        await settle()
+        adapter.finish.set()
+        results = await asyncio.gather(running, request)
+        await service.stop()
+        return adapter, results[1]
+        
+    adapter, result = asyncio.run(scenario())
+    
+    assert result["coalesced"] is joins
+    assert len(adapter.calls) == (1 if joins else 2)
+
+def test_background_speculation_gives_the_only_engine_to_a_game_request():
+    async def scenario():
+        adapter = PooledAdapter()
+        service = make_service(adapter)
+        service.speculative = True
+        board = chess.Board()
+        board.push_uci("e2e4")
+        service.speculate(board.fen())
+        await settle()
+        game = asyncio.create_task(service.analyze(START_FEN, priority="game", channel="game"))
+        await settle()
+        adapter.finish(START_FEN)
+        result = await game
+        await settle()
+        searched = list(adapter.searched)
+        running = dict(service.running)
+        await service.stop()
+        return adapter, service, board, result, searched, running
+        
+    adapter, service, board, result, searched, running = asyncio.run(scenario())
+    
+    assert result["bestmove"] == "e2e4"
+    assert searched == [board.fen(), START_FEN, board.fen()]
+    assert list(running) == [SPECULATIVE_CHANNEL]
+    assert service.get_stats()["preempted"] == 1
+    assert adapter.pool.get_stats()["preemptions"] == 1
+
+@pytest.mark.parametrize("played, kept", [("e7e5", True), ("c7c5", False)])
+def test_ponder_search_is_kept_only_while_its_position_can_follow(played, kept):
+    async def scenario():
+        adapter = FakeAdapter()
+        service = make_service(adapter)
+        service.speculative = True
+        board = chess.Board()
+        board.push_uci("e2e4")
+        predicted = board.copy()
+        predicted.push_uci("e7e5")
+        service.speculate(predicted.fen(), ponder=True)
+        await settle()
+        before_reply = service.supersede(board.fen())
+        board.push_uci(played)
+        after_reply = service.supersede(board.fen())
+        await settle()
+        running, cancelled = dict(service.running), adapter.cancelled
+        await service.stop()
+        return before_reply, after_reply, running, cancelled
+        
+    before_reply, after_reply, running, cancelled = asyncio.run(scenario())
+    
+    assert before_reply == 0
+    assert after_reply == (0 if kept else 1)
+    assert (SPECULATIVE_CHANNEL in running) is kept
+    assert cancelled == (0 if kept else 1)
@@ -0,0 +1,108 @@
+"""
+Tests for the robot command worker and stops that withdraw queued commands
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from adapters.command_worker import CommandWithdrawnError, RobotCommandWorker
+from core.robot_manager import RobotManager
+from models.schemas import RobotState
+
+async def wait_until_running(worker: RobotCommandWorker, name: str):
+    while worker.current is None or worker.current.name != name:
+        await asyncio.sleep(0.001)
+
+async def settle():
+    """Let started tasks run up to their next wait"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+def test_commands_run_in_submission_order():
+    async def scenario():
+        worker = RobotCommandWorker()
+        order = []
+        results = await asyncio.gather(*(
+            worker.submit(f"command {n}", lambda n=n: order.append(n) or n) for n in range(5)
+        ))
+        worker.stop(1.0)
+        return worker, order, results
+        
+    worker, order, results = asyncio.run(scenario())
+    
+    assert order == results == [0, 1, 2, 3, 4]
+    assert worker.completed == 5
+
+def test_withdrawn_command_fails_instead_of_cancelling_the_caller():
+    async def scenario():
+        worker = RobotCommandWorker()
+        release = threading.Event()
+        running = worker.submit("running", release.wait)
+        await wait_until_running(worker, "running")
+        queued = worker.submit("queued", lambda: "ran")
+        
+        withdrawn = worker.cancel_pending()
+        release.set()
+        await running
+        with pytest.raises(CommandWithdrawnError):
+            await queued
+        worker.stop(1.0)
+        return worker, withdrawn
+        
+    worker, withdrawn = asyncio.run(scenario())
+    
+    assert withdrawn == 1
+    assert (worker.completed, worker.cancelled) == (1, 1)
+
+def test_cancelled_caller_withdraws_its_command():
+    async def scenario():
+        worker = RobotCommandWorker()
+        release = threading.Event()
+        ran = []
+        running = worker.submit("running", release.wait)
+        await wait_until_running(worker, "running")
+        queued = asyncio.ensure_future(worker.submit("queued", lambda: ran.append(True)))
+        await settle()
+        queued.cancel()
+        await asyncio.gather(queued, return_exceptions=True)
+        release.set()
+        await running
+        worker.stop(1.0)
+        return worker, ran
+        
+    worker, ran = asyncio.run(scenario())
+    
+    assert ran == []
+    assert worker.cancelled == 1
+
+def test_stop_while_home_is_queued_leaves_the_robot_ready(ur10_adapter, robot_api):
+    adapter = ur10_adapter
+    adapter.connected = True
+    manager = RobotManager()
+    manager.adapter = adapter
+    
+    async def scenario():
+        
+        release = threading.Event()
+        running = adapter.commands.submit("running", release.wait)
+        await wait_until_running(adapter.commands, "running")
+        home = asyncio.create_task(manager.home_robot())
+        await settle()
+        assert manager.state == RobotState.EXECUTING
+        
+        stopped = await manager.stop_robot()
+        release.set()
+        await running
+        homed = await home
+        adapter.commands.stop(1.0)
+        return stopped, homed
+        
+    stopped, homed = asyncio.run(scenario())
+    
+    assert stopped is True
+    assert homed is False
+    assert robot_api == []
+    assert manager.state == RobotState.READY
+    assert "Failed to home robot" not in manager.errors
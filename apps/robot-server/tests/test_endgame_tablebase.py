@@ -0,0 +1,96 @@
+"""
+Tests for Syzygy tablebase probing
+"""
+
+from typing import Dict, Optional
+
+import chess
+
+from core.endgame_tablebase import TB_WIN_SCORE, EndgameTablebase
+
+# White king and rook against a lone king, no castling rights
+KRK_FEN = "8/8/8/4k3/8/8/8/R3K3 w - - 10 60"
+
+class FakeTables:
+    """Syzygy tables stand-in: the root is won, each reply's DTZ is looked up by move
+    
+    ``dtz_after`` maps a root move to the loser's distance to zeroing after
+    it, None for a move that throws the win away. Other moves win slowly.
+    """
+    
+    def __init__(self, dtz_after: Dict[str, Optional[int]]):
+        self.dtz_after = dtz_after
+        self.probes = 0
+        
+    def _after(self, board: chess.Board) -> Optional[int]:
+        return self.dtz_after.get(board.peek().uci(), 30)
+        
+    def probe_wdl(self, board: chess.Board) -> int:
+        self.probes += 1
+        if not board.move_stack:
+            return 2
+        return -2 if self._after(board) is not None else 0
+        
+    def probe_dtz(self, board: chess.Board) -> int:
+        if not board.move_stack:
+            return 5
+        dtz = self._after(board)
+        return -dtz if dtz is not None else 0
+        
+    def close(self):
+        pass
+
+def make_tablebase(tables: FakeTables, cache_size: int = 16) -> EndgameTablebase:
+    tablebase = EndgameTablebase("syzygy", cache_size=cache_size)
+    tablebase.tables = tables
+    tablebase.max_pieces = 3
+    return tablebase
+
+def test_probe_plays_the_fastest_win():
+    tablebase = make_tablebase(FakeTables({"a1a5": 4, "a1a8": 12, "e1d2": None}))
+    
+    result = tablebase.probe(chess.Board(KRK_FEN))
+    
+    assert result["bestmove"] == "a1a5"
+    assert result["tablebase"] is True
+    assert (result["wdl"], result["dtz"], result["eval"]) == (2, 5, TB_WIN_SCORE - 5)
+
+def test_repeated_probe_is_served_from_the_cache():
+    tables = FakeTables({"a1a5": 4})
+    tablebase = make_tablebase(tables)
+    board = chess.Board(KRK_FEN)
+    
+    first = tablebase.probe(board)
+    probes = tables.probes
+    second = tablebase.probe(board)
+    stats = tablebase.get_stats()
+    
+    assert second == first
+    assert tables.probes == probes
+    assert (stats["probes"], stats["hits"], stats["cache_hits"], stats["cached"]) == (2, 2, 1, 1)
+
+def test_cache_keeps_only_the_most_recent_positions():
+    tablebase = make_tablebase(FakeTables({}), cache_size=1)
+    board = chess.Board(KRK_FEN)
+    other = chess.Board("8/8/8/4k3/8/8/8/R3K3 b - - 10 60")
+    
+    tablebase.probe(board)
+    tablebase.probe(other)
+    tablebase.probe(board)
+    
+    assert tablebase.get_stats()["cache_hits"] == 0
+    assert list(tablebase.results) == [board.epd()]
+
+def test_positions_outside_the_tables_are_left_to_the_engine():
+    tables = FakeTables({})
+    tablebase = make_tablebase(tables)
+    
+    assert tablebase.probe(chess.Board()) is None
+    assert tablebase.probe(chess.Board("4k3/8/8/8/8/8/8/4K2R w K - 0 1")) is None
+    assert tables.probes == 0
+
+def test_missing_tables_are_not_loaded(tmp_path):
+    tablebase = EndgameTablebase(str(tmp_path))
+    
+    assert not tablebase.open()
+    assert tablebase.probe(chess.Board(KRK_FEN)) is None
@@ -0,0 +1,198 @@
+"""
+Tests for priority-ordered engine checkout
+"""
+
+import asyncio
+
+import pytest
+
+from core.engine_pool import NPS_REPORT_INTERVAL, EnginePool, PooledEngine
+
+class FakeProtocol:
+    def __init__(self):
+        self.answer = None
+        
+    async def quit(self):
+        pass
+        
+    async def ping(self):
+        if self.answer:
+            await self.answer.wait()
+
+class FakeTransport:
+    def close(self):
+        pass
+        
+    def get_returncode(self):
+        return None
+
+def make_pool(size: int = 1) -> EnginePool:
+    """Pool with idle stand-in engines and no supervisor"""
+    pool = EnginePool("stockfish", size=size, ping_interval=0)
+    for engine_id in range(1, size + 1):
+        engine = PooledEngine(engine_id, FakeTransport(), FakeProtocol(), 0.0)
+        pool.engines.append(engine)
+        pool.idle.append(engine)
+    return pool
+
+async def settle():
+    """Let started tasks run up to their next wait"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+async def borrow(pool: EnginePool, name: str, order: list, release: asyncio.Event, priority=None):
+    async with pool.checkout(priority):
+        order.append(name)
+        await release.wait()
+
+def test_freed_engine_goes_to_most_important_waiter():
+    async def scenario():
+        pool = make_pool()
+        release = asyncio.Event()
+        order = []
+        tasks = [asyncio.create_task(borrow(pool, "first", order, release))]
+        await settle()
+        for name, rank in (("background", 2), ("hint", 1), ("game", 0), ("second hint", 1)):
+            tasks.append(asyncio.create_task(borrow(pool, name, order, release, lambda rank=rank: rank)))
+            await settle()
+        waiting = pool.get_stats()["waiting"]
+        release.set()
+        await asyncio.gather(*tasks)
+        return pool, order, waiting
+        
+    pool, order, waiting = asyncio.run(scenario())
+    
+    assert waiting == 4
+    assert order == ["first", "game", "hint", "second hint", "background"]
+    assert pool.get_stats()["idle"] == 1
+
+def test_waiting_request_can_be_promoted():
+    async def scenario():
+        pool = make_pool()
+        release = asyncio.Event()
+        order = []
+        ranks = {"speculative": 2}
+        tasks = [asyncio.create_task(borrow(pool, "first", order, release))]
+        await settle()
+        tasks.append(asyncio.create_task(borrow(pool, "speculative", order, release, lambda: ranks["speculative"])))
+        await settle()
+        tasks.append(asyncio.create_task(borrow(pool, "hint", order, release, lambda: 1)))
+        await settle()
+        ranks["speculative"] = 0
+        release.set()
+        await asyncio.gather(*tasks)
+        return order
+        
+    assert asyncio.run(scenario()) == ["first", "speculative", "hint"]
+
+def test_cancelled_waiter_is_skipped():
+    async def scenario():
+        pool = make_pool()
+        release = asyncio.Event()
+        order = []
+        first = asyncio.create_task(borrow(pool, "first", order, release))
+        await settle()
+        game = asyncio.create_task(borrow(pool, "game", order, release, lambda: 0))
+        hint = asyncio.create_task(borrow(pool, "hint", order, release, lambda: 1))
+        await settle()
+        game.cancel()
+        await asyncio.gather(game, return_exceptions=True)
+        release.set()
+        await asyncio.gather(first, hint)
+        return pool, order
+        
+    pool, order = asyncio.run(scenario())
+    
+    assert order == ["first", "hint"]
+    assert pool.waiters == []
+    assert len(pool.idle) == 1
+
+def test_stop_fails_waiting_requests():
+    async def scenario():
+        pool = make_pool()
+        release = asyncio.Event()
+        order = []
+        first = asyncio.create_task(borrow(pool, "first", order, release))
+        await settle()
+        waiter = asyncio.create_task(borrow(pool, "waiter", order, release, lambda: 0))
+        await settle()
+        await pool.stop()
+        release.set()
+        await first
+        with pytest.raises(RuntimeError):
+            await waiter
+        return order
+        
+    assert asyncio.run(scenario()) == ["first"]
+
+def test_search_speed_changes_are_reported_at_most_once_per_interval():
+    changes = []
+    pool = make_pool()
+    pool.on_change = lambda: changes.append(pool.last_nps)
+    protocol = pool.engines[0].protocol
+    
+    for nps in (1000, 2000, 3000):
+        pool.record(protocol, {"nps": nps})
+    pool.nps_reported_at -= NPS_REPORT_INTERVAL
+    pool.record(protocol, {"nps": 4000})
+    
+    assert changes == [1000, 4000]
+    assert pool.get_status()["nps"] == 4000
+
+@pytest.mark.parametrize("holder_rank, preemptible, preempted", [
+    (2, True, True), (0, True, False), (2, False, False)
+])
+def test_more_important_request_preempts_a_preemptible_checkout(holder_rank, preemptible, preempted):
+    async def scenario():
+        pool = make_pool()
+        release = asyncio.Event()
+        order = []
+        
+        async def hold():
+            async with pool.checkout(lambda: holder_rank, preemptible):
+                order.append("holder")
+                await release.wait()
+                
+        holder = asyncio.create_task(hold())
+        await settle()
+        game = asyncio.create_task(borrow(pool, "game", order, release, lambda: 0))
+        await settle()
+        before_release = list(order)
+        release.set()
+        await asyncio.gather(holder, game, return_exceptions=True)
+        return pool, holder, before_release, order
+        
+    pool, holder, before_release, order = asyncio.run(scenario())
+    
+    assert holder.cancelled() is preempted
+    assert before_release == (["holder", "game"] if preempted else ["holder"])
+    assert order == ["holder", "game"]
+    assert pool.get_stats()["preemptions"] == (1 if preempted else 0)
+    assert pool.engines[0].holder is None
+    assert len(pool.idle) == 1
+
+def test_health_check_leaves_other_idle_engines_free():
+    async def scenario():
+        pool = make_pool(size=3)
+        answer = asyncio.Event()
+        for engine in pool.engines:
+            engine.protocol.answer = answer
+        check = asyncio.create_task(pool.check_health())
+        await settle()
+        idle_during_ping = pool.get_stats()["idle"]
+        
+        async def borrow_free():
+            async with pool.checkout(lambda: 0) as protocol:
+                return [engine.id for engine in pool.engines if engine.protocol is protocol]
+                
+        checked_out = await asyncio.wait_for(borrow_free(), timeout=1)
+        answer.set()
+        await check
+        return pool, idle_during_ping, checked_out
+        
+    pool, idle_during_ping, checked_out = asyncio.run(scenario())
+    
+    assert idle_during_ping == 2
+    assert checked_out in ([2], [3])
+    stats = pool.get_stats()
+    assert (stats["idle"], stats["preemptions"], pool.failures) == (3, 0, 0)
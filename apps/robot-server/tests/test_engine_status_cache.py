@@ -0,0 +1,67 @@
+"""
+Tests for the versioned engine and queue status caches
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+def test_status_is_reused_until_version_changes(manager):
+    async def scenario():
+        first = await manager.get_engine_status()
+        second = await manager.get_engine_status()
+        return first, second
+        
+    first, second = asyncio.run(scenario())
+    
+    assert first.bestmove is None
+    assert second == first.copy(update={"uptime": second.uptime})
+
+def test_finished_analysis_replaces_cached_status(manager):
+    async def scenario():
+        await manager.get_engine_status()
+        result = await manager.adapter.analyze_position(START_FEN, depth=1)
+        return result, await manager.get_engine_status()
+        
+    result, status = asyncio.run(scenario())
+    
+    assert status.bestmove == result["bestmove"]
+    assert status.depth == result["depth"]
+
+def test_book_hit_replaces_cached_status(manager):
+    class Book:
+        def probe(self, board):
+            return {"bestmove": "e2e4", "eval": None, "depth": 0, "pv": ["e2e4"], "book": True}
+            
+    async def scenario():
+        await manager.get_engine_status()
+        manager.adapter.opening_book = Book()
+        await manager.adapter.analyze_position(START_FEN)
+        return await manager.get_engine_status()
+        
+    assert asyncio.run(scenario()).bestmove == "e2e4"
+
+def test_uptime_is_computed_per_call(manager):
+    async def scenario():
+        await manager.get_engine_status()
+        manager.adapter.engine_started_at -= 100.0
+        return await manager.get_engine_status()
+        
+    assert asyncio.run(scenario()).uptime >= 100.0
+
+def test_queue_status_is_rebuilt_when_the_job_queue_version_changes(manager):
+    manager.analysis_jobs = SimpleNamespace(queue=["queued"], running={"job": None}, version=1)
+    
+    async def scenario():
+        first = await manager.get_queue_status()
+        manager.analysis_jobs.queue.append("queued")
+        cached = await manager.get_queue_status()
+        manager.analysis_jobs.version += 1
+        return first, cached, await manager.get_queue_status()
+        
+    first, cached, rebuilt = asyncio.run(scenario())
+    
+    assert (first.pending, first.active) == (1, "job")
+    assert cached is first
+    assert rebuilt.pending == 2
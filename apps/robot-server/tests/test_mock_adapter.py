@@ -0,0 +1,32 @@
+"""
+Tests for the mock adapter's simulated chess moves
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import chess
+
+import adapters.mock_adapter as mock_module
+
+def test_stop_interrupts_a_simulated_chess_move(manager, monkeypatch):
+    adapter = manager.adapter
+    steps = []
+    
+    async def sleep(seconds: float):
+        steps.append(seconds)
+        await asyncio.sleep(0)
+        
+    monkeypatch.setattr(mock_module, "asyncio", SimpleNamespace(sleep=sleep))
+    
+    async def scenario():
+        move = asyncio.create_task(adapter.chess_move("e2", "e4"))
+        while not steps:
+            await asyncio.sleep(0)
+        await adapter.stop()
+        return await move
+        
+    assert asyncio.run(scenario()) is False
+    assert len(steps) == 1
+    assert adapter.chess_board.fen() == chess.STARTING_FEN
+    assert adapter.last_motion_program is None
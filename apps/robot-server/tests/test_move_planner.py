@@ -0,0 +1,111 @@
+"""
+Tests for chess move motion planning
+"""
+
+import chess
+import pytest
+
+from adapters.board_geometry import BoardGeometry
+from adapters.move_planner import (
+    ACTION_PICK, ACTION_PLACE, ACTION_TRAVEL, MovePlanner, PieceTransfer
+)
+from core.config import ROBOT_CONFIG_TEMPLATE
+
+@pytest.fixture
+def planner():
+    parameters = ROBOT_CONFIG_TEMPLATE["robot_parameters"]
+    return MovePlanner(BoardGeometry(parameters), parameters["move_speed"], parameters["move_accel"])
+
+def route(transfers):
+    """Transfers as (from, to, piece, reason) with square names"""
+    return [(t.to_dict()["from"], t.to_dict()["to"], t.piece, t.reason) for t in transfers]
+
+def test_plain_move_is_one_transfer(planner):
+    program = planner.plan(chess.Board(), chess.Move.from_uci("e2e4"))
+    
+    assert route(program.transfers) == [("e2", "e4", "P", "move")]
+    assert [step.action for step in program.steps] == [ACTION_TRAVEL, ACTION_PICK, ACTION_TRAVEL, ACTION_PLACE]
+
+def test_unknown_start_still_travels_to_the_first_pick(planner):
+    program = planner.plan(chess.Board(), chess.Move.from_uci("g1f3"))
+    first = program.steps[0]
+    
+    assert first.action == ACTION_TRAVEL
+    assert first.position == program.steps[1].position
+    assert first.duration == 0.0
+
+def test_illegal_move_is_rejected(planner):
+    with pytest.raises(ValueError):
+        planner.plan(chess.Board(), chess.Move.from_uci("e2e5"))
+
+def test_capture_clears_target_first(planner):
+    board = chess.Board("rnbqkbnr/ppp1pppp/8/3p4/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2")
+    program = planner.plan(board, chess.Move.from_uci("e4d5"))
+    
+    assert route(program.transfers) == [("d5", "bin", "p", "capture"), ("e4", "d5", "P", "move")]
+    assert program.steps[3].action == ACTION_PLACE
+    assert program.steps[3].at_bin
+
+def test_castling_moves_king_and_rook(planner):
+    board = chess.Board("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1")
+    
+    kingside = planner.plan(board, chess.Move.from_uci("e1g1"))
+    queenside = planner.plan(board, chess.Move.from_uci("e1c1"))
+    
+    assert sorted(route(kingside.transfers)) == [("e1", "g1", "K", "castling"), ("h1", "f1", "R", "castling")]
+    assert sorted(route(queenside.transfers)) == [("a1", "d1", "R", "castling"), ("e1", "c1", "K", "castling")]
+
+def test_black_castling_uses_back_rank(planner):
+    board = chess.Board("r3k2r/8/8/8/8/8/8/R3K2R b KQkq - 0 1")
+    program = planner.plan(board, chess.Move.from_uci("e8g8"))
+    
+    assert sorted(route(program.transfers)) == [("e8", "g8", "k", "castling"), ("h8", "f8", "r", "castling")]
+
+def test_en_passant_removes_passed_pawn(planner):
+    board = chess.Board("rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3")
+    program = planner.plan(board, chess.Move.from_uci("e5f6"))
+    
+    transfers = route(program.transfers)
+    assert ("f5", "bin", "p", "en_passant") in transfers
+    assert ("e5", "f6", "P", "move") in transfers
+    assert len(transfers) == 2
+
+def test_promotion_swaps_pawn_for_new_piece(planner):
+    board = chess.Board("8/4P3/8/8/8/8/8/k6K w - - 0 1")
+    program = planner.plan(board, chess.Move.from_uci("e7e8q"))
+    
+    transfers = route(program.transfers)
+    assert ("e7", "bin", "P", "promotion") in transfers
+    assert ("bin", "e8", "Q", "promotion") in transfers
+    assert len(transfers) == 2
+
+def test_capture_promotion_clears_target_before_placing(planner):
+    board = chess.Board("3r4/4P3/8/8/8/8/8/k6K w - - 0 1")
+    program = planner.plan(board, chess.Move.from_uci("e7d8n"))
+    
+    transfers = route(program.transfers)
+    assert len(transfers) == 3
+    assert transfers.index(("d8", "bin", "r", "capture")) < transfers.index(("bin", "d8", "N", "promotion"))
+
+def test_order_requires_vacated_squares():
+    capture = PieceTransfer(chess.D5, None, "p", "capture")
+    move = PieceTransfer(chess.E4, chess.D5, "P", "move")
+    
+    assert MovePlanner._is_valid_order([capture, move])
+    assert not MovePlanner._is_valid_order([move, capture])
+
+def test_start_position_adds_leading_travel(planner):
+    program = planner.plan(chess.Board(), chess.Move.from_uci("g1f3"), start=[0.0, 0.0, 0.5])
+    
+    assert program.steps[0].action == ACTION_TRAVEL
+    assert program.travel_distance > 0
+    assert program.estimated_time == pytest.approx(sum(step.duration for step in program.steps))
+
+def test_order_minimises_travel_from_start(planner):
+    board = chess.Board("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1")
+    geometry = planner.geometry
+    near_rook = list(geometry.square(chess.H1)) + [geometry.heights["lift"]]
+    
+    program = planner.plan(board, chess.Move.from_uci("e1g1"), start=near_rook)
+    
+    assert route(program.transfers)[0] == ("h1", "f1", "R", "castling")
@@ -0,0 +1,83 @@
+"""
+Tests for the Polyglot opening book
+"""
+
+import asyncio
+import struct
+from types import SimpleNamespace
+
+import chess
+import chess.polyglot
+
+import core.opening_book as book_module
+from core.opening_book import OpeningBook
+
+def polyglot_move(move: chess.Move) -> int:
+    """Polyglot encoding of a move: to square, then from square, 6 bits each"""
+    return move.to_square | move.from_square << 6
+
+def write_book(path, entries):
+    """Write ``(board, uci, weight)`` entries as a Polyglot book sorted by key"""
+    rows = sorted(
+        (chess.polyglot.zobrist_hash(board), polyglot_move(chess.Move.from_uci(uci)), weight)
+        for board, uci, weight in entries
+    )
+    with open(path, "wb") as book:
+        for key, move, weight in rows:
+            book.write(struct.pack(">QHHI", key, move, weight, 0))
+    return str(path)
+
+def test_probe_picks_a_book_move_by_weight(tmp_path, monkeypatch):
+    start = chess.Board()
+    path = write_book(tmp_path / "book.bin", [(start, "e2e4", 3), (start, "d2d4", 1), (start, "a2a3", 0)])
+    offered = []
+    
+    def choices(entries, weights):
+        # Deterministic stand-in for random.choices: the heaviest entry
+        offered.append(list(weights))
+        return [max(entries, key=lambda entry: entry.weight)]
+        
+    monkeypatch.setattr(book_module, "random", SimpleNamespace(choices=choices))
+    book = OpeningBook(path)
+    assert book.open()
+    
+    result = book.probe(start)
+    book.close()
+    
+    assert result["bestmove"] == "e2e4"
+    assert result["book"] is True
+    assert sorted(offered[0]) == [1, 3]
+    assert sorted(move["move"] for move in result["book_moves"]) == ["d2d4", "e2e4"]
+
+def test_positions_outside_the_book_are_misses(tmp_path):
+    start = chess.Board()
+    path = write_book(tmp_path / "book.bin", [(start, "e2e4", 1)])
+    book = OpeningBook(path)
+    book.open()
+    after = chess.Board()
+    after.push_uci("g1f3")
+    
+    hit, miss = book.probe(start), book.probe(after)
+    stats = book.get_stats()
+    book.close()
+    
+    assert hit["bestmove"] == "e2e4"
+    assert miss is None
+    assert (stats["entries"], stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 1, 0.5)
+
+def test_missing_book_file_is_not_loaded(tmp_path):
+    book = OpeningBook(str(tmp_path / "missing.bin"))
+    
+    assert not book.open()
+    assert book.probe(chess.Board()) is None
+
+def test_mock_adapter_answers_book_positions_without_searching(manager, tmp_path):
+    adapter = manager.adapter
+    adapter.opening_book = OpeningBook(write_book(tmp_path / "book.bin", [(chess.Board(), "e2e4", 1)]))
+    adapter.opening_book.open()
+    
+    result = asyncio.run(adapter.analyze_position(chess.STARTING_FEN, depth=10))
+    adapter.opening_book.close()
+    
+    assert (result["bestmove"], result["book"], result["depth"]) == ("e2e4", True, 0)
+    assert adapter.engine_analyzing is False
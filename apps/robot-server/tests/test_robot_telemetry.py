@@ -0,0 +1,62 @@
+"""
+Tests for RobotManager telemetry assembly from adapter samples
+"""
+
+import asyncio
+
+import pytest
+
+from adapters.mock_adapter import MockAdapter
+from models.schemas import RobotState
+
+class SampleAdapter(MockAdapter):
+    """Mock adapter that reports RTDE sample fields of a chosen age"""
+    
+    def __init__(self, sample_age: float):
+        super().__init__()
+        self.sample_age = sample_age
+        
+    async def get_telemetry(self):
+        telemetry = await super().get_telemetry()
+        telemetry.update({
+            "joint_speeds": [0.1] * 6,
+            "joint_currents": [0.5] * 6,
+            "joint_temperatures": [30.0] * 6,
+            "robot_mode": 7,
+            "safety_mode": 1,
+            "sample_age": self.sample_age
+        })
+        return telemetry
+
+def test_sample_fields_reach_telemetry(make_manager):
+    manager = make_manager(SampleAdapter(sample_age=0.01), connected=True)
+    telemetry = asyncio.run(manager.get_telemetry())
+    
+    assert telemetry.diagnostics is not None
+    assert telemetry.diagnostics.joint_currents == [0.5] * 6
+    assert telemetry.diagnostics.joint_temperatures == [30.0] * 6
+    assert telemetry.diagnostics.safety_mode == 1
+    assert telemetry.diagnostics.sample_age == pytest.approx(0.01)
+
+def test_stale_sample_pauses_execution(make_manager):
+    manager = make_manager(SampleAdapter(sample_age=5.0), connected=True)
+    manager.state = RobotState.EXECUTING
+    asyncio.run(manager.get_telemetry())
+    
+    assert manager.state == RobotState.PAUSED
+    assert "Telemetry stale - auto-paused" in manager.errors
+
+def test_fresh_sample_keeps_executing(make_manager):
+    manager = make_manager(SampleAdapter(sample_age=0.01), connected=True)
+    manager.state = RobotState.EXECUTING
+    asyncio.run(manager.get_telemetry())
+    
+    assert manager.state == RobotState.EXECUTING
+
+def test_adapter_without_samples_reports_no_diagnostics(make_manager):
+    manager = make_manager(MockAdapter(), connected=True)
+    manager.state = RobotState.EXECUTING
+    telemetry = asyncio.run(manager.get_telemetry())
+    
+    assert telemetry.diagnostics is None
+    assert manager.state == RobotState.EXECUTING
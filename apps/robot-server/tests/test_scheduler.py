@@ -0,0 +1,87 @@
+"""
+Tests for the fixed-rate telemetry scheduler
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import core.scheduler as scheduler_module
+from core.scheduler import FixedRateScheduler
+
+class FakeClock:
+    """Monotonic clock that only moves when told to"""
+    
+    def __init__(self):
+        self.now = 0.0
+        
+    def monotonic(self) -> float:
+        return self.now
+        
+    async def sleep(self, seconds: float):
+        self.now += max(0.0, seconds)
+        await asyncio.sleep(0)
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(scheduler_module, "time", SimpleNamespace(monotonic=clock.monotonic))
+    monkeypatch.setattr(
+        scheduler_module,
+        "asyncio",
+        SimpleNamespace(sleep=clock.sleep, CancelledError=asyncio.CancelledError)
+    )
+    return clock
+
+def run_ticks(scheduler: FixedRateScheduler, clock: FakeClock, durations):
+    """Run one tick per duration, returning the clock time each tick started"""
+    started = []
+    durations = list(durations)
+    
+    async def tick():
+        started.append(clock.now)
+        clock.now += durations[len(started) - 1]
+        if len(started) == len(durations):
+            scheduler.stop()
+            
+    asyncio.run(scheduler.run(tick))
+    return started
+
+def test_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        FixedRateScheduler(0)
+
+def test_ticks_on_fixed_deadlines_without_drift(clock):
+    scheduler = FixedRateScheduler(10.0)
+    started = run_ticks(scheduler, clock, [0.03] * 5)
+    
+    assert started == pytest.approx([0.0, 0.1, 0.2, 0.3, 0.4])
+    assert scheduler.overruns == 0
+    assert scheduler.skipped_ticks == 0
+    assert scheduler.max_jitter_ms == pytest.approx(0.0)
+
+def test_overrun_skips_missed_ticks_instead_of_bursting(clock):
+    scheduler = FixedRateScheduler(10.0)
+    # The second tick takes 2.5 periods, overrunning the deadlines at 0.2 and 0.3
+    started = run_ticks(scheduler, clock, [0.01, 0.25, 0.01, 0.01])
+    
+    assert started == pytest.approx([0.0, 0.1, 0.4, 0.5])
+    assert scheduler.overruns == 1
+    assert scheduler.skipped_ticks == 2
+    assert scheduler.ticks == 4
+
+def test_error_in_tick_does_not_stop_the_scheduler(clock):
+    scheduler = FixedRateScheduler(10.0)
+    calls = []
+    
+    async def tick():
+        calls.append(clock.now)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        scheduler.stop()
+        
+    asyncio.run(scheduler.run(tick))
+    
+    assert calls == pytest.approx([0.0, 0.1])
+    assert scheduler.ticks == 2
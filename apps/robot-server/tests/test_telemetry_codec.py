@@ -0,0 +1,90 @@
+"""
+Tests for the binary telemetry codec
+"""
+
+import json
+
+import pytest
+
+import api.telemetry_codec as codec
+from api.telemetry_codec import (
+    FIXED_LAYOUT, FLAG_KEYFRAME, FLAG_MSGPACK, FLAG_VARIABLE, MAGIC, TELEMETRY_SCHEMA_VERSION,
+    encode_binary_frame, encode_variable_part
+)
+from core.telemetry_history import STATE_CODES
+from models.schemas import RobotState
+
+def make_telemetry():
+    return {
+        "joints": [0.0, -1.5, 1.25, 0.5, -0.25, 3.0],
+        "tcp_pose": {"x": 0.25, "y": -0.5, "z": 0.75, "rx": 0.0, "ry": 3.0, "rz": -1.0},
+        "tcp_speed": 0.125,
+        "state": RobotState.EXECUTING.value,
+        "estop": {"hw": False, "sw": True},
+        "iomap": {"di": [True, False, True], "do": [False, True]},
+        "net": {"server_time": 1700000000.5, "rtt_ms": 2.5},
+        "mode": "REMOTE",
+        "errors": []
+    }
+
+def test_fixed_part_layout():
+    frame = encode_binary_frame(make_telemetry(), seq=7)
+    assert len(frame) == FIXED_LAYOUT.size
+    
+    fields = FIXED_LAYOUT.unpack(frame)
+    magic, version, flags, seq, server_time = fields[:5]
+    joints, pose = fields[5:11], fields[11:17]
+    tcp_speed, rtt, state, estop, di_count, do_count, di, do, variable_length = fields[17:]
+    
+    assert (magic, version, flags, seq) == (MAGIC, TELEMETRY_SCHEMA_VERSION, 0, 7)
+    assert server_time == 1700000000.5
+    assert list(joints) == [0.0, -1.5, 1.25, 0.5, -0.25, 3.0]
+    assert list(pose) == [0.25, -0.5, 0.75, 0.0, 3.0, -1.0]
+    assert tcp_speed == 0.125
+    assert rtt == 2.5
+    assert state == STATE_CODES[RobotState.EXECUTING]
+    assert estop == 0b10
+    assert (di_count, do_count, di, do) == (3, 2, 0b101, 0b10)
+    assert variable_length == 0
+
+def test_sequence_wraps_at_32_bits():
+    frame = encode_binary_frame(make_telemetry(), seq=2 ** 32 + 5)
+    assert FIXED_LAYOUT.unpack(frame)[3] == 5
+
+def test_variable_part_excludes_fixed_fields():
+    variable = encode_variable_part(make_telemetry())
+    decoded = codec.msgpack.unpackb(variable) if codec.MSGPACK_AVAILABLE else json.loads(variable)
+    
+    assert decoded == {"mode": "REMOTE", "errors": []}
+
+def test_variable_part_follows_fixed_part():
+    telemetry = make_telemetry()
+    variable = encode_variable_part(telemetry)
+    frame = encode_binary_frame(telemetry, seq=1, variable=variable, keyframe=True)
+    
+    fields = FIXED_LAYOUT.unpack(frame[:FIXED_LAYOUT.size])
+    flags, variable_length = fields[2], fields[-1]
+    
+    assert flags & FLAG_VARIABLE
+    assert flags & FLAG_KEYFRAME
+    assert variable_length == len(variable)
+    assert frame[FIXED_LAYOUT.size:] == variable
+
+def test_falls_back_to_json_without_msgpack(monkeypatch):
+    monkeypatch.setattr(codec, "MSGPACK_AVAILABLE", False)
+    telemetry = make_telemetry()
+    variable = encode_variable_part(telemetry)
+    frame = encode_binary_frame(telemetry, seq=1, variable=variable)
+    flags = FIXED_LAYOUT.unpack(frame[:FIXED_LAYOUT.size])[2]
+    
+    assert json.loads(variable.decode("utf-8")) == {"mode": "REMOTE", "errors": []}
+    assert flags & FLAG_VARIABLE
+    assert not flags & FLAG_MSGPACK
+    assert not flags & FLAG_KEYFRAME
+
+def test_msgpack_flag_set_when_available():
+    pytest.importorskip("msgpack")
+    telemetry = make_telemetry()
+    frame = encode_binary_frame(telemetry, seq=1, variable=encode_variable_part(telemetry))
+    
+    assert FIXED_LAYOUT.unpack(frame[:FIXED_LAYOUT.size])[2] & FLAG_MSGPACK
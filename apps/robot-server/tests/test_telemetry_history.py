@@ -0,0 +1,85 @@
+"""
+Tests for the telemetry history ring buffer
+"""
+
+from core.telemetry_history import TelemetryHistory
+from models.schemas import RobotState
+
+def record(history: TelemetryHistory, timestamp: float, state: RobotState = RobotState.IDLE):
+    """Record a sample whose values are all derived from its timestamp"""
+    history.record(
+        timestamp,
+        [timestamp] * 6,
+        [timestamp + 0.5] * 6,
+        timestamp * 10,
+        state,
+        [True, False, True],
+        [False, True]
+    )
+
+def test_empty_history_returns_no_samples():
+    history = TelemetryHistory(4)
+    window = history.window(10.0, now=100.0)
+    
+    assert window["samples"] == 0
+    assert window["timestamps"] == []
+    assert window["joints"] == []
+
+def test_window_selects_samples_since_cutoff():
+    history = TelemetryHistory(8)
+    for t in range(1, 6):
+        record(history, float(t))
+        
+    window = history.window(2.5, now=5.0)
+    
+    assert window["timestamps"] == [3.0, 4.0, 5.0]
+    assert window["joints"] == [[3.0] * 6, [4.0] * 6, [5.0] * 6]
+    assert window["tcp_pose"] == [[3.5] * 6, [4.5] * 6, [5.5] * 6]
+    assert window["tcp_speed"] == [30.0, 40.0, 50.0]
+
+def test_window_includes_sample_exactly_at_cutoff():
+    history = TelemetryHistory(8)
+    for t in range(1, 4):
+        record(history, float(t))
+        
+    assert history.window(1.0, now=3.0)["timestamps"] == [2.0, 3.0]
+
+def test_ring_overwrites_oldest_when_full():
+    history = TelemetryHistory(4)
+    for t in range(1, 7):
+        record(history, float(t))
+        
+    window = history.window(100.0, now=6.0)
+    
+    assert history.count == 4
+    assert window["capacity"] == 4
+    assert window["timestamps"] == [3.0, 4.0, 5.0, 6.0]
+    assert window["joints"] == [[float(t)] * 6 for t in range(3, 7)]
+
+def test_window_across_wrap_point_stays_in_order():
+    history = TelemetryHistory(4)
+    for t in range(1, 7):
+        record(history, float(t))
+        
+    # Samples 5 and 6 sit at the start of the arrays, 4 at the end
+    window = history.window(2.0, now=6.0)
+    
+    assert window["timestamps"] == [4.0, 5.0, 6.0]
+    assert window["tcp_pose"] == [[4.5] * 6, [5.5] * 6, [6.5] * 6]
+
+def test_state_and_digital_io_are_encoded():
+    history = TelemetryHistory(2)
+    record(history, 1.0, RobotState.EXECUTING)
+    
+    window = history.window(10.0, now=1.0)
+    
+    assert window["state"] == [RobotState.EXECUTING.value]
+    assert window["di"] == [0b101]
+    assert window["do"] == [0b10]
+
+def test_capacity_is_at_least_one():
+    history = TelemetryHistory(0)
+    record(history, 1.0)
+    record(history, 2.0)
+    
+    assert history.window(10.0, now=2.0)["timestamps"] == [2.0]
@@ -0,0 +1,46 @@
+"""
+Tests for the telemetry stream field helpers
+"""
+
+from api.telemetry_stream import diff_fields, flatten_fields, project_fields
+
+def test_flatten_nested_dicts_into_paths():
+    flat = flatten_fields({
+        "state": "IDLE",
+        "tcp_pose": {"x": 1.0, "y": 2.0},
+        "net": {"clock": {"offset": 0.5}}
+    })
+    
+    assert flat == {"state": "IDLE", "tcp_pose.x": 1.0, "tcp_pose.y": 2.0, "net.clock.offset": 0.5}
+
+def test_flatten_keeps_lists_and_empty_dicts_as_leaves():
+    flat = flatten_fields({"joints": [0.0, 1.0], "errors": {}})
+    
+    assert flat == {"joints": [0.0, 1.0], "errors": {}}
+
+def test_diff_reports_changed_added_and_removed_paths():
+    previous = {"state": "IDLE", "tcp_pose.x": 1.0, "joints": [0.0, 1.0], "old": 1}
+    current = {"state": "IDLE", "tcp_pose.x": 1.5, "joints": [0.0, 1.0], "new": 2}
+    
+    changed, removed = diff_fields(previous, current)
+    
+    assert changed == {"tcp_pose.x": 1.5, "new": 2}
+    assert removed == ["old"]
+
+def test_diff_of_identical_states_is_empty():
+    state = {"state": "IDLE", "joints": [0.0]}
+    
+    assert diff_fields(state, dict(state)) == ({}, [])
+
+def test_project_keeps_requested_top_level_fields():
+    data = {"state": "IDLE", "joints": [0.0], "tcp_pose": {"x": 1.0}}
+    
+    assert project_fields(data, frozenset({"state", "tcp_pose", "missing"})) == {
+        "state": "IDLE",
+        "tcp_pose": {"x": 1.0}
+    }
+
+def test_project_without_fields_returns_everything():
+    data = {"state": "IDLE"}
+    
+    assert project_fields(data, None) is data
@@ -0,0 +1,299 @@
+"""
+Tests for the UR10 adapter's motion helpers, with the robot API replaced
+"""
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import chess
+import pytest
+
+import adapters.ur10_adapter as ur10_module
+from adapters.command_worker import CommandWithdrawnError
+from adapters.move_planner import ACTION_TRAVEL
+from adapters.ur10_adapter import UR10Adapter
+from adapters.ur_connection import CONNECTION_CONNECTED, URConnectionManager
+from models.schemas import TCPPose
+
+class FakeControl:
+    """RTDE control interface that records moveL calls, and link changes as ``(name, args)``
+    
+    With ``block``, moveL runs until stopL is called and then reports failure.
+    """
+    
+    def __init__(self, succeed: bool = True, events=None, block: bool = False):
+        self.succeed = succeed
+        self.block = block
+        self.moves = []
+        self.events = events if events is not None else []
+        self.moving = threading.Event()
+        self.stopped = threading.Event()
+        self.script_running = True
+        self.connected = True
+        
+    def moveL(self, pose, speed, acceleration):
+        self.moves.append((pose, speed, acceleration))
+        self.events.append(("moveL", (pose,)))
+        if self.block:
+            self.moving.set()
+            self.stopped.wait(timeout=5.0)
+            return False
+        return self.succeed
+        
+    def stopL(self, deceleration):
+        self.events.append(("stopL", (deceleration,)))
+        self.stopped.set()
+        
+    def stopScript(self):
+        self.events.append(("stopScript", ()))
+        self.script_running = False
+        
+    def isProgramRunning(self):
+        return self.script_running
+        
+    def reuploadScript(self):
+        self.events.append(("reuploadScript", ()))
+        self.script_running = True
+        
+    def isConnected(self):
+        return self.connected
+        
+    def disconnect(self):
+        self.events.append(("disconnect", ()))
+        self.connected = False
+        
+    def reconnect(self):
+        self.events.append(("reconnect", ()))
+        self.connected = True
+        return True
+
+def connect(adapter: UR10Adapter, control: FakeControl, tcp_pose=(0.3, -0.2, 0.1, 0.1, 3.1, 0.2)):
+    sample = SimpleNamespace(tcp_pose=list(tcp_pose)) if tcp_pose else None
+    connection = URConnectionManager("robot")
+    connection.state = CONNECTION_CONNECTED
+    connection.control = control
+    connection.receiver = SimpleNamespace(read=lambda: sample)
+    adapter.connection = connection
+
+def names(calls):
+    return [name for name, _ in calls]
+
+def test_tcp_jog_targets_the_robot_frame_pose(ur10_adapter, robot_api):
+    ur10_adapter.current_pose = TCPPose(x=0.3, y=-0.2, z=0.1, rx=0.0, ry=3.14, rz=0.0)
+    
+    ur10_adapter._jog_tcp_sync("x", 0.01)
+    ur10_adapter._jog_tcp_sync("z", -0.02)
+    
+    assert robot_api[0][1][0] == pytest.approx([0.31, -0.2])
+    assert robot_api[0][1][1] == pytest.approx(0.1)
+    assert robot_api[1][1][0] == pytest.approx([0.31, -0.2])
+    assert robot_api[1][1][1] == pytest.approx(0.08)
+    assert ur10_adapter.current_pose.ry == pytest.approx(3.14)
+
+def test_tcp_jog_and_safe_z_agree_on_position(ur10_adapter, robot_api):
+    ur10_adapter.current_pose = TCPPose(x=0.3, y=-0.2, z=0.1, rx=0.0, ry=3.14, rz=0.0)
+    
+    ur10_adapter._jog_tcp_sync("y", 0.0)
+    ur10_adapter._move_to_safe_z_sync(0.25)
+    
+    assert robot_api[0][1][0] == pytest.approx(robot_api[1][1][0])
+
+def test_moves_use_the_persistent_control_link(ur10_adapter, robot_api):
+    control = FakeControl()
+    connect(ur10_adapter, control)
+    parameters = ur10_adapter.config["robot_parameters"]
+    
+    ur10_adapter._move_to_sync([0.4, 0.1], 0.2)
+    
+    assert robot_api == []
+    assert control.moves == [
+        ([0.4, 0.1, 0.2, 0.1, 3.1, 0.2], parameters["move_speed"], parameters["move_accel"])
+    ]
+
+def test_failed_control_move_raises(ur10_adapter, robot_api):
+    connect(ur10_adapter, FakeControl(succeed=False))
+    
+    with pytest.raises(RuntimeError):
+        ur10_adapter._move_to_sync([0.4, 0.1], 0.2)
+
+def test_moves_fall_back_to_robot_api_without_a_link(ur10_adapter, robot_api):
+    ur10_adapter._move_to_sync([0.4, 0.1], 0.2)
+    
+    assert robot_api == [("move_to_square", ([0.4, 0.1], 0.2))]
+
+def test_moves_fall_back_to_robot_api_without_a_measured_orientation(ur10_adapter, robot_api):
+    control = FakeControl()
+    connect(ur10_adapter, control, tcp_pose=None)
+    
+    ur10_adapter._move_to_sync([0.4, 0.1], 0.2)
+    
+    assert control.moves == []
+    assert robot_api == [("move_to_square", ([0.4, 0.1], 0.2))]
+
+def test_home_goes_to_the_robot_api_bin_position(ur10_adapter, robot_api):
+    control = FakeControl()
+    connect(ur10_adapter, control)
+    
+    assert asyncio.run(ur10_adapter.home())
+    
+    assert robot_api == [("move_to_square", ("BIN_POSITION", 0.3))]
+    assert names(control.events) == ["stopScript", "disconnect", "reconnect"]
+
+def test_program_travels_over_the_persistent_control_link(ur10_adapter, robot_api):
+    control = FakeControl(events=robot_api)
+    connect(ur10_adapter, control)
+    program = ur10_adapter.planner.plan(chess.Board(), chess.Move.from_uci("e2e4"))
+    
+    ur10_adapter._run_program_sync(program)
+    
+    travels = [coordinate for step in program.steps if step.action == ACTION_TRAVEL for coordinate in step.position]
+    assert [coordinate for pose, _, _ in control.moves for coordinate in pose[:3]] == pytest.approx(travels)
+    assert "move_to_square" not in names(robot_api)
+
+def test_program_releases_the_control_link_only_around_robot_api(ur10_adapter, robot_api):
+    connect(ur10_adapter, FakeControl(events=robot_api))
+    program = ur10_adapter.planner.plan(chess.Board(), chess.Move.from_uci("e2e4"))
+    
+    ur10_adapter._run_program_sync(program)
+    
+    assert names(robot_api) == [
+        "moveL",
+        "stopScript", "disconnect", "forcemode_lower", "lift_piece", "reconnect",
+        "moveL",
+        "stopScript", "disconnect", "lower_piece", "reconnect"
+    ]
+    assert ur10_adapter.connection.control_released is False
+
+def test_control_link_is_reconnected_when_robot_api_fails(ur10_adapter):
+    control = FakeControl()
+    connect(ur10_adapter, control)
+    
+    def fail(*args):
+        raise RuntimeError("protective stop")
+        
+    with pytest.raises(RuntimeError):
+        ur10_adapter._call_robot_api(fail)
+        
+    assert names(control.events) == ["stopScript", "disconnect", "reconnect"]
+    assert ur10_adapter.connection.control_released is False
+
+def test_capture_program_calls_robot_api_in_order(ur10_adapter, robot_api):
+    board = chess.Board("rnbqkbnr/ppp1pppp/8/3p4/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2")
+    move = chess.Move.from_uci("e4d5")
+    program = ur10_adapter.planner.plan(board, move)
+    
+    ur10_adapter._run_program_sync(program)
+    
+    d5 = list(ur10_adapter.geometry.square(chess.D5))
+    e4 = list(ur10_adapter.geometry.square(chess.E4))
+    assert names(robot_api) == [
+        "move_to_square", "forcemode_lower", "lift_piece", "move_to_square", "lower_piece",
+        "move_to_square", "forcemode_lower", "lift_piece", "move_to_square", "lower_piece"
+    ]
+    assert robot_api[0][1][0] == pytest.approx(d5)
+    assert robot_api[2][1] == (pytest.approx(d5),)
+    assert robot_api[4][1] == (chess.Move(chess.D5, chess.D5), True)
+    assert robot_api[7][1] == (pytest.approx(e4),)
+    assert robot_api[9][1] == (move, False)
+
+def test_pieces_taken_from_the_bin_skip_force_lowering(ur10_adapter, robot_api):
+    board = chess.Board("8/4P3/8/8/8/8/8/k6K w - - 0 1")
+    program = ur10_adapter.planner.plan(board, chess.Move.from_uci("e7e8q"))
+    
+    ur10_adapter._run_program_sync(program)
+    
+    assert names(robot_api).count("forcemode_lower") == 1
+    assert names(robot_api).count("lift_piece") == 2
+    assert robot_api[-1] == ("lower_piece", (chess.Move(chess.E8, chess.E8), False))
+
+def test_stop_halts_the_move_the_worker_is_running(ur10_adapter, robot_api):
+    control = FakeControl(block=True)
+    connect(ur10_adapter, control)
+    
+    async def scenario():
+        move = ur10_adapter.commands.submit("move", ur10_adapter._move_to_sync, [0.4, 0.1], 0.2)
+        await asyncio.get_running_loop().run_in_executor(None, control.moving.wait, 5.0)
+        stopped = await ur10_adapter.stop()
+        with pytest.raises(RuntimeError):
+            await move
+        return stopped
+        
+    try:
+        assert asyncio.run(scenario())
+    finally:
+        ur10_adapter.commands.stop()
+        
+    assert names(control.events) == ["moveL", "stopL"]
+
+def test_emergency_stop_ends_the_control_script_until_cleared(ur10_adapter, robot_api):
+    control = FakeControl()
+    connect(ur10_adapter, control)
+    
+    assert asyncio.run(ur10_adapter.emergency_stop())
+    running_after_stop = control.isProgramRunning()
+    assert asyncio.run(ur10_adapter.clear_estop())
+    
+    assert running_after_stop is False
+    assert names(control.events) == ["stopScript", "reuploadScript"]
+
+def test_stop_goes_through_the_dashboard_while_robot_api_holds_the_link(ur10_adapter, robot_api):
+    control = FakeControl()
+    connect(ur10_adapter, control)
+    dashboard_stops = []
+    ur10_adapter.connection.dashboard = SimpleNamespace(stop=lambda: dashboard_stops.append(True))
+    
+    with ur10_adapter.connection.released_control():
+        assert asyncio.run(ur10_adapter.stop())
+        
+    assert dashboard_stops == [True]
+    assert "stopL" not in names(control.events)
+
+def test_stop_during_robot_api_skips_the_rest_of_the_pick(ur10_adapter, robot_api, monkeypatch):
+    control = FakeControl(events=robot_api)
+    connect(ur10_adapter, control)
+    ur10_adapter.connection.dashboard = SimpleNamespace(stop=lambda: robot_api.append(("dashboard.stop", ())))
+    monkeypatch.setattr(ur10_module, "forcemode_lower", lambda: asyncio.run(ur10_adapter.stop()))
+    
+    with pytest.raises(CommandWithdrawnError):
+        ur10_adapter._pick_sync([0.4, 0.1], at_bin=False)
+        
+    assert names(robot_api) == ["stopScript", "disconnect", "dashboard.stop", "reconnect"]
+
+def test_next_command_clears_a_stop(ur10_adapter, robot_api):
+    async def scenario():
+        await ur10_adapter.stop()
+        stopped = ur10_adapter.motion_abort.is_set()
+        await ur10_adapter._submit(
+            "home", ur10_adapter._call_robot_api, ur10_module.move_to_square, "BIN_POSITION", 0.3
+        )
+        return stopped
+        
+    try:
+        assert asyncio.run(scenario()) is True
+    finally:
+        ur10_adapter.commands.stop()
+        
+    assert ur10_adapter.motion_abort.is_set() is False
+    assert robot_api == [("move_to_square", ("BIN_POSITION", 0.3))]
+
+def test_stop_during_a_chess_move_skips_its_remaining_steps(ur10_adapter, robot_api, monkeypatch):
+    ur10_adapter.chess_board = chess.Board()
+    connect(ur10_adapter, FakeControl(events=robot_api))
+    ur10_adapter.connection.dashboard = SimpleNamespace(stop=lambda: robot_api.append(("dashboard.stop", ())))
+    
+    def lift_piece(position):
+        robot_api.append(("lift_piece", (position,)))
+        asyncio.run(ur10_adapter.stop())
+        
+    monkeypatch.setattr(ur10_module, "lift_piece", lift_piece)
+    try:
+        moved = asyncio.run(ur10_adapter.chess_move("e2", "e4"))
+    finally:
+        ur10_adapter.commands.stop()
+        
+    assert moved is False
+    assert names(robot_api) == [
+        "moveL", "stopScript", "disconnect", "forcemode_lower", "lift_piece", "dashboard.stop", "reconnect"
+    ]
+    assert ur10_adapter.chess_board.fen() == chess.STARTING_FEN
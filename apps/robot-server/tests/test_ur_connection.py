@@ -0,0 +1,191 @@
+"""
+Tests for the robot connection manager's control link hand-over and watchdog
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import adapters.ur_connection as connection_module
+from adapters.ur_connection import (
+    CONNECTION_CONNECTED, CONNECTION_CONNECTING, CONNECTION_DISCONNECTED, CONNECTION_RECONNECTING,
+    URConnectionManager
+)
+
+class FakeClock:
+    """Clock for the watchdog's sleeps, which only moves when slept on"""
+    
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+        
+    async def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+        await asyncio.sleep(0)
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(
+        connection_module,
+        "asyncio",
+        SimpleNamespace(sleep=clock.sleep, CancelledError=asyncio.CancelledError)
+    )
+    return clock
+
+def make_connection(control_connected: bool) -> URConnectionManager:
+    connection = URConnectionManager("robot")
+    connection.dashboard = SimpleNamespace(isConnected=lambda: True, robotmode=lambda: "RUNNING")
+    connection.control = SimpleNamespace(
+        isConnected=lambda: control_connected,
+        stopScript=lambda: None,
+        disconnect=lambda: None,
+        reconnect=lambda: True
+    )
+    return connection
+
+def test_keepalive_reports_a_closed_control_link():
+    assert make_connection(False)._keepalive_sync() == "RTDE control connection closed"
+
+def test_keepalive_ignores_a_released_control_link():
+    connection = make_connection(False)
+    
+    with connection.released_control():
+        reason = connection._keepalive_sync()
+        with connection.released_control():
+            nested = connection.control_released
+            
+    assert reason is None
+    assert nested is True
+    assert connection.control_released is False
+
+def test_watchdog_defers_reconnecting_while_the_control_link_is_released(clock):
+    connection = make_connection(False)
+    connection.control_released = True
+    checks = []
+    closes = []
+    
+    async def check_liveness():
+        checks.append(clock.now)
+        if len(checks) == 3:
+            raise asyncio.CancelledError
+        return "No RTDE data for 0.5s"
+        
+    async def close():
+        closes.append(clock.now)
+        
+    connection._check_liveness = check_liveness
+    connection._close = close
+    asyncio.run(connection._watchdog())
+    
+    assert len(checks) == 3
+    assert closes == []
+
+def make_flaky(connection: URConnectionManager, failures: int):
+    """Replace the link setup so ``_open`` fails ``failures`` times, returning the calls made"""
+    calls = []
+    
+    async def open_links():
+        calls.append("open")
+        if calls.count("open") <= failures:
+            raise ConnectionRefusedError(f"refused {calls.count('open')}")
+            
+    async def close_links():
+        calls.append("close")
+        
+    connection._open = open_links
+    connection._close = close_links
+    return calls
+
+def record_transitions(connection: URConnectionManager):
+    transitions = []
+    
+    async def listener(old: str, new: str, reason: str):
+        transitions.append((old, new, reason))
+        
+    connection.add_listener(listener)
+    return transitions
+
+@pytest.mark.parametrize("jitter", [0.0, 0.5, 1.0])
+def test_backoff_doubles_with_equal_jitter_up_to_the_cap(clock, monkeypatch, jitter):
+    uniform = lambda low, high: low + (high - low) * jitter
+    monkeypatch.setattr(connection_module, "random", SimpleNamespace(uniform=uniform))
+    connection = URConnectionManager("robot", backoff_initial=0.5, backoff_max=4.0)
+    make_flaky(connection, failures=5)
+    
+    asyncio.run(connection._reconnect())
+    
+    backoffs = [0.5, 1.0, 2.0, 4.0, 4.0, 4.0]
+    assert clock.sleeps == pytest.approx([backoff / 2 * (1 + jitter) for backoff in backoffs])
+
+def test_reconnect_closes_and_retries_after_a_failed_open(clock):
+    connection = URConnectionManager("robot")
+    calls = make_flaky(connection, failures=2)
+    
+    asyncio.run(connection._reconnect())
+    
+    assert calls == ["open", "close", "open", "close", "open"]
+    assert connection.failed_attempts == 2
+    assert connection.reconnects == 1
+    assert connection.last_error == "refused 2"
+    assert connection.is_connected()
+
+def test_watchdog_reports_the_lost_link_and_the_reconnect(clock):
+    connection = URConnectionManager("robot", keepalive_interval=1.0)
+    connection.state = CONNECTION_CONNECTED
+    make_flaky(connection, failures=1)
+    transitions = record_transitions(connection)
+    checks = []
+    
+    async def check_liveness():
+        checks.append(clock.now)
+        if len(checks) == 2:
+            raise asyncio.CancelledError
+        return "No RTDE data for 0.5s"
+        
+    connection._check_liveness = check_liveness
+    asyncio.run(connection._watchdog())
+    
+    assert transitions == [
+        (CONNECTION_CONNECTED, CONNECTION_RECONNECTING, "No RTDE data for 0.5s"),
+        (CONNECTION_RECONNECTING, CONNECTION_CONNECTED, "Reconnected after 2 attempt(s)")
+    ]
+    assert connection.last_error == "refused 1"
+    assert (connection.failed_attempts, connection.reconnects) == (1, 1)
+
+def test_failed_connect_goes_back_to_disconnected(clock, monkeypatch):
+    monkeypatch.setattr(connection_module, "UR_RTDE_AVAILABLE", True)
+    connection = URConnectionManager("robot")
+    make_flaky(connection, failures=1)
+    transitions = record_transitions(connection)
+    
+    assert asyncio.run(connection.connect()) is False
+    
+    assert transitions == [
+        (CONNECTION_DISCONNECTED, CONNECTION_CONNECTING, "Connecting to robot"),
+        (CONNECTION_CONNECTING, CONNECTION_DISCONNECTED, "Connection failed: refused 1")
+    ]
+    assert connection.last_error == "refused 1"
+    assert connection.watchdog_task is None
+
+def test_emergency_stop_keeps_a_released_control_link_down_until_resumed():
+    events = []
+    connection = URConnectionManager("robot")
+    connection.dashboard = SimpleNamespace(stop=lambda: events.append("dashboard.stop"))
+    connection.control = SimpleNamespace(
+        stopScript=lambda: events.append("stopScript"),
+        disconnect=lambda: events.append("disconnect"),
+        reconnect=lambda: events.append("reconnect"),
+        isConnected=lambda: "reconnect" in events
+    )
+    
+    with connection.released_control():
+        connection.stop_motion(emergency=True)
+    released = list(events)
+    connection.resume_control()
+    
+    assert released == ["stopScript", "disconnect", "dashboard.stop"]
+    assert events[-1] == "reconnect"
+    assert connection.emergency_stopped is False
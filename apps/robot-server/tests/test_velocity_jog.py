@@ -0,0 +1,215 @@
+"""
+Tests for the deadman-guarded velocity jog
+"""
+
+import asyncio
+import copy
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi import WebSocketDisconnect
+
+import adapters.velocity_jog as velocity_jog_module
+from api.jog_stream import JogStreamHandler
+from adapters.velocity_jog import JOG_MODE_JOINT, JOG_MODE_TCP, VelocityJogController
+from core.config import ROBOT_CONFIG_TEMPLATE
+from core.robot_manager import RobotManager
+from models.schemas import RobotState
+
+class FakeClock:
+    """Monotonic clock that only moves when told to"""
+    
+    def __init__(self):
+        self.now = 0.0
+        
+    def monotonic(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(velocity_jog_module, "time", SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+class FakeWebSocket:
+    """Jog client whose messages are fed in by the test"""
+    
+    def __init__(self):
+        self.query_params = {"session_id": "session"}
+        self.client = "client"
+        self.incoming = asyncio.Queue()
+        self.sent = []
+        
+    async def accept(self):
+        pass
+        
+    async def close(self, code: int = 1000):
+        pass
+        
+    async def receive_text(self) -> str:
+        message = await self.incoming.get()
+        if message is None:
+            raise WebSocketDisconnect()
+        return json.dumps(message)
+        
+    async def send_text(self, text: str):
+        self.sent.append(json.loads(text))
+        
+    def statuses(self):
+        return [message.get("status", message["type"]) for message in self.sent]
+
+class FakeSessions:
+    async def get_session(self, session_id):
+        return {"session_id": session_id}
+        
+    async def update_session_activity(self, session_id):
+        pass
+
+def make_jog(mode: str = JOG_MODE_TCP, z_limits=None) -> VelocityJogController:
+    return VelocityJogController(
+        mode, max_speed=0.1, max_angular_speed=0.5, max_joint_speed=0.5,
+        acceleration=1.0, deadman_timeout=0.25, z_limits=z_limits
+    )
+
+def test_rejects_unknown_mode():
+    with pytest.raises(ValueError):
+        VelocityJogController("cartesian", 0.1, 0.5, 0.5, 1.0, 0.25)
+
+def test_rejects_malformed_setpoints(clock):
+    jog = make_jog()
+    with pytest.raises(ValueError):
+        jog.set_target([0.0] * 5)
+    with pytest.raises(ValueError):
+        jog.set_target([float("nan")] + [0.0] * 5)
+
+def test_velocity_ramps_at_acceleration_limit(clock):
+    jog = make_jog()
+    jog.set_target([0.05, 0, 0, 0, 0, 0])
+    
+    ramp = []
+    for _ in range(4):
+        clock.now += 0.02
+        ramp.append(jog.step(0.02)[0])
+        
+    assert ramp == pytest.approx([0.02, 0.04, 0.05, 0.05])
+
+def test_linear_speed_clamped_by_norm(clock):
+    jog = make_jog()
+    jog.set_target([0.3, 0.4, 0, 2.0, 0, 0])
+    
+    assert jog.target[:3] == pytest.approx((0.06, 0.08, 0.0))
+    assert jog.target[3] == pytest.approx(0.5)
+
+def test_joint_speeds_clamped_per_joint(clock):
+    jog = make_jog(JOG_MODE_JOINT)
+    jog.set_target([1.0, -1.0, 0.2, 0, 0, 0])
+    
+    assert jog.target[:3] == pytest.approx((0.5, -0.5, 0.2))
+
+def test_z_limit_blocks_motion_further_out(clock):
+    jog = make_jog(z_limits=(0.0, 0.5))
+    jog.set_target([0, 0, -0.05, 0, 0, 0])
+    
+    assert jog.step(0.02, z=0.0)[2] == 0.0
+    assert jog.step(0.02, z=0.1)[2] == pytest.approx(-0.02)
+
+def test_deadman_trip_releases_and_ends_the_jog(clock):
+    jog = make_jog()
+    jog.set_target([0.05, 0, 0, 0, 0, 0])
+    for _ in range(5):
+        jog.step(0.02)
+        
+    clock.now += 0.3
+    velocity = jog.step(0.02)
+    
+    assert jog.deadman_tripped
+    assert jog.released
+    assert velocity[0] == pytest.approx(0.03)
+    
+    steps = 0
+    while not jog.finished:
+        jog.step(0.02)
+        steps += 1
+    assert steps == 2
+    assert jog.deadman_trips == 1
+
+def test_setpoints_after_deadman_trip_are_ignored(clock):
+    jog = make_jog()
+    jog.set_target([0.05, 0, 0, 0, 0, 0])
+    clock.now += 0.3
+    jog.step(0.02)
+    
+    jog.set_target([0.05, 0, 0, 0, 0, 0])
+    
+    assert jog.target == (0.0,) * 6
+    assert jog.setpoints == 1
+
+@pytest.fixture
+def jog_manager(make_manager) -> RobotManager:
+    """Ready manager whose jogs trip the deadman after 50 ms"""
+    config = copy.deepcopy(ROBOT_CONFIG_TEMPLATE)
+    config["jog"].update({"deadman_timeout": 0.05, "acceleration": 10.0})
+    manager = make_manager(config=config, connected=True)
+    manager.state = RobotState.READY
+    return manager
+
+def test_stalled_client_frees_the_robot(jog_manager):
+    """A client that keeps its socket open but stops sending setpoints"""
+    manager = jog_manager
+    
+    async def scenario():
+        assert await manager.start_velocity_jog("tcp")
+        manager.set_jog_velocity([0.05, 0, 0, 0, 0, 0])
+        assert manager.state == RobotState.EXECUTING
+        
+        # No more setpoints: the jog must end without a stop or disconnect
+        await asyncio.wait_for(manager.velocity_jog_watch, 2.0)
+        with pytest.raises(RuntimeError):
+            manager.set_jog_velocity([0.05, 0, 0, 0, 0, 0])
+        return await asyncio.wait_for(manager.adapter.jog_tcp("x", 0.001, 0.1, "base"), 5.0)
+        
+    moved = asyncio.run(scenario())
+    
+    assert manager.state == RobotState.READY
+    assert manager.adapter.velocity_jog is None
+    assert not manager.adapter.motion_lock.locked()
+    assert moved
+
+def test_deadman_trip_releases_the_stream_and_the_next_setpoint_rearms(jog_manager):
+    manager = jog_manager
+    setpoint = {"type": "velocity", "mode": "tcp", "velocity": [0.05, 0, 0, 0, 0, 0]}
+    
+    async def scenario():
+        handler = JogStreamHandler()
+        first, second = FakeWebSocket(), FakeWebSocket()
+        streams = [asyncio.create_task(handler.run(ws, manager, FakeSessions())) for ws in (first, second)]
+        
+        first.incoming.put_nowait(setpoint)
+        await asyncio.sleep(0.01)
+        await asyncio.wait_for(manager.velocity_jog_watch, 2.0)
+        released = handler.owner is None
+        
+        # Another client may take over without the first one sending anything
+        second.incoming.put_nowait(setpoint)
+        await asyncio.sleep(0.01)
+        taken_over = handler.owner is second
+        second.incoming.put_nowait({"type": "stop"})
+        await asyncio.sleep(0.05)
+        
+        first.incoming.put_nowait(setpoint)
+        await asyncio.sleep(0.01)
+        rearmed = handler.owner is first and manager.adapter.velocity_jog.setpoints == 1
+        
+        first.incoming.put_nowait(None)
+        second.incoming.put_nowait(None)
+        await asyncio.gather(*streams)
+        return first, second, released, taken_over, rearmed
+        
+    first, second, released, taken_over, rearmed = asyncio.run(scenario())
+    
+    assert released
+    assert taken_over
+    assert rearmed
+    assert first.statuses() == ["started", "stopped", "started", "stopped"]
+    assert second.statuses() == ["started", "stopped"]
@@ -0,0 +1,107 @@
+"""
+Tests for per-client WebSocket send queues and their backpressure
+"""
+
+import asyncio
+import json
+from typing import Any, Dict, List
+
+from api.websocket import ClientChannel, WebSocketManager
+
+class SlowWebSocket:
+    """WebSocket stand-in whose sends wait until ``release`` is set"""
+    
+    def __init__(self):
+        self.client = ("127.0.0.1", 50000)
+        self.scope: Dict[str, Any] = {}
+        self.release = asyncio.Event()
+        self.sent: List[Dict[str, Any]] = []
+        
+    async def accept(self, subprotocol=None):
+        pass
+        
+    async def send_text(self, payload: str):
+        await self.release.wait()
+        self.sent.append(json.loads(payload))
+        
+    async def close(self, code: int = 1000):
+        pass
+
+async def settle():
+    """Let the writer tasks run up to their next wait"""
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+def make_manager(max_queue_size: int = 3) -> WebSocketManager:
+    manager = WebSocketManager()
+    manager.max_queue_size = max_queue_size
+    return manager
+
+def test_channel_drops_oldest_message_when_full():
+    channel = ClientChannel(websocket=None, max_queue_size=2)
+    
+    dropped = [channel.push_message(payload) for payload in ("a", "b", "c", "d")]
+    
+    assert dropped == [False, False, True, True]
+    assert channel.messages_dropped == 2
+    assert [channel.pop(), channel.pop(), channel.pop()] == ["c", "d", None]
+
+def test_channel_keeps_only_latest_telemetry_behind_messages():
+    channel = ClientChannel(websocket=None, max_queue_size=2)
+    
+    channel.push_telemetry("t1")
+    channel.push_message("alert")
+    dropped = channel.push_telemetry("t2")
+    
+    assert dropped
+    assert channel.telemetry_dropped == 1
+    assert channel.queue_depth == 2
+    assert [channel.pop(), channel.pop(), channel.pop()] == ["alert", "t2", None]
+
+def test_slow_client_receives_newest_alerts_in_order():
+    async def scenario():
+        manager = make_manager()
+        websocket = SlowWebSocket()
+        await manager.connect_alerts(websocket)
+        await settle()
+        for number in range(5):
+            await manager.broadcast_alert("test", f"alert {number}")
+        info = await manager.get_connection_info()
+        websocket.release.set()
+        await settle()
+        manager.disconnect_alerts(websocket)
+        await settle()
+        return websocket, info, manager
+        
+    websocket, info, manager = asyncio.run(scenario())
+    
+    received = [message["data"].get("message") for message in websocket.sent[1:]]
+    assert websocket.sent[0]["type"] == "connection"
+    assert received == ["alert 2", "alert 3", "alert 4"]
+    assert (info[0]["type"], info[0]["topics"]) == ("alerts", ["alerts"])
+    assert (info[0]["queue_size"], info[0]["messages_dropped"], info[0]["telemetry_dropped"]) == (3, 2, 0)
+    assert manager.stats["messages_dropped"] == 2
+    assert manager.get_connection_count() == 0
+
+def test_slow_client_gets_only_the_latest_telemetry(manager):
+    async def scenario():
+        telemetry = await manager.get_telemetry()
+        websockets = WebSocketManager()
+        websocket = SlowWebSocket()
+        await websockets.connect_telemetry(websocket)
+        await settle()
+        for seq in (1, 2, 3):
+            await websockets.broadcast_telemetry(telemetry, seq=seq)
+        info = await websockets.get_connection_info()
+        websocket.release.set()
+        await settle()
+        websockets.disconnect_telemetry(websocket)
+        await settle()
+        return websocket, info, websockets
+        
+    websocket, info, websockets = asyncio.run(scenario())
+    
+    assert [message["type"] for message in websocket.sent] == ["connection", "telemetry"]
+    assert websocket.sent[1]["seq"] == 3
+    assert (info[0]["queue_size"], info[0]["telemetry_dropped"], info[0]["messages_dropped"]) == (1, 2, 0)
+    assert websockets.stats["telemetry_dropped"] == 2
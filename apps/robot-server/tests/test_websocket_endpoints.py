@@ -0,0 +1,136 @@
+"""
+Tests for the WebSocket endpoints served by the app
+"""
+
+import asyncio
+from typing import Any, Dict
+
+import chess
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from api.routes import analyze_position
+from core.analysis_cache import AnalysisCache
+from core.chess_analysis import ChessAnalysisService
+from models.schemas import EngineAnalyzeRequest
+
+# Trusted host middleware rejects the test client's default "testserver" host
+WS_BASE = "ws://localhost"
+
+class StreamingAdapter:
+    """Engine stand-in that reports one info line and then searches until cancelled"""
+    
+    def __init__(self):
+        self.cancelled = 0
+        
+    async def analyze_position(self, fen: str, depth=None, time_limit=None, on_info=None, priority=None,
+                               preemptible=False) -> Dict[str, Any]:
+        try:
+            await on_info({"bestmove": "e2e4", "depth": 1, "pv": ["e2e4"]})
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+@pytest.fixture
+def client() -> TestClient:
+    """Client for the app without its startup, so no robot or engine is started"""
+    return TestClient(main.app)
+
+def broadcast(websocket, topic: str, text: str):
+    """Publish one message on a topic from the app's event loop"""
+    manager = main.websocket_manager
+    if topic == "alerts":
+        websocket.portal.call(manager.broadcast_alert, "test", text)
+    elif topic == "job":
+        websocket.portal.call(manager.broadcast_job_update, text, "running")
+    else:
+        websocket.portal.call(manager.broadcast_analysis, "test", {"text": text})
+
+def test_multiplex_subscribes_to_known_topics_on_connect(client):
+    with client.websocket_connect(f"{WS_BASE}/ws?topics=alerts,job,bogus") as websocket:
+        greeting = websocket.receive_json()
+        
+    assert (greeting["type"], greeting["stream"]) == ("connection", "multiplex")
+    assert greeting["topics"] == ["alerts", "job"]
+    assert greeting["available_topics"] == ["telemetry", "alerts", "job", "analysis"]
+
+def test_multiplex_delivers_only_subscribed_topics(client):
+    with client.websocket_connect(f"{WS_BASE}/ws?topics=job") as websocket:
+        websocket.receive_json()
+        broadcast(websocket, "analysis", "not subscribed")
+        broadcast(websocket, "alerts", "not subscribed")
+        broadcast(websocket, "job", "job-1")
+        message = websocket.receive_json()
+        
+    assert message["type"] == "job"
+    assert message["data"]["job_id"] == "job-1"
+
+def test_multiplex_subscribe_and_unsubscribe(client):
+    with client.websocket_connect(f"{WS_BASE}/ws") as websocket:
+        assert websocket.receive_json()["topics"] == []
+        
+        websocket.send_json({"type": "subscribe", "topics": ["alerts", "analysis"]})
+        subscribed = websocket.receive_json()
+        broadcast(websocket, "alerts", "first")
+        alert = websocket.receive_json()
+        
+        websocket.send_json({"type": "unsubscribe", "topics": ["alerts"]})
+        unsubscribed = websocket.receive_json()
+        broadcast(websocket, "alerts", "second")
+        broadcast(websocket, "analysis", "after")
+        analysis = websocket.receive_json()
+        
+    assert (subscribed["type"], subscribed["topics"]) == ("subscribed", ["alerts", "analysis"])
+    assert alert["data"]["message"] == "first"
+    assert unsubscribed["topics"] == ["analysis"]
+    assert (analysis["type"], analysis["data"]["result"]) == ("analysis", {"text": "after"})
+
+def test_multiplex_rejects_unknown_topics(client):
+    with client.websocket_connect(f"{WS_BASE}/ws?topics=alerts") as websocket:
+        websocket.receive_json()
+        websocket.send_json({"type": "subscribe", "topics": ["alerts", "bogus"]})
+        error = websocket.receive_json()
+        broadcast(websocket, "alerts", "still subscribed")
+        alert = websocket.receive_json()
+        
+    assert error["type"] == "error"
+    assert "bogus" in error["message"]
+    assert alert["data"]["message"] == "still subscribed"
+
+def test_multiplex_client_is_dropped_on_disconnect(client):
+    with client.websocket_connect(f"{WS_BASE}/ws?topics=alerts") as websocket:
+        websocket.receive_json()
+        connected = main.websocket_manager.get_connection_count()
+        
+    assert connected == 1
+    assert main.websocket_manager.get_connection_count() == 0
+
+def test_analysis_streams_info_until_cancelled_over_the_socket(client, monkeypatch):
+    adapter = StreamingAdapter()
+    service = ChessAnalysisService(adapter, AnalysisCache(16), default_depth=12, default_time=1.0,
+                                   info_rate=0, speculative=False)
+    monkeypatch.setattr(main.robot_manager, "adapter", adapter)
+    monkeypatch.setattr(main.robot_manager, "analysis", service)
+    monkeypatch.setitem(main.websocket_manager.message_handlers, "cancel_analysis", main.cancel_analysis_request)
+    request = EngineAnalyzeRequest(fen=chess.STARTING_FEN, channel="hint")
+    
+    with client.websocket_connect(f"{WS_BASE}/ws/analysis") as websocket:
+        websocket.receive_json()
+        search = websocket.portal.start_task_soon(
+            analyze_position, request, None, main.robot_manager, main.websocket_manager
+        )
+        started = websocket.receive_json()["data"]["result"]
+        info = websocket.receive_json()["data"]["result"]
+        websocket.send_json({"type": "cancel_analysis", "channel": "hint"})
+        replies = [websocket.receive_json() for _ in range(2)]
+        result = search.result(timeout=5)
+        
+    reply = next(message for message in replies if message["type"] == "analysis_cancelled")
+    final = next(message for message in replies if message["type"] == "analysis")["data"]["result"]
+    assert (started["status"], info["status"], info["info"]["pv"]) == ("started", "info", ["e2e4"])
+    assert (reply["channel"], reply["cancelled"]) == ("hint", 1)
+    assert (final["status"], final["channel"]) == ("cancelled", "hint")
+    assert result["cancelled"] is True
+    assert adapter.cancelled == 1